@@ -122,6 +122,47 @@ class EDSUtils {
         return names[type] || type;
     }
 
+    // Kompakt istemci verisini çözer (tools/compact_payload.py ile üretilir)
+    static decodeCompactPayload(payload) {
+        if (payload.v !== 1) {
+            throw new Error('Unsupported payload version: ' + payload.v);
+        }
+
+        const dicts = payload.dicts;
+        const categorical = ['type', 'road', 'district', 'city', 'direction', 'status'];
+        const locations = new Array(payload.n);
+        let lat = 0;
+        let lng = 0;
+
+        for (let i = 0; i < payload.n; i++) {
+            // Koordinatlar bir önceki noktaya göre fark olarak saklanır
+            lat += payload.lat[i];
+            lng += payload.lng[i];
+
+            // Önek kaydı: [önek, dolgu genişliği, tür (1: sayısal ID)]; büyük son ekler metin gelir
+            const prefix = dicts.idPrefix[payload.idPrefix[i]];
+            const number = payload.idNum[i];
+            let id = null;
+            if (prefix) {
+                id = number === null ? prefix[0] : prefix[0] + String(number).padStart(prefix[1], '0');
+                if (prefix[2] === 1) id = Number(id);
+            }
+
+            const location = {
+                id,
+                lat: lat / payload.scale,
+                lng: lng / payload.scale,
+                speedLimit: payload.speedLimit[i]
+            };
+            categorical.forEach(field => {
+                location[field] = dicts[field][payload[field][i]];
+            });
+            locations[i] = location;
+        }
+
+        return locations;
+    }
+
     // Gelişmiş Text-to-Speech
     static speak(text, options = {}) {
         if ('speechSynthesis' in window) {
@@ -468,7 +509,8 @@ const utils = {
     performance: EDSUtils.measurePerformance,
     device: EDSUtils.getDeviceInfo(),
     debug: EDSUtils.debug,
-    track: EDSUtils.trackEvent
+    track: EDSUtils.trackEvent,
+    decodePayload: EDSUtils.decodeCompactPayload
 };
 
 // Auto-initialize shortcuts
@@ -0,0 +1,316 @@
+import base64
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.chrome.options import Options
+    HAS_SELENIUM = True
+except ImportError:
+    HAS_SELENIUM = False
+
+    class WebDriverException(Exception):
+        """Selenium yokken yer tutucu"""
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_PAGES = 50
+DEFAULT_PAGE_LOAD_TIMEOUT_S = 30
+DEFAULT_ACQUIRE_TIMEOUT_S = 120
+NETWORK_SETTLE_S = 2.0
+AJAX_RESOURCE_TYPES = {'XHR', 'Fetch'}
+DATA_MIME_KEYWORDS = ('json', 'javascript', 'text/plain')
+
+logger = logging.getLogger(__name__)
+
+
+def chrome_factory(headless: bool = True, user_agent: Optional[str] = None) -> Callable[[], Any]:
+    """Ağ olaylarını performans loguna yazan Chrome sürücüsü üreten fonksiyon"""
+    def create():
+        options = Options()
+        if headless:
+            options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        if user_agent:
+            options.add_argument(f"--user-agent={user_agent}")
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return webdriver.Chrome(options=options)
+    return create
+
+
+def collect_performance_logs(driver, settle: float = NETWORK_SETTLE_S, timeout: float = 30.0) -> List[Dict]:
+    """
+    Yeni ağ olayı gelmeyene kadar performans logunu toplar
+
+    Args:
+        settle: Bu kadar saniye yeni olay gelmezse ağ durgun sayılır
+        timeout: Toplam bekleme sınırı
+    """
+    logs = []
+    deadline = time.time() + timeout
+    quiet_since = time.time()
+    while time.time() < deadline and time.time() - quiet_since < settle:
+        batch = driver.get_log('performance')
+        if batch:
+            logs.extend(batch)
+            quiet_since = time.time()
+        time.sleep(0.2)
+    return logs
+
+
+def capture_response_bodies(driver, logs: List[Dict],
+                            mime_keywords: Iterable[str] = DATA_MIME_KEYWORDS) -> List[Dict]:
+    """
+    Performans logundaki AJAX yanıtlarının tam gövdelerini CDP ile okur
+
+    Yalnızca yüklenmesi tamamlanmış (Network.loadingFinished) XHR/Fetch
+    yanıtları okunur; gövdesi tarayıcı tarafından atılmış yanıtlar atlanır.
+
+    Returns:
+        {'url', 'status', 'mimeType', 'body'} sözlükleri (istek sırasıyla)
+    """
+    responses = {}
+    finished = set()
+    for log in logs:
+        message = json.loads(log['message'])['message']
+        params = message.get('params', {})
+        if message.get('method') == 'Network.responseReceived':
+            response = params.get('response', {})
+            if params.get('type') in AJAX_RESOURCE_TYPES and \
+                    any(keyword in response.get('mimeType', '') for keyword in mime_keywords):
+                responses[params['requestId']] = {
+                    'url': response.get('url'),
+                    'status': response.get('status'),
+                    'mimeType': response.get('mimeType')
+                }
+        elif message.get('method') == 'Network.loadingFinished':
+            finished.add(params.get('requestId'))
+
+    captured = []
+    for request_id, info in responses.items():
+        if request_id not in finished:
+            continue
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException as e:
+            logger.debug(f"Yanıt gövdesi okunamadı ({info['url']}): {e}")
+            continue
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', 'replace')
+        captured.append(dict(info, body=body))
+    return captured
+
+
+class PooledDriver:
+    """Havuzdaki bir sürücü ve açtığı sayfa sayısı"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """
+    Yeniden kullanılan, sıcak tarayıcı sürücüleri havuzu
+
+    - size sürücü açılışta paralel başlatılır ve işler arasında yeniden kullanılır
+    - Her teslimde sağlık kontrolü yapılır; yanıt vermeyen sürücü kapatılıp
+      yerine yenisi başlatılır
+    - max_pages sayfadan sonra sürücü geri dönüştürülür (bellek sızıntısı,
+      bozulan oturum durumu)
+    - map(): görevleri (bölge / sekme taramaları) havuz genişliğinde eşzamanlı
+      çalıştırır
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_pages: int = DEFAULT_MAX_PAGES,
+                 driver_factory: Optional[Callable[[], Any]] = None,
+                 page_load_timeout: float = DEFAULT_PAGE_LOAD_TIMEOUT_S,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT_S):
+        if driver_factory is None:
+            if not HAS_SELENIUM:
+                raise RuntimeError("Selenium is required for the browser pool")
+            driver_factory = chrome_factory()
+        self.size = size
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+        self.page_load_timeout = page_load_timeout
+        self.acquire_timeout = acquire_timeout
+        self.stats = {'created': 0, 'recycled': 0, 'unhealthy': 0, 'failed_starts': 0, 'pages': 0}
+
+        self._idle: queue.Queue = queue.Queue()
+        self._live = 0  # çalışan + başlatılmakta olan sürücüler
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> 'BrowserPool':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self) -> 'BrowserPool':
+        """Sürücüleri paralel başlatır ve hazır olmalarını bekler"""
+        with self._lock:
+            missing = self.size - self._live
+            self._live += missing
+        with ThreadPoolExecutor(max_workers=max(1, missing)) as pool:
+            list(pool.map(lambda _: self._create(), range(missing)))
+        logger.info(f"Tarayıcı havuzu hazır: {self._idle.qsize()}/{self.size} sürücü")
+        return self
+
+    def _create(self):
+        """Yeni sürücü başlatır ve boşta kuyruğuna ekler (_live önceden artırılmış olmalı)"""
+        try:
+            driver = self.driver_factory()
+            driver.set_page_load_timeout(self.page_load_timeout)
+        except Exception as e:
+            logger.error(f"Tarayıcı başlatılamadı: {e}")
+            with self._lock:
+                self._live -= 1
+                self.stats['failed_starts'] += 1
+            return
+
+        with self._lock:
+            if self._closed:
+                self._live -= 1
+                closed = True
+            else:
+                self.stats['created'] += 1
+                closed = False
+        if closed:
+            self._quit(driver)
+        else:
+            self._idle.put(PooledDriver(driver))
+
+    def _spawn(self):
+        """Arka planda yedek sürücü başlatır"""
+        with self._lock:
+            if self._closed or self._live >= self.size:
+                return
+            self._live += 1
+        threading.Thread(target=self._create, name='browser-start', daemon=True).start()
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Tarayıcı kapatılamadı: {e}")
+
+    def _discard(self, slot: PooledDriver):
+        """Sürücüyü kapatır ve yerine yenisini başlatır"""
+        self._quit(slot.driver)
+        with self._lock:
+            self._live -= 1
+        self._spawn()
+
+    def _healthy(self, slot: PooledDriver) -> bool:
+        try:
+            slot.driver.execute_script("return 1")
+            slot.driver.get_log('performance')  # önceki sayfanın ağ olayları bu göreve karışmasın
+            return True
+        except Exception:
+            with self._lock:
+                self.stats['unhealthy'] += 1
+            return False
+
+    def checkout(self) -> PooledDriver:
+        """Sağlıklı bir sürücü alır; acquire_timeout içinde bulunamazsa TimeoutError"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            # Başlatılamayan veya atılan sürücülerin yerini doldur
+            self._spawn()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No healthy browser within {self.acquire_timeout:.0f}s")
+            try:
+                slot = self._idle.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+            if self._healthy(slot):
+                return slot
+            logger.warning("Yanıt vermeyen tarayıcı değiştiriliyor")
+            self._discard(slot)
+
+    def checkin(self, slot: PooledDriver, healthy: bool = True):
+        """Sürücüyü havuza iade eder; bozuksa veya sayfa sınırına ulaştıysa geri dönüştürür"""
+        slot.pages += 1
+        with self._lock:
+            self.stats['pages'] += 1
+        if self._closed or not healthy:
+            self._discard(slot)
+            return
+        if slot.pages >= self.max_pages:
+            with self._lock:
+                self.stats['recycled'] += 1
+            self._discard(slot)
+            return
+        try:
+            # Sayfanın JS belleği bir sonraki göreve kadar tutulmasın
+            slot.driver.get('about:blank')
+        except Exception:
+            self._discard(slot)
+            return
+        self._idle.put(slot)
+
+    @contextmanager
+    def acquire(self):
+        """with pool.acquire() as driver: ... (WebDriver hatasında sürücü değiştirilir)"""
+        slot = self.checkout()
+        healthy = True
+        try:
+            yield slot.driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self.checkin(slot, healthy)
+
+    def map(self, task: Callable[[Any, Any], Any], items: Iterable[Any], retries: int = 1) -> List[Dict]:
+        """
+        task(driver, item) görevlerini havuz genişliğinde eşzamanlı çalıştırır
+
+        WebDriver hatasında görev başka bir sürücüyle retries kez yeniden
+        denenir; diğer hatalar yeniden denenmez.
+
+        Returns:
+            Girdi sırasıyla {'item', 'result'} veya {'item', 'error'} sözlükleri
+        """
+        def run(item):
+            error = None
+            for _ in range(retries + 1):
+                try:
+                    with self.acquire() as driver:
+                        return {'item': item, 'result': task(driver, item)}
+                except WebDriverException as e:
+                    error = e
+                except Exception as e:
+                    return {'item': item, 'error': f"{type(e).__name__}: {e}"}
+            return {'item': item, 'error': f"{type(error).__name__}: {error}"}
+
+        items = list(items)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.size, len(items)))) as pool:
+            return list(pool.map(run, items))
+
+    def close(self):
+        """Boştaki sürücüleri kapatır; kullanımdakiler iade edilince kapanır"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(slot.driver)
+            with self._lock:
+                self._live -= 1
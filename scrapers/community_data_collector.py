@@ -18,6 +18,31 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
 
+# Turkey's major routes and typical camera locations
+MAJOR_ROUTES = {
+    "Istanbul": {
+        "routes": [
+            {"name": "TEM Otoyolu", "start": (41.0425, 28.8784), "end": (41.0625, 29.1784), "cameras": 15},
+            {"name": "E-5 Karayolu", "start": (41.0095, 28.7347), "end": (41.0295, 29.2347), "cameras": 20},
+            {"name": "Büyükdere Caddesi", "start": (41.0782, 29.0166), "end": (41.1182, 29.0566), "cameras": 8},
+            {"name": "Bağdat Caddesi", "start": (40.9800, 29.0300), "end": (40.9600, 29.1100), "cameras": 6}
+        ]
+    },
+    "Ankara": {
+        "routes": [
+            {"name": "Eskişehir Yolu", "start": (39.9008, 32.7541), "end": (39.9408, 32.9541), "cameras": 12},
+            {"name": "Konya Yolu", "start": (39.8934, 32.8297), "end": (39.8534, 32.9297), "cameras": 10},
+            {"name": "Atatürk Bulvarı", "start": (39.9290, 32.8069), "end": (39.9690, 32.8669), "cameras": 8}
+        ]
+    },
+    "Izmir": {
+        "routes": [
+            {"name": "Çevre Yolu", "start": (38.3691, 27.0691), "end": (38.4691, 27.1691), "cameras": 15},
+            {"name": "Ankara Yolu", "start": (38.4000, 27.1000), "end": (38.5000, 27.2000), "cameras": 10}
+        ]
+    }
+}
+
 class CommunityDataCollector:
     """Community kaynaklardan radar verisi toplama"""
     
@@ -117,34 +142,9 @@ class CommunityDataCollector:
         
         print("🎯 Yüksek yoğunluklu sentetik veri oluşturuluyor...")
         
-        # Turkey's major routes and typical camera locations
-        major_routes = {
-            "Istanbul": {
-                "routes": [
-                    {"name": "TEM Otoyolu", "start": (41.0425, 28.8784), "end": (41.0625, 29.1784), "cameras": 15},
-                    {"name": "E-5 Karayolu", "start": (41.0095, 28.7347), "end": (41.0295, 29.2347), "cameras": 20},
-                    {"name": "Büyükdere Caddesi", "start": (41.0782, 29.0166), "end": (41.1182, 29.0566), "cameras": 8},
-                    {"name": "Bağdat Caddesi", "start": (40.9800, 29.0300), "end": (40.9600, 29.1100), "cameras": 6}
-                ]
-            },
-            "Ankara": {
-                "routes": [
-                    {"name": "Eskişehir Yolu", "start": (39.9008, 32.7541), "end": (39.9408, 32.9541), "cameras": 12},
-                    {"name": "Konya Yolu", "start": (39.8934, 32.8297), "end": (39.8534, 32.9297), "cameras": 10},
-                    {"name": "Atatürk Bulvarı", "start": (39.9290, 32.8069), "end": (39.9690, 32.8669), "cameras": 8}
-                ]
-            },
-            "Izmir": {
-                "routes": [
-                    {"name": "Çevre Yolu", "start": (38.3691, 27.0691), "end": (38.4691, 27.1691), "cameras": 15},
-                    {"name": "Ankara Yolu", "start": (38.4000, 27.1000), "end": (38.5000, 27.2000), "cameras": 10}
-                ]
-            }
-        }
-        
         import random
         
-        for city, city_data in major_routes.items():
+        for city, city_data in MAJOR_ROUTES.items():
             for route in city_data["routes"]:
                 start_lat, start_lng = route["start"]
                 end_lat, end_lng = route["end"]
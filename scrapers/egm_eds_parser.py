@@ -1,17 +1,44 @@
 import requests
 from bs4 import BeautifulSoup
+import argparse
 import json
 import re
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 
+from browser_pool import (BrowserPool, DEFAULT_MAX_PAGES, DEFAULT_POOL_SIZE,
+                          capture_response_bodies, collect_performance_logs)
+
+# Tarayıcı yalnızca uç nokta keşfi ve eski (browser) mod için gerekir
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.chrome.options import Options
+    HAS_SELENIUM = True
+except ImportError:
+    HAS_SELENIUM = False
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+ENDPOINTS_FILE = Path(__file__).parent / "scraped-datas" / "egm_endpoints.json"
+AJAX_RESOURCE_TYPES = {'XHR', 'Fetch'}
+AJAX_URL_KEYWORDS = ['eds', 'harita', 'marker', 'koordinat']
+FORWARDED_HEADERS = {'content-type', 'x-requested-with', 'accept'}
+LAT_KEYS = ('latitude', 'lat', 'enlem')
+LNG_KEYS = ('longitude', 'lng', 'lon', 'long', 'boylam')
+CATEGORY_KEYS = ('category', 'kategori', 'tip', 'tur', 'edstipi', 'type')
+DISCOVERY_SETTLE_S = 2.0
+DEFAULT_FETCH_WORKERS = 8
+
 class EGMEDSParser:
     """
     EGM Elektronik Denetleme Sistemi (EDS) Harita Verilerini Parse Eden Sınıf
@@ -20,27 +47,36 @@ class EGMEDSParser:
     çekmek ve analiz etmek için kullanılır.
     """
     
-    def __init__(self, headless: bool = True, wait_timeout: int = 30):
+    def __init__(self, headless: bool = True, wait_timeout: int = 30,
+                 browser_pool: Optional[BrowserPool] = None):
         """
         Parser'ı başlatır
         
         Args:
             headless: Tarayıcıyı görünmez modda çalıştır
             wait_timeout: Sayfa yükleme timeout süresi
+            browser_pool: Verilirse sürücüler her çağrıda açılıp kapatılmaz,
+                havuzdan ödünç alınır
         """
         self.base_url = "https://onlineislemler.egm.gov.tr/trafik/sayfalar/edsharita.aspx"
         self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
         self.wait_timeout = wait_timeout
         
         # Selenium WebDriver Ayarları
-        self.chrome_options = Options()
-        if headless:
-            self.chrome_options.add_argument("--headless")
-        self.chrome_options.add_argument("--no-sandbox")
-        self.chrome_options.add_argument("--disable-dev-shm-usage")
-        self.chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+        self.chrome_options = Options() if HAS_SELENIUM else None
+        if self.chrome_options is not None:
+            if headless:
+                self.chrome_options.add_argument("--headless")
+            self.chrome_options.add_argument("--no-sandbox")
+            self.chrome_options.add_argument("--disable-dev-shm-usage")
+            self.chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+            # Ağ olayları (AJAX istekleri) performans logundan okunur
+            self.chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         
         self.driver = None
+        self.browser_pool = browser_pool
+        self._pool_slot = None
         self.eds_data = []
         
         # Logging ayarı
@@ -49,17 +85,38 @@ class EGMEDSParser:
     
     def start_driver(self):
         """WebDriver'ı başlatır"""
+        if self.browser_pool is None and not HAS_SELENIUM:
+            self.logger.error("Selenium yüklü değil; tarayıcı modu ve uç nokta keşfi kullanılamaz")
+            return False
         try:
-            self.driver = webdriver.Chrome(options=self.chrome_options)
+            if self.browser_pool is not None:
+                # Havuzdaki sıcak sürücüyü ödünç al
+                self._pool_slot = self.browser_pool.checkout()
+                self.driver = self._pool_slot.driver
+            else:
+                self.driver = webdriver.Chrome(options=self.chrome_options)
             return True
         except Exception as e:
             self.logger.error(f"WebDriver başlatılamadı: {e}")
             return False
     
-    def stop_driver(self):
-        """WebDriver'ı kapatır"""
-        if self.driver:
+    def stop_driver(self, healthy: bool = True):
+        """WebDriver'ı kapatır (havuzdan alındıysa havuza iade eder)"""
+        if self._pool_slot is not None:
+            self.browser_pool.checkin(self._pool_slot, healthy)
+            self._pool_slot = None
+        elif self.driver:
             self.driver.quit()
+        self.driver = None
+    
+    def new_browser_pool(self, size: int = DEFAULT_POOL_SIZE,
+                         max_pages: int = DEFAULT_MAX_PAGES) -> BrowserPool:
+        """Parser'ın Chrome ayarlarıyla sürücü üreten tarayıcı havuzu oluşturur"""
+        if not HAS_SELENIUM:
+            raise RuntimeError("Selenium is required for the browser pool")
+        return BrowserPool(size=size, max_pages=max_pages,
+                           driver_factory=lambda: webdriver.Chrome(options=self.chrome_options),
+                           page_load_timeout=self.wait_timeout)
     
     def parse_eds_map_data(self) -> List[Dict]:
         """
@@ -83,8 +140,9 @@ class EGMEDSParser:
             # JavaScript harita verilerini çek
             map_data = self.extract_map_markers()
             
-            # AJAX çağrılarını yakala
-            ajax_data = self.capture_ajax_requests()
+            # AJAX yanıtlarının tam gövdelerini yakala
+            logs = collect_performance_logs(self.driver, DISCOVERY_SETTLE_S, self.wait_timeout)
+            ajax_data = capture_response_bodies(self.driver, logs)
             
             # JSON verilerini parse et
             parsed_data = self.parse_json_data(map_data, ajax_data)
@@ -129,7 +187,7 @@ class EGMEDSParser:
                     content.includes('coord') || content.includes('marker')) {
                     mapData.push({
                         type: 'embedded_json',
-                        content: content.substring(0, 1000)
+                        content: content
                     });
                 }
             }
@@ -144,28 +202,256 @@ class EGMEDSParser:
             self.logger.error(f"Marker çıkarma hatası: {e}")
             return []
     
-    def capture_ajax_requests(self) -> List[Dict]:
-        """AJAX isteklerini yakalar"""
-        ajax_data = []
+    @staticmethod
+    def extract_ajax_endpoints(logs: List[Dict]) -> List[Dict]:
+        """
+        Performans logundan harita verisini döndüren AJAX isteklerini çıkarır
+        
+        Args:
+            logs: driver.get_log('performance') kayıtları
+            
+        Returns:
+            Tekrar oynatılabilir istek tanımları (url, method, headers, body)
+        """
+        pending = {}
+        endpoints = []
+        seen = set()
+        
+        for log in logs:
+            message = json.loads(log['message'])['message']
+            params = message.get('params', {})
+            
+            if message.get('method') == 'Network.requestWillBeSent':
+                if params.get('type') in AJAX_RESOURCE_TYPES:
+                    request = params['request']
+                    pending[params['requestId']] = {
+                        'url': request['url'],
+                        'method': request.get('method', 'GET'),
+                        'headers': {k: v for k, v in request.get('headers', {}).items()
+                                    if k.lower() in FORWARDED_HEADERS},
+                        'body': request.get('postData')
+                    }
+            
+            elif message.get('method') == 'Network.responseReceived':
+                spec = pending.pop(params.get('requestId'), None)
+                response = params.get('response', {})
+                if spec is None or response.get('status') != 200:
+                    continue
+                # JSON döndüren veya adı veri uç noktasına benzeyen istekler
+                if 'json' in response.get('mimeType', '') or \
+                        any(keyword in spec['url'].lower() for keyword in AJAX_URL_KEYWORDS):
+                    key = (spec['method'], spec['url'], spec['body'])
+                    if key not in seen:
+                        seen.add(key)
+                        endpoints.append(spec)
+        
+        return endpoints
+    
+    def discover_endpoints(self, endpoints_file: Path = ENDPOINTS_FILE) -> List[Dict]:
+        """
+        Sayfayı bir kez tarayıcıda açar, veri uç noktalarını bulur ve dosyaya yazar
+        
+        Args:
+            endpoints_file: Keşfedilen uç noktaların kaydedileceği JSON dosyası
+            
+        Returns:
+            Uç nokta tanımları (bulunamazsa boş liste)
+        """
+        if not self.start_driver():
+            return []
         
         try:
-            # Network loglarını kontrol et
-            logs = self.driver.get_log('performance')
+            self.logger.info("Veri uç noktaları keşfediliyor...")
+            self.driver.get(self.base_url)
+            WebDriverWait(self.driver, self.wait_timeout).until(
+                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            )
             
-            for log in logs:
-                message = json.loads(log['message'])
-                if message['message']['method'] == 'Network.responseReceived':
-                    url = message['message']['params']['response']['url']
-                    if any(keyword in url.lower() for keyword in ['eds', 'harita', 'marker', 'koordinat']):
-                        ajax_data.append({
-                            'url': url,
-                            'timestamp': log['timestamp']
-                        })
-                        
+            # Yeni ağ olayı gelmeyene kadar logu topla (harita verisi sayfa yüklendikten sonra istenir)
+            logs = collect_performance_logs(self.driver, DISCOVERY_SETTLE_S, self.wait_timeout)
+            
+            endpoints = self.extract_ajax_endpoints(logs)
         except Exception as e:
-            self.logger.warning(f"AJAX yakalama hatası: {e}")
+            self.logger.error(f"Uç nokta keşfi başarısız: {e}")
+            return []
+        finally:
+            self.stop_driver()
+        
+        if endpoints:
+            Path(endpoints_file).parent.mkdir(parents=True, exist_ok=True)
+            with open(endpoints_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'base_url': self.base_url,
+                    'discovered_at': datetime.now().isoformat(),
+                    'endpoints': endpoints
+                }, f, ensure_ascii=False, indent=2)
+            self.logger.info(f"{len(endpoints)} uç nokta kaydedildi: {endpoints_file}")
+        else:
+            self.logger.warning("Veri uç noktası bulunamadı")
+        return endpoints
+    
+    def load_endpoints(self, endpoints_file: Path = ENDPOINTS_FILE) -> List[Dict]:
+        """Kaydedilmiş uç noktaları okur; URL'ler güncel base_url'in sunucusuna taşınır"""
+        try:
+            with open(endpoints_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return []
+        
+        endpoints = saved.get('endpoints', [])
+        if saved.get('base_url') and saved['base_url'] != self.base_url:
+            # Örn. yerel test sunucusu: yol ve sorgu korunur, şema ve adres değişir
+            base = urlsplit(self.base_url)
+            for spec in endpoints:
+                url = urlsplit(spec['url'])
+                spec['url'] = urlunsplit((base.scheme, base.netloc, url.path, url.query, ''))
+        return endpoints
+    
+    def fetch_endpoints(self, endpoints: List[Dict],
+                        max_workers: int = DEFAULT_FETCH_WORKERS) -> List[Tuple[Dict, Any]]:
+        """
+        Uç noktaları tarayıcısız, paralel olarak çeker
         
-        return ajax_data
+        Bağlantılar tek bir requests.Session havuzunda yeniden kullanılır;
+        geçici sunucu hatalarında yeniden denenir.
+        
+        Returns:
+            (uç nokta, çözümlenmiş JSON) çiftleri; başarısız istekler atlanır
+        """
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504), allowed_methods=None)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Referer'] = self.base_url
+        
+        # ASP.NET oturum çerezi için sayfanın kendisi bir kez istenir
+        try:
+            self.session.get(self.base_url, timeout=self.wait_timeout)
+        except requests.RequestException as e:
+            self.logger.warning(f"Sayfa çerezleri alınamadı: {e}")
+        
+        def fetch(spec: Dict) -> Any:
+            response = self.session.request(spec['method'], spec['url'], data=spec.get('body'),
+                                            headers=spec.get('headers'), timeout=self.wait_timeout)
+            response.raise_for_status()
+            payload = response.json()
+            # ASP.NET WebMethod sarmalayıcısı: {"d": ...}; d çoğu zaman JSON metnidir
+            if isinstance(payload, dict) and list(payload) == ['d']:
+                payload = payload['d']
+                if isinstance(payload, str):
+                    try:
+                        payload = json.loads(payload)
+                    except ValueError:
+                        pass
+            return payload
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(fetch, spec): spec for spec in endpoints}
+            for future in as_completed(futures):
+                spec = futures[future]
+                try:
+                    results.append((spec, future.result()))
+                except (requests.RequestException, ValueError) as e:
+                    self.logger.warning(f"Uç nokta çekilemedi ({spec['url']}): {e}")
+        
+        # Sonuçlar uç nokta sırasıyla döner (çıktı çalıştırmalar arasında kararlı kalsın)
+        order = {id(spec): i for i, spec in enumerate(endpoints)}
+        results.sort(key=lambda item: order[id(item[0])])
+        return results
+    
+    def extract_points_from_payload(self, payload: Any, source: str) -> List[Dict]:
+        """
+        JSON yanıtındaki koordinatlı kayıtları bulur
+        
+        GeoJSON Point feature'ları ve enlem/boylam alanı olan nesneler (iç içe
+        listeler dahil) tanınır; alan adları büyük/küçük harf duyarsızdır.
+        """
+        points = []
+        stack = [payload]
+        
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+                continue
+            if not isinstance(node, dict):
+                continue
+            
+            geometry = node.get('geometry')
+            if node.get('type') == 'Feature' and isinstance(geometry, dict):
+                if geometry.get('type') == 'Point' and len(geometry.get('coordinates') or []) >= 2:
+                    lng, lat = geometry['coordinates'][:2]
+                    self._append_point(points, lat, lng, node.get('properties') or {}, source)
+                continue
+            
+            fields = {key.lower(): value for key, value in node.items() if isinstance(key, str)}
+            lat = next((fields[key] for key in LAT_KEYS if key in fields), None)
+            lng = next((fields[key] for key in LNG_KEYS if key in fields), None)
+            if lat is not None and lng is not None:
+                self._append_point(points, lat, lng, fields, source)
+                continue
+            
+            stack.extend(reversed([value for value in node.values() if isinstance(value, (dict, list))]))
+        
+        return points
+    
+    def _append_point(self, points: List[Dict], lat: Any, lng: Any, properties: Dict, source: str):
+        """Koordinatı doğrulayıp nokta listesine ekler (ondalık virgül kabul edilir)"""
+        try:
+            lat = float(str(lat).replace(',', '.'))
+            lng = float(str(lng).replace(',', '.'))
+        except ValueError:
+            return
+        if not (35.0 <= lat <= 43.0 and 25.0 <= lng <= 45.0):
+            return
+        
+        fields = {str(key).lower(): value for key, value in properties.items()}
+        category = next((fields[key] for key in CATEGORY_KEYS if fields.get(key)), None)
+        point = {
+            'latitude': lat,
+            'longitude': lng,
+            'type': 'eds_point',
+            'source': source,
+            'timestamp': time.time()
+        }
+        if category is not None:
+            point['category'] = str(category).upper()
+        points.append(point)
+    
+    def parse_eds_direct(self, endpoints_file: Path = ENDPOINTS_FILE,
+                         max_workers: int = DEFAULT_FETCH_WORKERS, rediscover: bool = True) -> List[Dict]:
+        """
+        EDS verilerini tarayıcı açmadan, kaydedilmiş uç noktalardan çeker
+        
+        Uç nokta dosyası yoksa veya hiçbir uç nokta yanıt vermezse (site
+        değişmiş olabilir) rediscover ile bir kez tarayıcıda yeniden keşfedilir.
+        
+        Returns:
+            parse_eds_map_data ile aynı biçimde EDS nokta listesi
+        """
+        endpoints = self.load_endpoints(endpoints_file)
+        discovered = False
+        if not endpoints and rediscover:
+            endpoints = self.discover_endpoints(endpoints_file)
+            discovered = True
+        if not endpoints:
+            return []
+        
+        started = time.time()
+        results = self.fetch_endpoints(endpoints, max_workers)
+        if not results and rediscover and not discovered:
+            self.logger.warning("Kayıtlı uç noktalar yanıt vermedi, yeniden keşfediliyor")
+            endpoints = self.discover_endpoints(endpoints_file)
+            results = self.fetch_endpoints(endpoints, max_workers) if endpoints else []
+        
+        parsed_eds = []
+        for spec, payload in results:
+            parsed_eds.extend(self.extract_points_from_payload(payload, f"ajax:{urlsplit(spec['url']).path}"))
+        
+        self.logger.info(f"{len(results)}/{len(endpoints)} uç noktadan {len(parsed_eds)} nokta "
+                         f"{time.time() - started:.2f} sn'de çekildi")
+        return parsed_eds
     
     def parse_json_data(self, map_data: List[Dict], ajax_data: List[Dict]) -> List[Dict]:
         """JSON verilerini parse eder ve EDS bilgilerini çıkarır"""
@@ -185,6 +471,78 @@ class EGMEDSParser:
                         'timestamp': time.time()
                     })
         
+        # Yakalanan AJAX yanıtları (capture_response_bodies) doğrudan JSON olarak okunur
+        for response in ajax_data:
+            try:
+                payload = json.loads(response.get('body') or '')
+            except ValueError:
+                continue
+            parsed_eds.extend(self.extract_points_from_payload(
+                payload, f"ajax:{urlsplit(response.get('url') or '').path}"))
+        
+        return parsed_eds
+    
+    def sweep_regions(self, regions: List[Dict], pool: Optional[BrowserPool] = None,
+                      pool_size: int = DEFAULT_POOL_SIZE) -> List[Dict]:
+        """
+        Bölge / sekme görünümlerini tarayıcı havuzunda eşzamanlı tarar
+        
+        Her bölge sayfada ayrı bir görünümdür: {'name', 'url' (varsayılan
+        base_url), 'script' (isteğe bağlı; ör. il seçimi veya sekme tıklaması)}.
+        Görünümün tetiklediği AJAX yanıtlarının gövdeleri CDP ile okunur.
+        
+        Args:
+            regions: Taranacak bölge tanımları
+            pool: Kullanılacak havuz (yoksa parser havuzu veya geçici bir havuz)
+            pool_size: Geçici havuzun sürücü sayısı
+            
+        Returns:
+            Tüm bölgelerden tekilleştirilmiş EDS noktaları
+        """
+        if not HAS_SELENIUM:
+            self.logger.error("Selenium yüklü değil; bölge taraması kullanılamaz")
+            return []
+        
+        def visit(driver, region: Dict) -> List[Dict]:
+            driver.get(region.get('url') or self.base_url)
+            WebDriverWait(driver, self.wait_timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            if region.get('script'):
+                driver.execute_script(region['script'])
+            logs = collect_performance_logs(driver, DISCOVERY_SETTLE_S, self.wait_timeout)
+            points = []
+            for response in capture_response_bodies(driver, logs):
+                try:
+                    payload = json.loads(response['body'])
+                except ValueError:
+                    continue
+                points.extend(self.extract_points_from_payload(
+                    payload, f"sweep:{region.get('name', '')}"))
+            return points
+        
+        started = time.time()
+        pool = pool or self.browser_pool
+        if pool is not None:
+            results = pool.map(visit, regions)
+        else:
+            with self.new_browser_pool(size=min(pool_size, max(1, len(regions)))) as temporary_pool:
+                results = temporary_pool.map(visit, regions)
+        
+        parsed_eds = []
+        seen = set()
+        for result in results:
+            if 'error' in result:
+                self.logger.warning(f"Bölge taranamadı ({result['item'].get('name')}): {result['error']}")
+                continue
+            for point in result['result']:
+                key = (round(point['latitude'], 6), round(point['longitude'], 6))
+                if key not in seen:
+                    seen.add(key)
+                    parsed_eds.append(point)
+        
+        self.logger.info(f"{len(regions)} bölgeden {len(parsed_eds)} nokta "
+                         f"{time.time() - started:.2f} sn'de tarandı")
         return parsed_eds
     
     def extract_coordinates_from_text(self, text: str) -> List[Dict]:
@@ -338,10 +696,41 @@ class EGMEDSParser:
 # Kullanım Örneği
 def main():
     """Parser'ı çalıştır ve veriyi analiz et"""
+    arg_parser = argparse.ArgumentParser(description='EGM EDS map data parser')
+    arg_parser.add_argument('--mode', choices=['direct', 'browser', 'discover', 'sweep'], default='direct',
+                            help='direct: replay saved AJAX endpoints without a browser (discovers them '
+                                 'on first run); browser: legacy Selenium scrape; discover: refresh endpoints; '
+                                 'sweep: visit region/tab views concurrently with a browser pool')
+    arg_parser.add_argument('--endpoints', default=str(ENDPOINTS_FILE), help='Saved endpoints file')
+    arg_parser.add_argument('--base-url', help='Map page URL (e.g. a local stand-in server)')
+    arg_parser.add_argument('--workers', type=int, default=DEFAULT_FETCH_WORKERS, help='Parallel requests')
+    arg_parser.add_argument('--regions', help='JSON list of {name, url, script} views for sweep mode')
+    arg_parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE, help='Browsers in the pool')
+    arg_parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES,
+                            help='Pages a pooled browser serves before it is recycled')
+    args = arg_parser.parse_args()
+    
     parser = EGMEDSParser(headless=True)
+    if args.base_url:
+        parser.base_url = args.base_url
+    
+    if args.mode == 'discover':
+        endpoints = parser.discover_endpoints(Path(args.endpoints))
+        print(f"{len(endpoints)} uç nokta bulundu.")
+        return
     
     print("EGM EDS verilerini çekiliyor...")
-    eds_data = parser.parse_eds_map_data()
+    if args.mode == 'direct':
+        eds_data = parser.parse_eds_direct(Path(args.endpoints), args.workers)
+    elif args.mode == 'sweep':
+        regions = [{'name': 'harita', 'url': parser.base_url}]
+        if args.regions:
+            with open(args.regions, 'r', encoding='utf-8') as f:
+                regions = json.load(f)
+        with parser.new_browser_pool(args.pool_size, args.max_pages) as pool:
+            eds_data = parser.sweep_regions(regions, pool)
+    else:
+        eds_data = parser.parse_eds_map_data()
     
     if eds_data:
         print(f"Toplam {len(eds_data)} EDS noktası bulundu.")
@@ -1,37 +1,95 @@
 // EDS Uyarı Sistemi - Service Worker
-// Version 2.0.0
-
-const CACHE_NAME = 'eds-alert-v2.0.0';
-const CACHE_URLS = [
-    '/',
-    '/index.html',
-    '/manifest.json',
-    '/data/eds-locations.geojson',
-    '/css/style.css',
-    '/js/utils.js',
+// Version 2.3.0
+
+// Kabuk önbellek manifesti: URL -> içerik özeti -> boyut. tools/sw_manifest.py
+// tarafından yeniden yazılır, elle düzenlemeyin.
+// @precache-manifest-start
+const PRECACHE_SHELL = [{"url":"/","revision":"92d8da80516bf01f","size":75541},{"url":"/index.html","revision":"92d8da80516bf01f","size":75541},{"url":"/manifest.json","revision":"7aca92dbb0b466ab","size":7642},{"url":"/css/style.css","revision":"76ee8e5f92993e2a","size":9855},{"url":"/js/utils.js","revision":"cca41cead1437f76","size":18632}];
+// @precache-manifest-end
+
+// Veri manifesti her yayında data/precache-data.js dosyasına yazılır (git dışı);
+// içe aktarılan betik değişince tarayıcı service worker'ı yeniler. Yayın yoksa boştur.
+try {
+    importScripts('/data/precache-data.js');
+} catch (error) {
+    console.warn('⚠️ Data precache manifest not available:', error);
+}
+const PRECACHE_MANIFEST = { shell: PRECACHE_SHELL, data: self.PRECACHE_DATA || [] };
+
+// Uygulama kabuğu ve veri ayrı önbelleklerde tutulur; veri güncellemesi kabuğu silmez
+const SHELL_CACHE = 'eds-shell-v1';
+const DATA_CACHE = 'eds-data-v1';
+const RUNTIME_CACHE = 'eds-runtime-v1';
+const KNOWN_CACHES = [SHELL_CACHE, DATA_CACHE, RUNTIME_CACHE];
+
+// Sürümlü CDN adresleri değişmez, içerik özeti gerekmez
+const CDN_URLS = [
     'https://unpkg.com/leaflet@1.9.4/dist/leaflet.css',
     'https://unpkg.com/leaflet@1.9.4/dist/leaflet.js',
     'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css'
 ];
 
-// Install event - cache resources
+const TILE_MANIFEST_PATH = '/data/tiles/manifest.json';
+const CLUSTER_MANIFEST_PATH = '/data/clusters/manifest.json';
+const NETWORK_FIRST_PATHS = [TILE_MANIFEST_PATH, CLUSTER_MANIFEST_PATH];
+
+// path -> { entry, cacheName }
+const PRECACHE_BY_PATH = new Map();
+PRECACHE_MANIFEST.shell.forEach(entry => PRECACHE_BY_PATH.set(entry.url, { entry, cacheName: SHELL_CACHE }));
+PRECACHE_MANIFEST.data.forEach(entry => PRECACHE_BY_PATH.set(entry.url, { entry, cacheName: DATA_CACHE }));
+
+// Önbellek anahtarı içerik özetini içerir; özet değişmeyen dosya yeniden indirilmez
+function revisionKey(entry) {
+    return new URL(`${entry.url}?__rev=${entry.revision}`, self.location.origin).href;
+}
+
+async function precache(cacheName, entries) {
+    const cache = await caches.open(cacheName);
+    const results = await Promise.allSettled(entries.map(async entry => {
+        const key = revisionKey(entry);
+        if (await cache.match(key)) {
+            return false;
+        }
+        const response = await fetch(entry.url, { cache: 'reload' });
+        if (!response.ok) {
+            throw new Error(`${entry.url}: HTTP ${response.status}`);
+        }
+        await cache.put(key, response);
+        return true;
+    }));
+
+    const fetched = results.filter(result => result.status === 'fulfilled' && result.value).length;
+    results.filter(result => result.status === 'rejected')
+        .forEach(result => console.warn('⚠️ Failed to precache:', result.reason));
+    console.log(`📦 ${cacheName}: ${fetched} fetched, ${entries.length - fetched} up to date`);
+}
+
+// Manifestte artık bulunmayan (eski özetli) kayıtları siler
+async function removeStaleEntries(cacheName, entries, extraUrls = []) {
+    const cache = await caches.open(cacheName);
+    const valid = new Set([...entries.map(revisionKey), ...extraUrls]);
+    const requests = await cache.keys();
+    await Promise.all(requests
+        .filter(request => !valid.has(request.url))
+        .map(request => cache.delete(request)));
+}
+
+// Install event - cache changed resources only
 self.addEventListener('install', event => {
     console.log('📦 Service Worker installing...');
-    
+
     event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(cache => {
-                console.log('📦 Caching app resources');
-                return cache.addAll(CACHE_URLS.map(url => {
-                    return new Request(url, { mode: 'no-cors' });
-                })).catch(error => {
-                    console.warn('⚠️ Some resources failed to cache:', error);
-                    // Cache individual files that work
-                    return Promise.allSettled(
-                        CACHE_URLS.map(url => cache.add(url).catch(e => console.warn('Failed to cache:', url)))
-                    );
-                });
-            })
+        Promise.all([
+            precache(SHELL_CACHE, PRECACHE_MANIFEST.shell),
+            precache(DATA_CACHE, PRECACHE_MANIFEST.data),
+            caches.open(SHELL_CACHE).then(cache => Promise.allSettled(
+                CDN_URLS.map(async url => {
+                    if (!(await cache.match(url))) {
+                        await cache.add(new Request(url, { mode: 'no-cors' }));
+                    }
+                })
+            ))
+        ])
             .then(() => {
                 console.log('✅ Service Worker installation complete');
                 return self.skipWaiting();
@@ -39,22 +97,24 @@ self.addEventListener('install', event => {
     );
 });
 
-// Activate event - clean up old caches
+// Activate event - clean up old caches and stale entries
 self.addEventListener('activate', event => {
     console.log('🔄 Service Worker activating...');
-    
+
     event.waitUntil(
         caches.keys()
-            .then(cacheNames => {
-                return Promise.all(
-                    cacheNames.map(cacheName => {
-                        if (cacheName !== CACHE_NAME) {
-                            console.log('🗑️ Deleting old cache:', cacheName);
-                            return caches.delete(cacheName);
-                        }
+            .then(cacheNames => Promise.all(
+                cacheNames
+                    .filter(cacheName => !KNOWN_CACHES.includes(cacheName))
+                    .map(cacheName => {
+                        console.log('🗑️ Deleting old cache:', cacheName);
+                        return caches.delete(cacheName);
                     })
-                );
-            })
+            ))
+            .then(() => Promise.all([
+                removeStaleEntries(SHELL_CACHE, PRECACHE_MANIFEST.shell, CDN_URLS),
+                removeStaleEntries(DATA_CACHE, PRECACHE_MANIFEST.data)
+            ]))
             .then(() => {
                 console.log('✅ Service Worker activated');
                 return self.clients.claim();
@@ -62,6 +122,73 @@ self.addEventListener('activate', event => {
     );
 });
 
+function offlineResponse() {
+    return new Response(`
+            <!DOCTYPE html>
+            <html lang="tr">
+            <head>
+                <meta charset="UTF-8">
+                <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                <title>🚨 EDS Uyarı Sistemi - Offline</title>
+                <style>
+                    body {
+                        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                        background: linear-gradient(135deg, #0a0a0a 0%, #1a1a1a 100%);
+                        color: white;
+                        margin: 0;
+                        display: flex;
+                        align-items: center;
+                        justify-content: center;
+                        min-height: 100vh;
+                        text-align: center;
+                    }
+                    .offline-container {
+                        padding: 2rem;
+                        max-width: 400px;
+                    }
+                    .icon {
+                        font-size: 4rem;
+                        margin-bottom: 1rem;
+                    }
+                    h1 {
+                        margin-bottom: 1rem;
+                        color: #ff4757;
+                    }
+                    p {
+                        margin-bottom: 2rem;
+                        color: #ccc;
+                    }
+                    .retry-btn {
+                        background: #2ed573;
+                        color: white;
+                        border: none;
+                        padding: 12px 24px;
+                        border-radius: 8px;
+                        cursor: pointer;
+                        font-size: 16px;
+                        transition: background 0.3s ease;
+                    }
+                    .retry-btn:hover {
+                        background: #27c668;
+                    }
+                </style>
+            </head>
+            <body>
+                <div class="offline-container">
+                    <div class="icon">📡</div>
+                    <h1>Bağlantı Yok</h1>
+                    <p>EDS Uyarı Sistemi şu anda çevrimdışı. İnternet bağlantınızı kontrol edin.</p>
+                    <button class="retry-btn" onclick="window.location.reload()">
+                        🔄 Tekrar Dene
+                    </button>
+                </div>
+            </body>
+            </html>
+    `, {
+        headers: { 'Content-Type': 'text/html' }
+    });
+}
+
 // Fetch event - serve from cache with network fallback
 self.addEventListener('fetch', event => {
     // Skip non-GET requests
@@ -76,17 +203,48 @@ self.addEventListener('fetch', event => {
         return;
     }
 
+    const url = new URL(event.request.url);
+    const precached = url.origin === self.location.origin && !url.search
+        ? PRECACHE_BY_PATH.get(url.pathname)
+        : undefined;
+
+    // Tile / cluster manifests - network first so new tile hashes are picked up
+    // even before the updated service worker is installed
+    if (url.origin === self.location.origin && NETWORK_FIRST_PATHS.includes(url.pathname)) {
+        event.respondWith(
+            fetch(event.request)
+                .then(response => {
+                    if (response && response.status === 200) {
+                        const responseToCache = response.clone();
+                        caches.open(RUNTIME_CACHE).then(cache => cache.put(url.pathname, responseToCache));
+                    }
+                    return response;
+                })
+                .catch(() => (precached ? caches.match(revisionKey(precached.entry)) : Promise.resolve())
+                    .then(response => response || caches.match(url.pathname)))
+        );
+        return;
+    }
+
+    // Precached shell / data files - served by content revision
+    if (precached) {
+        event.respondWith(
+            caches.open(precached.cacheName)
+                .then(cache => cache.match(revisionKey(precached.entry)))
+                .then(response => response || fetch(event.request))
+                .catch(() => event.request.mode === 'navigate' ? offlineResponse() : Promise.reject())
+        );
+        return;
+    }
+
+    // Everything else (versioned tiles, CDN) - cache first, runtime cache
     event.respondWith(
         caches.match(event.request)
             .then(response => {
-                // Return cached version if available
                 if (response) {
-                    console.log('📦 Serving from cache:', event.request.url);
                     return response;
                 }
 
-                // Otherwise fetch from network
-                console.log('🌐 Fetching from network:', event.request.url);
                 return fetch(event.request)
                     .then(response => {
                         // Don't cache if not successful
@@ -94,11 +252,8 @@ self.addEventListener('fetch', event => {
                             return response;
                         }
 
-                        // Clone the response
                         const responseToCache = response.clone();
-
-                        // Add to cache
-                        caches.open(CACHE_NAME)
+                        caches.open(RUNTIME_CACHE)
                             .then(cache => {
                                 cache.put(event.request, responseToCache);
                             });
@@ -107,75 +262,12 @@ self.addEventListener('fetch', event => {
                     })
                     .catch(error => {
                         console.error('❌ Network fetch failed:', error);
-                        
+
                         // Return offline page for navigation requests
                         if (event.request.mode === 'navigate') {
-                            return new Response(`
-                                <!DOCTYPE html>
-                                <html lang="tr">
-                                <head>
-                                    <meta charset="UTF-8">
-                                    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                                    <title>🚨 EDS Uyarı Sistemi - Offline</title>
-                                    <style>
-                                        body {
-                                            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                                            background: linear-gradient(135deg, #0a0a0a 0%, #1a1a1a 100%);
-                                            color: white;
-                                            margin: 0;
-                                            display: flex;
-                                            align-items: center;
-                                            justify-content: center;
-                                            min-height: 100vh;
-                                            text-align: center;
-                                        }
-                                        .offline-container {
-                                            padding: 2rem;
-                                            max-width: 400px;
-                                        }
-                                        .icon {
-                                            font-size: 4rem;
-                                            margin-bottom: 1rem;
-                                        }
-                                        h1 {
-                                            margin-bottom: 1rem;
-                                            color: #ff4757;
-                                        }
-                                        p {
-                                            margin-bottom: 2rem;
-                                            color: #ccc;
-                                        }
-                                        .retry-btn {
-                                            background: #2ed573;
-                                            color: white;
-                                            border: none;
-                                            padding: 12px 24px;
-                                            border-radius: 8px;
-                                            cursor: pointer;
-                                            font-size: 16px;
-                                            transition: background 0.3s ease;
-                                        }
-                                        .retry-btn:hover {
-                                            background: #27c668;
-                                        }
-                                    </style>
-                                </head>
-                                <body>
-                                    <div class="offline-container">
-                                        <div class="icon">📡</div>
-                                        <h1>Bağlantı Yok</h1>
-                                        <p>EDS Uyarı Sistemi şu anda çevrimdışı. İnternet bağlantınızı kontrol edin.</p>
-                                        <button class="retry-btn" onclick="window.location.reload()">
-                                            🔄 Tekrar Dene
-                                        </button>
-                                    </div>
-                                </body>
-                                </html>
-                            `, {
-                                headers: { 'Content-Type': 'text/html' }
-                            });
+                            return offlineResponse();
                         }
-                        
+
                         // For other requests, just reject
                         return Promise.reject(error);
                     });
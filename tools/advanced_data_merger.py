@@ -15,6 +15,11 @@ verilerini birleştirerek tek bir kaliteli veri seti oluşturur.
 - Coğrafi doğrulama (Türkiye sınırları)
 - Standardizasyon ve normalizasyon
 - Çoklu format export (GeoJSON, JSON, CSV, SQLite)
+- Opsiyonel yol ağı zenginleştirme (OSM / GeoJSON)
+- Ortalama hız kesit segment tablosu (giriş/çıkış eşleştirme)
+- Aşama bazlı, seyreltilmiş (throttled) ilerleme bildirimi
+- Süreç başına bir kez yüklenen, işler arasında paylaşılan motor
+  (MergerEngine); AdvancedDataMerger iş başına hafif bağlamdır
 
 Author: AI Assistant
 Version: 2.0.0
@@ -27,8 +32,11 @@ import sqlite3
 import os
 import time
 import logging
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from pathlib import Path
 import argparse
 import sys
@@ -39,6 +47,9 @@ from collections import defaultdict, Counter
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from road_enricher import RoadEnricher, RoadNetwork
+from section_index import SectionPairer, export_sections_json, export_sections_sqlite
+
 # Optional: Gelişmiş özellikler için
 try:
     import pandas as pd
@@ -52,6 +63,16 @@ try:
 except ImportError:
     HAS_GEOPY = False
 
+try:
+    from camera_index import CameraIndex, index_path_for
+    from result_cache import file_sha256
+    HAS_CAMERA_INDEX = True
+except ImportError:
+    HAS_CAMERA_INDEX = False
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+logger = logging.getLogger(__name__)
+
 
 class DataQuality(Enum):
     """Veri kalite seviyeleri"""
@@ -322,18 +343,50 @@ class DataParser:
         return points
 
 
+class ProgressReporter:
+    """Aşama ilerlemesini geri çağırım fonksiyonuna seyreltilmiş olarak iletir"""
+    
+    # Döngüler raporlayıcıyı her STRIDE öğede bir çağırır; raporlayıcı ise
+    # aşama değişmedikçe en fazla min_interval saniyede bir olay üretir.
+    STRIDE = 256
+    
+    def __init__(self, callback: Optional[Callable[[Dict[str, Any]], None]] = None, min_interval: float = 0.25):
+        self.callback = callback
+        self.min_interval = min_interval
+        self._last_stage = None
+        self._last_emit = 0.0
+    
+    def __call__(self, stage: str, force: bool = False, **info):
+        """İlerleme olayı bildirir; aşama değişimi ve force=True her zaman iletilir"""
+        if self.callback is None:
+            return
+        
+        now = time.monotonic()
+        if not force and stage == self._last_stage and now - self._last_emit < self.min_interval:
+            return
+        
+        self._last_stage = stage
+        self._last_emit = now
+        try:
+            self.callback({'stage': stage, **info})
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+
 class DuplicateDetector:
     """Dublika tespit ve birleştirme sınıfı"""
     
     def __init__(self, distance_threshold: float = 0.1):  # 100 metre
         self.distance_threshold = distance_threshold
     
-    def find_duplicates(self, points: List[EDSPoint]) -> List[List[int]]:
+    def find_duplicates(self, points: List[EDSPoint], progress: Optional[ProgressReporter] = None) -> List[List[int]]:
         """Dublika grupları bulur"""
         duplicate_groups = []
         processed = set()
         
         for i, point1 in enumerate(points):
+            if progress and i % ProgressReporter.STRIDE == 0:
+                progress('duplicates', done=i, total=len(points), groups=len(duplicate_groups))
             if i in processed:
                 continue
             
@@ -397,56 +450,146 @@ class DuplicateDetector:
         return merged_points
 
 
+# Kaynaklardaki tip adı -> EDSType değeri
+TYPE_MAPPING = {
+    'OHITS': EDSType.OHITS.value,
+    'MOBILE': EDSType.MOBILE.value,
+    'REDLIGHT': EDSType.REDLIGHT.value,
+    'RED_LIGHT': EDSType.REDLIGHT.value,
+    'KIITS': EDSType.KIITS.value,
+    'AVERAGE_SPEED': EDSType.AVERAGE_SPEED.value,
+    'SECTION_CONTROL': EDSType.SECTION_CONTROL.value,
+    'WEIGHT_CONTROL': EDSType.WEIGHT_CONTROL.value,
+    'TUNNEL': EDSType.TUNNEL.value,
+    'EDS_POINT': EDSType.OHITS.value,  # Varsayılan olarak OHITS
+}
+
+
+def configure_logging(level: int = logging.INFO):
+    """Kök logger'ı yapılandırır; zaten yapılandırılmışsa dokunmaz"""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+class MergerEngine:
+    """
+    Süreç başına bir kez kurulan, değişmez birleştirme kaynakları
+
+    Ayrıştırıcı, tip eşleme tablosu, kesit eşleştirici ve (verilmişse) yol
+    ağı indeksi işler arasında paylaşılır. İşe özgü durum (dizinler,
+    istatistikler, ilerleme, dublika eşiği) AdvancedDataMerger'da kalır.
+    """
+
+    _shared: Optional['MergerEngine'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, road_network: Optional[str] = None, snap_tolerance: float = 30.0):
+        self.parser = DataParser()
+        self.type_mapping = TYPE_MAPPING
+        self.section_pairer = SectionPairer()
+        self.road_enricher: Optional[RoadEnricher] = None
+        if road_network:
+            self.road_enricher = RoadEnricher(RoadNetwork.load(road_network), snap_tolerance)
+
+    @classmethod
+    def shared(cls) -> 'MergerEngine':
+        """Sürecin ortak motoru (ilk çağrıda kurulur)"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def job(self, input_dir: str, output_dir: str,
+            progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> 'AdvancedDataMerger':
+        """Bu motoru kullanan yeni iş bağlamı"""
+        return AdvancedDataMerger(input_dir, output_dir, progress_callback, engine=self)
+
+    def warm_up(self) -> float:
+        """
+        Kod yollarını küçük bir örnek veriyle bir kez çalıştırır
+
+        Normalizasyon, şehir tahmini, dublika tespiti ve kesit eşleştirme ilk
+        işten önce ısınır. Geçen süreyi (s) döner.
+        """
+        start = time.perf_counter()
+        sample = [
+            {'id': 'warmup_1', 'lat': 39.93, 'lng': 32.86, 'type': 'OHITS', 'road_name': 'D200',
+             'speed_limit': 82, 'source': 'warmup'},
+            {'id': 'warmup_2', 'lat': 39.94, 'lng': 32.87, 'type': 'SECTION_CONTROL', 'road_name': 'D200',
+             'direction': 'N', 'source': 'warmup'}
+        ]
+        with tempfile.TemporaryDirectory(prefix='eds-warmup-') as temp_dir:
+            job = self.job(temp_dir, temp_dir)
+            points = job.normalize_data(sample)
+            job.duplicate_detector.find_duplicates(points)
+            self.section_pairer.pair(points)
+            if self.road_enricher:
+                self.road_enricher.enrich(points)
+        return time.perf_counter() - start
+
+
 class AdvancedDataMerger:
-    """Gelişmiş veri birleştirici ana sınıf"""
+    """Gelişmiş veri birleştirici: tek bir birleştirme işinin bağlamı"""
     
-    def __init__(self, input_dir: str = "scraped-datas", output_dir: str = "merged-output"):
+    def __init__(self, input_dir: str = "scraped-datas", output_dir: str = "merged-output",
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 engine: Optional[MergerEngine] = None):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.engine = engine or MergerEngine.shared()
+        self.logger = logger
         
-        # Logging setup
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.output_dir / 'merger.log'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
-        
-        self.parser = DataParser()
+        self.parser = self.engine.parser
         self.duplicate_detector = DuplicateDetector()
+        self.road_enricher = self.engine.road_enricher
+        self.section_pairer = self.engine.section_pairer
         self.stats = defaultdict(int)
+        self.progress = ProgressReporter(progress_callback)
+    
+    @contextmanager
+    def log_to_file(self, name: str = 'merger.log'):
+        """İş süresince kayıtları çıktı dizinindeki log dosyasına da yazar"""
+        configure_logging()
+        handler = logging.FileHandler(self.output_dir / name)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root = logging.getLogger()
+        root.addHandler(handler)
+        try:
+            yield handler
+        finally:
+            root.removeHandler(handler)
+            handler.close()
         
     def load_all_data(self) -> List[Dict[str, Any]]:
         """Tüm veri dosyalarını yükler"""
         all_data = []
+        files = [file_path for file_path in sorted(self.input_dir.glob("*")) if file_path.is_file()]
         
-        for file_path in self.input_dir.glob("*"):
-            if file_path.is_file():
-                self.logger.info(f"Loading file: {file_path.name}")
+        for index, file_path in enumerate(files):
+            self.logger.info(f"Loading file: {file_path.name}")
+            self.progress('loading', force=True, file=file_path.name,
+                          files_loaded=index, files_total=len(files), points=len(all_data))
+            
+            try:
+                if file_path.suffix.lower() == '.geojson':
+                    data = self.parser.parse_geojson(str(file_path))
+                elif file_path.suffix.lower() == '.json':
+                    data = self.parser.parse_json(str(file_path))
+                elif file_path.suffix.lower() == '.csv':
+                    data = self.parser.parse_csv(str(file_path))
+                else:
+                    self.logger.warning(f"Unsupported file format: {file_path.suffix}")
+                    continue
                 
-                try:
-                    if file_path.suffix.lower() == '.geojson':
-                        data = self.parser.parse_geojson(str(file_path))
-                    elif file_path.suffix.lower() == '.json':
-                        data = self.parser.parse_json(str(file_path))
-                    elif file_path.suffix.lower() == '.csv':
-                        data = self.parser.parse_csv(str(file_path))
-                    else:
-                        self.logger.warning(f"Unsupported file format: {file_path.suffix}")
-                        continue
-                    
-                    self.logger.info(f"Loaded {len(data)} points from {file_path.name}")
-                    self.stats[f'loaded_from_{file_path.name}'] = len(data)
-                    all_data.extend(data)
-                    
-                except Exception as e:
-                    self.logger.error(f"Error loading {file_path.name}: {e}")
+                self.logger.info(f"Loaded {len(data)} points from {file_path.name}")
+                self.stats[f'loaded_from_{file_path.name}'] = len(data)
+                all_data.extend(data)
+                
+            except Exception as e:
+                self.logger.error(f"Error loading {file_path.name}: {e}")
         
         self.logger.info(f"Total raw data points loaded: {len(all_data)}")
+        self.progress('loading', force=True, files_loaded=len(files), files_total=len(files), points=len(all_data))
         return all_data
     
     def normalize_data(self, raw_data: List[Dict[str, Any]]) -> List[EDSPoint]:
@@ -454,6 +597,8 @@ class AdvancedDataMerger:
         normalized_points = []
         
         for i, data_point in enumerate(raw_data):
+            if i % ProgressReporter.STRIDE == 0:
+                self.progress('normalizing', done=i, total=len(raw_data), normalized=len(normalized_points))
             try:
                 # Koordinat alanlarını standartlaştır
                 lat = (data_point.get('latitude') or 
@@ -522,6 +667,8 @@ class AdvancedDataMerger:
                 self.stats['normalization_errors'] += 1
         
         self.logger.info(f"Normalized {len(normalized_points)} points")
+        self.progress('normalizing', force=True, done=len(raw_data), total=len(raw_data),
+                      normalized=len(normalized_points))
         return normalized_points
     
     def normalize_eds_type(self, type_str: str) -> str:
@@ -531,21 +678,7 @@ class AdvancedDataMerger:
         
         type_str = type_str.upper().strip()
         
-        # Mapping tablosu
-        type_mapping = {
-            'OHITS': EDSType.OHITS.value,
-            'MOBILE': EDSType.MOBILE.value,
-            'REDLIGHT': EDSType.REDLIGHT.value,
-            'RED_LIGHT': EDSType.REDLIGHT.value,
-            'KIITS': EDSType.KIITS.value,
-            'AVERAGE_SPEED': EDSType.AVERAGE_SPEED.value,
-            'SECTION_CONTROL': EDSType.SECTION_CONTROL.value,
-            'WEIGHT_CONTROL': EDSType.WEIGHT_CONTROL.value,
-            'TUNNEL': EDSType.TUNNEL.value,
-            'EDS_POINT': EDSType.OHITS.value,  # Varsayılan olarak OHITS
-        }
-        
-        return type_mapping.get(type_str, EDSType.UNKNOWN.value)
+        return self.engine.type_mapping.get(type_str, EDSType.UNKNOWN.value)
     
     def process_data(self) -> List[EDSPoint]:
         """Ana veri işleme pipeline'ı"""
@@ -559,8 +692,10 @@ class AdvancedDataMerger:
         
         # 3. Dublika tespiti ve birleştirme
         self.logger.info("Detecting and merging duplicates...")
-        duplicate_groups = self.duplicate_detector.find_duplicates(normalized_points)
+        duplicate_groups = self.duplicate_detector.find_duplicates(normalized_points, self.progress)
         self.stats['duplicate_groups'] = len(duplicate_groups)
+        self.progress('duplicates', force=True, done=len(normalized_points), total=len(normalized_points),
+                      groups=len(duplicate_groups))
         
         if duplicate_groups:
             merged_points = self.duplicate_detector.merge_duplicates(normalized_points, duplicate_groups)
@@ -568,8 +703,17 @@ class AdvancedDataMerger:
         else:
             merged_points = normalized_points
         
-        # 4. Kalite filtreleme
+        # 4. Yol ağı zenginleştirme (opsiyonel)
+        if self.road_enricher:
+            self.logger.info("Snapping points to road network...")
+            self.progress('enriching', force=True, total=len(merged_points))
+            snap_results = self.road_enricher.enrich(merged_points)
+            self.stats.update(RoadEnricher.summarize(snap_results))
+            self.logger.info(f"Snapped {self.stats['road_snapped']} points to roads")
+        
+        # 5. Kalite filtreleme
         self.logger.info("Applying quality filters...")
+        self.progress('filtering', force=True, total=len(merged_points))
         high_quality_points = [
             point for point in merged_points 
             if point.confidence_score >= 0.3  # Minimum kalite eşiği
@@ -585,6 +729,17 @@ class AdvancedDataMerger:
         """Veriyi farklı formatlarda export eder"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         base_path = self.output_dir / f"{base_filename}_{timestamp}"
+        formats = ['geojson', 'json', 'csv', 'db', 'sections', 'stats']
+        if HAS_CAMERA_INDEX:
+            formats.append('index')
+        written = []
+        
+        def format_written(name: str):
+            written.append(name)
+            self.progress('exporting', force=True, format=name, formats_written=list(written),
+                          formats_total=len(formats))
+        
+        self.progress('exporting', force=True, formats_written=[], formats_total=len(formats))
         
         # 1. GeoJSON Export
         geojson_data = {
@@ -614,11 +769,13 @@ class AdvancedDataMerger:
         
         with open(f"{base_path}.geojson", 'w', encoding='utf-8') as f:
             json.dump(geojson_data, f, ensure_ascii=False, indent=2)
+        format_written('geojson')
         
         # 2. JSON Export
         json_data = [asdict(point) for point in points]
         with open(f"{base_path}.json", 'w', encoding='utf-8') as f:
             json.dump(json_data, f, ensure_ascii=False, indent=2)
+        format_written('json')
         
         # 3. CSV Export
         if points:
@@ -628,14 +785,30 @@ class AdvancedDataMerger:
                 writer.writeheader()
                 for point in points:
                     writer.writerow(asdict(point))
+        format_written('csv')
         
         # 4. SQLite Export
         self.export_to_sqlite(points, f"{base_path}.db")
+        format_written('db')
         
-        # 5. Statistics Export
+        # 5. Kesit segment tablosu (JSON + SQLite)
+        sections = self.section_pairer.pair(points)
+        self.stats['section_segments'] = len(sections)
+        export_sections_json(sections, f"{base_path}_sections.json")
+        export_sections_sqlite(sections, f"{base_path}.db")
+        format_written('sections')
+        
+        # 6. Statistics Export
         self.export_statistics(points, f"{base_path}_stats.json")
+        format_written('stats')
+        
+        # 7. Paketlenmiş kamera indeksi (okuyucular GeoJSON ayrıştırmadan mmap ile eşler)
+        if HAS_CAMERA_INDEX:
+            CameraIndex.from_features(geojson_data['features'], file_sha256(Path(f"{base_path}.geojson"))).save(
+                str(index_path_for(f"{base_path}.geojson")))
+            format_written('index')
         
-        self.logger.info(f"Data exported to: {base_path}.[geojson|json|csv|db]")
+        self.logger.info(f"Data exported to: {base_path}.[geojson|json|csv|db] ({len(sections)} section segments)")
     
     def export_to_sqlite(self, points: List[EDSPoint], db_path: str):
         """SQLite veritabanına export eder"""
@@ -742,42 +915,47 @@ def main():
                        help='Minimum quality threshold (0.0-1.0)')
     parser.add_argument('--duplicate-threshold', type=float, default=0.1,
                        help='Duplicate detection distance threshold (km)')
+    parser.add_argument('--road-network',
+                       help='Optional road network (.osm or .geojson) for enrichment')
+    parser.add_argument('--snap-tolerance', type=float, default=30.0,
+                       help='Road snapping tolerance (m)')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose logging')
     
     args = parser.parse_args()
     
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    configure_logging(logging.DEBUG if args.verbose else logging.INFO)
     
     # Merger oluştur ve çalıştır
-    merger = AdvancedDataMerger(args.input_dir, args.output_dir)
+    engine = MergerEngine(args.road_network, args.snap_tolerance)
+    merger = engine.job(args.input_dir, args.output_dir)
     merger.duplicate_detector.distance_threshold = args.duplicate_threshold
     
-    try:
-        # Veri işleme
-        processed_points = merger.process_data()
-        
-        # Kalite filtreleme
-        high_quality_points = [
-            point for point in processed_points 
-            if point.confidence_score >= args.min_quality
-        ]
+    with merger.log_to_file():
+        try:
+            # Veri işleme
+            processed_points = merger.process_data()
+        
+            # Kalite filtreleme
+            high_quality_points = [
+                point for point in processed_points 
+                if point.confidence_score >= args.min_quality
+            ]
         
-        print(f"\n🎯 Processing Complete!")
-        print(f"📊 Final Dataset: {len(high_quality_points)} high-quality EDS points")
-        print(f"📍 Geographic Coverage: Turkey")
-        print(f"⭐ Average Quality Score: {sum(p.confidence_score for p in high_quality_points) / len(high_quality_points):.3f}")
+            print(f"\n🎯 Processing Complete!")
+            print(f"📊 Final Dataset: {len(high_quality_points)} high-quality EDS points")
+            print(f"📍 Geographic Coverage: Turkey")
+            print(f"⭐ Average Quality Score: {sum(p.confidence_score for p in high_quality_points) / len(high_quality_points):.3f}")
         
-        # Export
-        merger.export_data(high_quality_points)
+            # Export
+            merger.export_data(high_quality_points)
         
-        print(f"✅ All data exported to: {merger.output_dir}")
-        print(f"📁 Available formats: GeoJSON, JSON, CSV, SQLite")
+            print(f"✅ All data exported to: {merger.output_dir}")
+            print(f"📁 Available formats: GeoJSON, JSON, CSV, SQLite")
         
-    except Exception as e:
-        merger.logger.error(f"Processing failed: {e}")
-        sys.exit(1)
+        except Exception as e:
+            merger.logger.error(f"Processing failed: {e}")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Filo Uyarı Motoru - Fleet Proximity Alert Engine
+====================================================
+
+index.html içindeki ``checkProximityAlerts`` mantığının sunucu tarafı
+karşılığıdır. Binlerce aracın GPS konumlarını tek çağrıda toplu işler.
+
+Davranış (istemci ile aynı):
+- earlyAlert / mainAlert / finalAlert yarıçapları (varsayılan 1000/500/100m)
+- Her kamera, aracın bulunduğu en dar bölgenin seviyesinde uyarı üretir
+- ``hasRecentAlert`` bekleme süreleri: final 10s, main 30s, early 60s
+- Araç başına son 50 uyarı tutulur (alertHistory karşılığı)
+
+Farklar:
+- Uyarı geçmişi araç başına sabit boyutlu halka tamponlarda (ring buffer)
+  NumPy dizileri olarak tutulur
+- Aday kameralar uyarı ızgarasından (alert_grid.py) alınır, mesafeler
+  vektörel haversine ile hesaplanır
+- Opsiyonel yön filtresi: kamera ``direction`` ile araç yönü uyuşmazsa
+  uyarı üretilmez
+
+Gereksinim: pip install numpy
+"""
+
+import json
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+from alert_grid import AlertGrid, DEFAULT_CELL_SIZE_DEG
+from section_index import parse_direction
+from spatial_index import EARTH_RADIUS_M
+
+LEVEL_NONE, LEVEL_EARLY, LEVEL_MAIN, LEVEL_FINAL = 0, 1, 2, 3
+LEVEL_NAMES = {LEVEL_EARLY: 'early', LEVEL_MAIN: 'main', LEVEL_FINAL: 'final'}
+# index.html'deki alertLevel metinleri
+LEVEL_LABELS = {LEVEL_NONE: 'Güvenli', LEVEL_EARLY: 'Dikkat', LEVEL_MAIN: 'Uyarı', LEVEL_FINAL: 'Kritik'}
+
+
+@dataclass
+class AlertSettings:
+    """Uyarı yarıçapları ve bekleme süreleri (index.html varsayılanları)"""
+    early_alert: float = 1000.0
+    main_alert: float = 500.0
+    final_alert: float = 100.0
+    early_cooldown: float = 60.0
+    main_cooldown: float = 30.0
+    final_cooldown: float = 10.0
+    history_size: int = 50
+    heading_tolerance: Optional[float] = None  # derece; None ise yön filtresi kapalı
+
+
+@dataclass
+class AlertBatch:
+    """Bir toplu işlemin sonucu"""
+    alert_level: np.ndarray     # konum başına en yüksek seviye (0-3)
+    fix_index: np.ndarray       # üretilen uyarıların konum indeksi
+    camera_index: np.ndarray    # üretilen uyarıların kamera indeksi
+    level: np.ndarray           # üretilen uyarıların seviyesi (1-3)
+    distance_m: np.ndarray      # üretilen uyarıların mesafesi
+    candidates: int             # mesafesi hesaplanan (konum, kamera) çifti sayısı
+
+    def __len__(self) -> int:
+        return len(self.fix_index)
+
+    def to_records(self, engine: 'AlertEngine', vehicle_ids: Sequence[Hashable]) -> List[Dict[str, Any]]:
+        """Uyarıları okunabilir sözlük listesine çevirir"""
+        return [
+            {
+                'vehicle_id': vehicle_ids[f],
+                'camera_id': engine.camera_ids[c],
+                'level': LEVEL_NAMES[int(l)],
+                'distance_m': round(float(d), 1)
+            }
+            for f, c, l, d in zip(self.fix_index, self.camera_index, self.level, self.distance_m)
+        ]
+
+
+class AlertEngine:
+    """Toplu GPS konumları için vektörel yakınlık uyarı motoru"""
+
+    def __init__(self, cameras: List[Dict[str, Any]], settings: Optional[AlertSettings] = None,
+                 cell_size: float = DEFAULT_CELL_SIZE_DEG):
+        self.settings = settings or AlertSettings()
+        s = self.settings
+
+        self.camera_ids = [c.get('id') for c in cameras]
+        lats = np.array([c['lat'] for c in cameras], dtype=np.float64)
+        lngs = np.array([c['lng'] for c in cameras], dtype=np.float64)
+        self.cam_lat = np.radians(lats)
+        self.cam_lng = np.radians(lngs)
+        self.cam_cos_lat = np.cos(self.cam_lat)
+        self.cam_heading = np.array(
+            [np.nan if parse_direction(c.get('direction')) is None else parse_direction(c.get('direction'))
+             for c in cameras], dtype=np.float64)
+
+        grid = AlertGrid.build(list(zip(lats.tolist(), lngs.tolist())), cell_size, s.early_alert)
+        self.grid = grid
+        self.cell_keys = np.array(grid.keys, dtype=np.int64)
+        self.cell_offsets = np.array(grid.offsets, dtype=np.int64)
+        self.cell_indices = np.array(grid.indices, dtype=np.int32)
+
+        self.cooldowns = np.array([0.0, s.early_cooldown, s.main_cooldown, s.final_cooldown])
+
+        # Araç slotları ve halka tamponlar
+        self.vehicle_slots: Dict[Hashable, int] = {}
+        self._allocate(256)
+
+    @classmethod
+    def from_geojson(cls, path: str, settings: Optional[AlertSettings] = None,
+                     cell_size: float = DEFAULT_CELL_SIZE_DEG) -> 'AlertEngine':
+        """Yayınlanmış GeoJSON'dan motor oluşturur"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        cameras = [
+            {
+                'id': feature['properties'].get('id'),
+                'lat': feature['geometry']['coordinates'][1],
+                'lng': feature['geometry']['coordinates'][0],
+                'direction': feature['properties'].get('direction')
+            }
+            for feature in data.get('features', [])
+        ]
+        return cls(cameras, settings, cell_size)
+
+    def _allocate(self, capacity: int):
+        """Halka tamponları verilen araç kapasitesine büyütür"""
+        size = self.settings.history_size
+        old = getattr(self, 'ring_camera', None)
+
+        ring_camera = np.full((capacity, size), -1, dtype=np.int32)
+        ring_level = np.zeros((capacity, size), dtype=np.int8)
+        ring_time = np.full((capacity, size), -np.inf, dtype=np.float64)
+        ring_head = np.zeros(capacity, dtype=np.int32)
+
+        if old is not None:
+            count = len(old)
+            ring_camera[:count] = self.ring_camera
+            ring_level[:count] = self.ring_level
+            ring_time[:count] = self.ring_time
+            ring_head[:count] = self.ring_head
+
+        self.ring_camera = ring_camera
+        self.ring_level = ring_level
+        self.ring_time = ring_time
+        self.ring_head = ring_head
+
+    def _slots_for(self, vehicle_ids: Sequence[Hashable]) -> np.ndarray:
+        """Araç kimliklerini halka tampon satırlarına çevirir"""
+        slots = self.vehicle_slots
+        result = np.empty(len(vehicle_ids), dtype=np.int64)
+        for i, vehicle_id in enumerate(vehicle_ids):
+            slot = slots.get(vehicle_id)
+            if slot is None:
+                slot = slots[vehicle_id] = len(slots)
+            result[i] = slot
+
+        if len(slots) > len(self.ring_head):
+            self._allocate(max(len(slots), len(self.ring_head) * 2))
+        return result
+
+    def reset_vehicle(self, vehicle_id: Hashable):
+        """Aracın uyarı geçmişini temizler"""
+        slot = self.vehicle_slots.get(vehicle_id)
+        if slot is not None:
+            self.ring_camera[slot] = -1
+            self.ring_time[slot] = -np.inf
+            self.ring_head[slot] = 0
+
+    def _candidate_pairs(self, lats: np.ndarray, lngs: np.ndarray):
+        """Konumların hücrelerindeki (konum, kamera) aday çiftlerini üretir"""
+        grid = self.grid
+        n = len(lats)
+        if not len(self.cell_keys):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+        rows = np.floor((lats - grid.origin_lat) / grid.cell_size).astype(np.int64)
+        cols = np.floor((lngs - grid.origin_lng) / grid.cell_size).astype(np.int64)
+        inside = (rows >= 0) & (rows < grid.rows) & (cols >= 0) & (cols < grid.cols)
+        keys = np.where(inside, rows * grid.cols + cols, -1)
+
+        pos = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        found = inside & (self.cell_keys[pos] == keys)
+        starts = np.where(found, self.cell_offsets[pos], 0)
+        counts = np.where(found, self.cell_offsets[pos + 1] - starts, 0)
+
+        total = int(counts.sum())
+        fix_index = np.repeat(np.arange(n), counts)
+        # Her çiftin cell_indices içindeki konumu: hücre başı + çift sırası
+        group_start = np.cumsum(counts) - counts
+        flat = np.arange(total) + np.repeat(starts - group_start, counts)
+        return fix_index, self.cell_indices[flat]
+
+    def process_batch(self, vehicle_ids: Sequence[Hashable], lats, lngs, timestamps,
+                      headings=None) -> AlertBatch:
+        """
+        Bir grup GPS konumunu işler ve üretilen uyarıları döner
+
+        Args:
+            vehicle_ids: Konum başına araç kimliği
+            lats, lngs: Konum koordinatları (derece)
+            timestamps: Konum zamanları (saniye, araç bazında artan)
+            headings: Opsiyonel araç yönleri (derece, bilinmiyorsa NaN)
+        """
+        s = self.settings
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        n = len(lats)
+        slots = self._slots_for(vehicle_ids)
+
+        # 1. Izgara adayları
+        fix_index, camera_index = self._candidate_pairs(lats, lngs)
+        candidate_count = len(fix_index)
+
+        # 2. Vektörel haversine
+        lat1 = np.radians(lats)[fix_index]
+        lng1 = np.radians(lngs)[fix_index]
+        lat2 = self.cam_lat[camera_index]
+        a = (np.sin((lat2 - lat1) * 0.5) ** 2 +
+             np.cos(lat1) * self.cam_cos_lat[camera_index] *
+             np.sin((self.cam_lng[camera_index] - lng1) * 0.5) ** 2)
+        distance = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        level = np.where(distance <= s.final_alert, LEVEL_FINAL,
+                         np.where(distance <= s.main_alert, LEVEL_MAIN,
+                                  np.where(distance <= s.early_alert, LEVEL_EARLY, LEVEL_NONE)))
+        hit = level > LEVEL_NONE
+
+        # 3. Opsiyonel yön filtresi
+        if headings is not None and s.heading_tolerance is not None:
+            vehicle_heading = np.asarray(headings, dtype=np.float64)[fix_index]
+            camera_heading = self.cam_heading[camera_index]
+            diff = np.abs(vehicle_heading - camera_heading) % 360.0
+            diff = np.minimum(diff, 360.0 - diff)
+            # Yönü bilinmeyen araç veya kamera filtrelenmez (NaN karşılaştırması False)
+            hit &= ~(diff > s.heading_tolerance)
+
+        fix_index = fix_index[hit]
+        camera_index = camera_index[hit]
+        level = level[hit].astype(np.int8)
+        distance = distance[hit]
+
+        alert_level = np.zeros(n, dtype=np.int8)
+        np.maximum.at(alert_level, fix_index, level)
+
+        # 4. Bekleme süresi kontrolü (hasRecentAlert)
+        vehicle = slots[fix_index]
+        t = timestamps[fix_index]
+        recent = ((self.ring_camera[vehicle] == camera_index[:, None]) &
+                  (self.ring_level[vehicle] == level[:, None]) &
+                  ((t[:, None] - self.ring_time[vehicle]) < self.cooldowns[level][:, None])).any(axis=1)
+
+        fire = np.flatnonzero(~recent)
+        fire = self._dedupe_in_batch(fire, vehicle, camera_index, level, t)
+
+        # 5. Uyarıları halka tamponlara yaz (addAlertHistory)
+        self._record(vehicle[fire], camera_index[fire], level[fire], t[fire])
+
+        return AlertBatch(alert_level, fix_index[fire], camera_index[fire],
+                          level[fire], distance[fire], candidate_count)
+
+    def _dedupe_in_batch(self, fire: np.ndarray, vehicle: np.ndarray, camera: np.ndarray,
+                         level: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Aynı batch içinde tekrar eden (araç, kamera, seviye) uyarılarını eler"""
+        if len(fire) < 2:
+            return fire
+
+        order = fire[np.lexsort((t[fire], level[fire], camera[fire], vehicle[fire]))]
+        same = ((vehicle[order[1:]] == vehicle[order[:-1]]) &
+                (camera[order[1:]] == camera[order[:-1]]) &
+                (level[order[1:]] == level[order[:-1]]))
+        if not same.any():
+            return fire
+
+        # Çoklu gruplar sıralı taranır; tipik batch'te araç başına tek konum olur
+        keep = np.ones(len(order), dtype=bool)
+        last_fired = t[order[0]]
+        for i in range(1, len(order)):
+            if not same[i - 1]:
+                last_fired = t[order[i]]
+                continue
+            if t[order[i]] - last_fired < self.cooldowns[level[order[i]]]:
+                keep[i] = False
+            else:
+                last_fired = t[order[i]]
+
+        return np.sort(order[keep])
+
+    def _record(self, vehicle: np.ndarray, camera: np.ndarray, level: np.ndarray, t: np.ndarray):
+        """Uyarıları araçların halka tamponlarına zaman sırasıyla ekler"""
+        if not len(vehicle):
+            return
+
+        order = np.lexsort((t, vehicle))
+        vehicle, camera, level, t = vehicle[order], camera[order], level[order], t[order]
+
+        # Aynı araç için batch içi sıra numarası
+        first = np.r_[0, np.flatnonzero(vehicle[1:] != vehicle[:-1]) + 1]
+        rank = np.arange(len(vehicle)) - np.repeat(first, np.diff(np.r_[first, len(vehicle)]))
+        position = (self.ring_head[vehicle] + rank) % self.settings.history_size
+
+        self.ring_camera[vehicle, position] = camera
+        self.ring_level[vehicle, position] = level
+        self.ring_time[vehicle, position] = t
+        np.add.at(self.ring_head, vehicle, 1)
+        self.ring_head[vehicle] %= self.settings.history_size
+
+
+def run_benchmark(engine: AlertEngine, vehicles: int, batches: int, seed: int = 42) -> Dict[str, float]:
+    """Kameralar çevresinde dolaşan sentetik araçlarla throughput ölçer"""
+    rng = np.random.default_rng(seed)
+    cam_lat = np.degrees(engine.cam_lat)
+    cam_lng = np.degrees(engine.cam_lng)
+
+    start_idx = rng.integers(0, len(cam_lat), vehicles)
+    lats = cam_lat[start_idx] + rng.uniform(-0.02, 0.02, vehicles)
+    lngs = cam_lng[start_idx] + rng.uniform(-0.02, 0.02, vehicles)
+    step_lat = rng.uniform(-0.0003, 0.0003, vehicles)  # ~30m / saniye
+    step_lng = rng.uniform(-0.0003, 0.0003, vehicles)
+    headings = (np.degrees(np.arctan2(step_lng, step_lat)) + 360.0) % 360.0
+    vehicle_ids = list(range(vehicles))
+
+    alerts = 0
+    candidates = 0
+    elapsed = 0.0
+    for batch in range(batches):
+        timestamps = np.full(vehicles, float(batch))
+        start = time.perf_counter()
+        result = engine.process_batch(vehicle_ids, lats, lngs, timestamps, headings)
+        elapsed += time.perf_counter() - start
+        alerts += len(result)
+        candidates += result.candidates
+        lats = lats + step_lat
+        lngs = lngs + step_lng
+
+    updates = vehicles * batches
+    return {
+        'updates': updates,
+        'updates_per_second': updates / elapsed if elapsed else float('inf'),
+        'alerts': alerts,
+        'avg_candidates': candidates / updates
+    }
+
+
+def main():
+    """Benchmark komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Fleet Alert Engine benchmark')
+    parser.add_argument('geojson', help='Published EDS GeoJSON file')
+    parser.add_argument('--vehicles', type=int, default=5000, help='Vehicles per batch')
+    parser.add_argument('--batches', type=int, default=60, help='Number of batches (1s apart)')
+    parser.add_argument('--heading-tolerance', type=float,
+                        help='Enable heading filter with this tolerance (degrees)')
+    args = parser.parse_args()
+
+    settings = AlertSettings(heading_tolerance=args.heading_tolerance)
+    engine = AlertEngine.from_geojson(args.geojson, settings)
+    result = run_benchmark(engine, args.vehicles, args.batches)
+
+    print(f"🚚 {args.vehicles} araç x {args.batches} batch = {result['updates']:,} konum")
+    print(f"⚡ {result['updates_per_second']:,.0f} konum/saniye")
+    print(f"🚨 {result['alerts']:,} uyarı, konum başına ort. {result['avg_candidates']:.1f} aday")
+
+
+if __name__ == "__main__":
+    main()
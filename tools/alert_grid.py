@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Uyarı Bölgesi Izgarası - Alert Zone Lookup Grid
+===================================================
+
+Yayınlanan GeoJSON için sabit hücre boyutlu bir ızgara üretir. Her hücre,
+erken uyarı (earlyAlert) yarıçapı o hücreye taşan kameraların indekslerini
+listeler. İstemci her GPS konumunda yalnızca bulunduğu hücredeki birkaç
+aday kameraya mesafe hesaplar.
+
+Izgara CSR (sıkıştırılmış satır) biçiminde saklanır:
+- keys:    dolu hücre anahtarları (satır * sütun_sayısı + sütun), artan sırada
+- offsets: her hücrenin indices içindeki başlangıcı (len(keys) + 1 eleman)
+- indices: GeoJSON features sırasındaki kamera indeksleri
+
+Usage:
+    python alert_grid.py build ../data/eds-locations.geojson
+    python alert_grid.py bench ../data/eds-locations.geojson --fixes 100000
+"""
+
+import json
+import math
+import random
+import sys
+import time
+import argparse
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent))
+from spatial_index import METERS_PER_DEGREE, degree_margins, haversine_m
+
+# index.html ayarlarındaki earlyAlert kaydırıcısının üst sınırı (m);
+# ızgara bu yarıçapla kurulursa her kullanıcı ayarı için geçerli kalır
+DEFAULT_ALERT_RADIUS_M = 2000.0
+DEFAULT_CELL_SIZE_DEG = 0.02
+# Eşdikdörtgen yaklaşım ile haversine arasındaki farkı örtmek için pay
+RADIUS_SAFETY_FACTOR = 1.01
+GRID_FORMAT_VERSION = 1
+
+
+class AlertGrid:
+    """Kamera uyarı yarıçaplarını hücrelere dağıtan arama ızgarası"""
+
+    def __init__(self, origin_lat: float, origin_lng: float, cell_size: float,
+                 cols: int, rows: int, radius_m: float, count: int,
+                 keys: List[int], offsets: List[int], indices: List[int]):
+        self.origin_lat = origin_lat
+        self.origin_lng = origin_lng
+        self.cell_size = cell_size
+        self.cols = cols
+        self.rows = rows
+        self.radius_m = radius_m
+        self.count = count
+        self.keys = keys
+        self.offsets = offsets
+        self.indices = indices
+
+    @classmethod
+    def build(cls, coords: List[Tuple[float, float]],
+              cell_size: float = DEFAULT_CELL_SIZE_DEG,
+              radius_m: float = DEFAULT_ALERT_RADIUS_M) -> 'AlertGrid':
+        """
+        (lat, lng) listesinden ızgara oluşturur
+
+        Bir kamera, hücre dikdörtgenine olan en kısa mesafesi yarıçaptan
+        küçükse o hücreye eklenir; yarıçap daireleri bu nedenle köşe
+        hücrelere gereksiz yere taşmaz.
+        """
+        reach_m = radius_m * RADIUS_SAFETY_FACTOR
+        if coords:
+            margin_lat = reach_m / METERS_PER_DEGREE
+            max_margin_lng = max(degree_margins(lat, reach_m)[1] for lat, _ in coords)
+            origin_lat = math.floor((min(lat for lat, _ in coords) - margin_lat) / cell_size) * cell_size
+            origin_lng = math.floor((min(lng for _, lng in coords) - max_margin_lng) / cell_size) * cell_size
+            rows = int((max(lat for lat, _ in coords) + margin_lat - origin_lat) / cell_size) + 1
+            cols = int((max(lng for _, lng in coords) + max_margin_lng - origin_lng) / cell_size) + 1
+        else:
+            origin_lat = origin_lng = 0.0
+            rows = cols = 0
+
+        cells: Dict[int, List[int]] = {}
+        for index, (lat, lng) in enumerate(coords):
+            dlat, dlng = degree_margins(lat, reach_m)
+            kx = math.cos(math.radians(lat)) * METERS_PER_DEGREE
+
+            row_start = int((lat - dlat - origin_lat) / cell_size)
+            row_end = int((lat + dlat - origin_lat) / cell_size)
+            col_start = int((lng - dlng - origin_lng) / cell_size)
+            col_end = int((lng + dlng - origin_lng) / cell_size)
+
+            for row in range(row_start, row_end + 1):
+                cell_min_lat = origin_lat + row * cell_size
+                dy = max(cell_min_lat - lat, 0.0, lat - cell_min_lat - cell_size) * METERS_PER_DEGREE
+                for col in range(col_start, col_end + 1):
+                    cell_min_lng = origin_lng + col * cell_size
+                    dx = max(cell_min_lng - lng, 0.0, lng - cell_min_lng - cell_size) * kx
+                    if dx * dx + dy * dy <= reach_m * reach_m:
+                        cells.setdefault(row * cols + col, []).append(index)
+
+        keys = sorted(cells)
+        offsets = [0]
+        indices: List[int] = []
+        for key in keys:
+            indices.extend(cells[key])
+            offsets.append(len(indices))
+
+        return cls(origin_lat, origin_lng, cell_size, cols, rows, radius_m,
+                   len(coords), keys, offsets, indices)
+
+    def cell_key(self, lat: float, lng: float) -> Optional[int]:
+        """Koordinatın hücre anahtarını döner; ızgara dışındaysa None"""
+        row = math.floor((lat - self.origin_lat) / self.cell_size)
+        col = math.floor((lng - self.origin_lng) / self.cell_size)
+        if row < 0 or col < 0 or row >= self.rows or col >= self.cols:
+            return None
+        return row * self.cols + col
+
+    def candidates(self, lat: float, lng: float) -> List[int]:
+        """Konumun hücresindeki aday kamera indekslerini döner"""
+        key = self.cell_key(lat, lng)
+        if key is None:
+            return []
+
+        pos = bisect_left(self.keys, key)
+        if pos == len(self.keys) or self.keys[pos] != key:
+            return []
+        return self.indices[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def to_dict(self) -> Dict:
+        """JSON serileştirme için sözlük döner"""
+        return {
+            "version": GRID_FORMAT_VERSION,
+            "origin": [self.origin_lat, self.origin_lng],
+            "cellSize": self.cell_size,
+            "cols": self.cols,
+            "rows": self.rows,
+            "radius": self.radius_m,
+            "count": self.count,
+            "keys": self.keys,
+            "offsets": self.offsets,
+            "indices": self.indices
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'AlertGrid':
+        """to_dict çıktısından ızgarayı yeniden oluşturur"""
+        return cls(data['origin'][0], data['origin'][1], data['cellSize'],
+                   data['cols'], data['rows'], data['radius'], data['count'],
+                   data['keys'], data['offsets'], data['indices'])
+
+    def save(self, path: str):
+        """Izgarayı kompakt JSON olarak yazar"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str) -> 'AlertGrid':
+        """Kaydedilmiş ızgarayı okur"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_coords(geojson_path: str) -> List[Tuple[float, float]]:
+    """GeoJSON özelliklerinin (lat, lng) listesini features sırasıyla döner"""
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [(feature['geometry']['coordinates'][1], feature['geometry']['coordinates'][0])
+            for feature in data.get('features', [])]
+
+
+def grid_path_for(geojson_path: str) -> Path:
+    """GeoJSON dosyasının yanındaki ızgara dosyasının yolu"""
+    path = Path(geojson_path)
+    stem = path.name[:-len('.geojson')] if path.name.endswith('.geojson') else path.stem
+    return path.with_name(f"{stem}.grid.json")
+
+
+def build_for_geojson(geojson_path: str, cell_size: float = DEFAULT_CELL_SIZE_DEG,
+                      radius_m: float = DEFAULT_ALERT_RADIUS_M) -> Path:
+    """GeoJSON için ızgarayı oluşturup yanına kaydeder"""
+    grid = AlertGrid.build(load_coords(geojson_path), cell_size, radius_m)
+    output_path = grid_path_for(geojson_path)
+    grid.save(str(output_path))
+    return output_path
+
+
+def brute_force_in_range(coords: List[Tuple[float, float]], lat: float, lng: float,
+                         radius_m: float) -> List[int]:
+    """Tüm kameraları tarayarak yarıçap içindekileri bulur (referans)"""
+    return [i for i, (clat, clng) in enumerate(coords)
+            if haversine_m(lat, lng, clat, clng) <= radius_m]
+
+
+def grid_in_range(grid: AlertGrid, coords: List[Tuple[float, float]],
+                  lat: float, lng: float, radius_m: float) -> List[int]:
+    """Izgara adaylarını tarayarak yarıçap içindekileri bulur"""
+    return [i for i in grid.candidates(lat, lng)
+            if haversine_m(lat, lng, coords[i][0], coords[i][1]) <= radius_m]
+
+
+def run_benchmark(coords: List[Tuple[float, float]], grid: AlertGrid,
+                  fixes: int, radius_m: float, seed: int = 42) -> Dict:
+    """Izgara ile kaba kuvvet taramayı aynı GPS konumları üzerinde karşılaştırır"""
+    rng = random.Random(seed)
+    # Konumların çoğu kameraların çevresinden, kalanı rastgele
+    positions = []
+    for _ in range(fixes):
+        if coords and rng.random() < 0.8:
+            lat, lng = coords[rng.randrange(len(coords))]
+            positions.append((lat + rng.uniform(-0.02, 0.02), lng + rng.uniform(-0.02, 0.02)))
+        else:
+            positions.append((rng.uniform(35.8, 42.2), rng.uniform(25.7, 44.8)))
+
+    start = time.perf_counter()
+    expected = [brute_force_in_range(coords, lat, lng, radius_m) for lat, lng in positions]
+    brute_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [grid_in_range(grid, coords, lat, lng, radius_m) for lat, lng in positions]
+    grid_time = time.perf_counter() - start
+
+    candidate_sizes = [len(grid.candidates(lat, lng)) for lat, lng in positions]
+    mismatches = sum(1 for a, b in zip(expected, actual) if sorted(a) != sorted(b))
+
+    return {
+        'fixes': fixes,
+        'cameras': len(coords),
+        'brute_force_us_per_fix': brute_time / fixes * 1e6,
+        'grid_us_per_fix': grid_time / fixes * 1e6,
+        'speedup': brute_time / grid_time if grid_time else float('inf'),
+        'avg_candidates': sum(candidate_sizes) / fixes,
+        'max_candidates': max(candidate_sizes),
+        'mismatches': mismatches
+    }
+
+
+def main():
+    """Izgara oluşturma ve benchmark komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Alert Zone Lookup Grid')
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('geojson', help='Published EDS GeoJSON file')
+    parser.add_argument('--cell-size', type=float, default=DEFAULT_CELL_SIZE_DEG,
+                        help='Grid cell size in degrees')
+    parser.add_argument('--radius', type=float, default=DEFAULT_ALERT_RADIUS_M,
+                        help='Early alert radius covered by the grid (m)')
+    parser.add_argument('--fixes', type=int, default=20000,
+                        help='Number of simulated GPS fixes for the benchmark')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        output_path = build_for_geojson(args.geojson, args.cell_size, args.radius)
+        grid = AlertGrid.load(str(output_path))
+        print(f"✅ Izgara oluşturuldu: {output_path}")
+        print(f"📊 {len(grid.keys)} dolu hücre, {len(grid.indices)} hücre-kamera kaydı, "
+              f"{output_path.stat().st_size / 1024:.1f}KB")
+        return
+
+    coords = load_coords(args.geojson)
+    start = time.perf_counter()
+    grid = AlertGrid.build(coords, args.cell_size, args.radius)
+    build_time = time.perf_counter() - start
+
+    result = run_benchmark(coords, grid, args.fixes, args.radius)
+    print(f"🧪 {result['cameras']} kamera, {result['fixes']} GPS konumu "
+          f"(ızgara kurulumu {build_time * 1000:.1f}ms)")
+    print(f"   Kaba kuvvet : {result['brute_force_us_per_fix']:.1f} µs/konum")
+    print(f"   Izgara      : {result['grid_us_per_fix']:.1f} µs/konum "
+          f"({result['speedup']:.0f}x hızlı)")
+    print(f"   Aday sayısı : ort. {result['avg_candidates']:.1f}, maks. {result['max_candidates']}")
+    print(f"   Uyuşmazlık  : {result['mismatches']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Kamera Sorgu İndeksi - Camera Query Index
+=============================================
+
+Yayınlanmış veri setini (data/eds-locations.geojson) sütun bazlı NumPy
+dizileri olarak tutar ve web sunucusunun ``/api/cameras`` uç noktası için
+alan sorgularını yanıtlar. İndeks ayrıştırma gerektirmeyen paketlenmiş bir
+dosyaya (``.index.bin``) yazılabilir; okuyucular dosyayı mmap ile eşler.
+
+Sorgular:
+    bbox=güney,batı,kuzey,doğu        -> dikdörtgen içindeki kameralar
+    near=lat,lng&radius=m             -> yarıçap içindekiler (mesafeye göre sıralı)
+    near=lat,lng&k=N                  -> en yakın N kamera
+    type=OHITS,TEDES                  -> tür filtresi (diğerleriyle birleşir)
+    limit=N                           -> en fazla N satır (varsayılan 500; k ile en yakın min(N, k))
+
+Yanıttaki ``truncated``, limit yüzünden eşleşmelerin bir kısmının
+döndürülmediğini belirtir; k sorgusunda eşleşme kümesi en yakın k kameradır
+(limit < k ise ve k'dan az kamera döndüyse true).
+
+Yapı:
+- Noktalar sabit boyutlu derece ızgarasının satır-öncelikli hücre anahtarına
+  göre sıralanır; bir ızgara satırındaki hücre aralığı dizide tek bir
+  kesittir (searchsorted ile bulunur)
+- bbox sorgusu satır kesitlerini sırayla tarar, limit dolunca durur
+- Yarıçap sorgusu kesitlerden aday alır, mesafeyi vektörel haversine ile
+  hesaplar; en yakın N sorgusu kutuyu yeterli aday bulunana kadar büyütür
+- Metin alanları sözlük kodludur; satırlar yalnızca yanıt için üretilir
+- Veri dosyası değişince (yeni sürüm yayınlandığında) indeks yeniden yüklenir
+
+Paketlenmiş indeks (birleştirici ve release_publisher.py üretir):
+- Başlık (JSON): ızgara parametreleri, sözlükler, dizi konumları
+- Ham diziler 64 bayt hizalı: hücre anahtarı, koordinatlar, cos(enlem),
+  id ofsetleri + UTF-8 id bloğu, alan kodları, türe göre konumlar
+- Okuyucular kopyalamadan eşler; tüm süreçler tek kopyayı sayfa önbelleği
+  üzerinden paylaşır
+
+Gereksinim: pip install numpy
+
+Usage:
+    python camera_index.py pack ../data/eds-locations.geojson
+    python camera_index.py bench --points 1000000        # sentetik 1M nokta
+    python camera_index.py bench ../data/eds-locations.index.bin
+"""
+
+import gc
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+from result_cache import file_sha256
+from spatial_index import EARTH_RADIUS_M, METERS_PER_DEGREE, degree_margins
+from tile_publisher import CLIENT_FIELDS
+
+INDEX_FORMAT_VERSION = 1
+DEFAULT_DATASET = Path(__file__).parent.parent / "data" / "eds-locations.geojson"
+INDEX_SUFFIX = '.index.bin'
+PACK_MAGIC = b'EDSCIDX\x00'
+PACK_ALIGN = 64
+DEFAULT_CELL_SIZE_DEG = 0.05
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+MAX_K = 1000
+DEFAULT_RADIUS_M = 1000.0
+MAX_RADIUS_M = 100000.0
+RELOAD_CHECK_S = 1.0
+
+
+class QueryError(ValueError):
+    """Geçersiz sorgu parametresi"""
+
+
+@dataclass(frozen=True)
+class CameraQuery:
+    """Ayrıştırılmış /api/cameras sorgusu"""
+    bbox: Optional[Tuple[float, float, float, float]] = None  # güney, batı, kuzey, doğu
+    near: Optional[Tuple[float, float]] = None
+    radius: Optional[float] = None
+    k: Optional[int] = None
+    types: Tuple[str, ...] = ()
+    limit: int = DEFAULT_LIMIT
+
+    def cache_key(self) -> str:
+        """Sorgunun kanonik özeti (ETag için)"""
+        return hashlib.sha256(repr(self).encode()).hexdigest()[:16]
+
+
+def _floats(value: str, count: int, name: str) -> List[float]:
+    try:
+        numbers = [float(part) for part in value.split(',')]
+    except ValueError:
+        raise QueryError(f"{name} must be {count} comma separated numbers")
+    if len(numbers) != count or not all(math.isfinite(n) for n in numbers):
+        raise QueryError(f"{name} must be {count} comma separated numbers")
+    return numbers
+
+
+def _int(value: str, name: str, low: int, high: int) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+    if not low <= number <= high:
+        raise QueryError(f"{name} must be between {low} and {high}")
+    return number
+
+
+def parse_query(args: Mapping[str, str]) -> CameraQuery:
+    """İstek parametrelerini doğrular; hatalıysa QueryError fırlatır"""
+    bbox = near = radius = k = None
+
+    if args.get('bbox'):
+        south, west, north, east = _floats(args['bbox'], 4, 'bbox')
+        if south > north or west > east:
+            raise QueryError("bbox must be south,west,north,east")
+        bbox = (south, west, north, east)
+
+    if args.get('near'):
+        lat, lng = _floats(args['near'], 2, 'near')
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise QueryError("near must be a valid lat,lng")
+        near = (lat, lng)
+
+    if args.get('radius'):
+        radius = _floats(args['radius'], 1, 'radius')[0]
+        if not 0 < radius <= MAX_RADIUS_M:
+            raise QueryError(f"radius must be between 0 and {MAX_RADIUS_M:.0f} meters")
+    if args.get('k'):
+        k = _int(args['k'], 'k', 1, MAX_K)
+
+    if (radius is not None or k is not None) and near is None:
+        raise QueryError("radius and k require near=lat,lng")
+    if bbox is not None and near is not None:
+        raise QueryError("bbox and near cannot be combined")
+    if near is not None and radius is None and k is None:
+        radius = DEFAULT_RADIUS_M
+
+    types = tuple(sorted({t.strip() for t in args.get('type', '').split(',') if t.strip()}))
+    if bbox is None and near is None and not types:
+        raise QueryError("One of bbox, near or type is required")
+    limit = _int(args['limit'], 'limit', 1, MAX_LIMIT) if args.get('limit') else DEFAULT_LIMIT
+    if k is not None:
+        limit = min(limit, k)
+
+    return CameraQuery(bbox=bbox, near=near, radius=radius, k=k, types=types, limit=limit)
+
+
+def _dictionary(values: List[Any]) -> Tuple[List[Any], np.ndarray]:
+    """Değer listesini (sözlük, kod dizisi) çiftine çevirir"""
+    lookup: Dict[Any, int] = {}
+    codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values),
+                        dtype=np.int32, count=len(values))
+    return list(lookup), codes
+
+
+def _code_dtype(size: int) -> str:
+    """Sözlük boyutuna yeten en küçük kod tipi"""
+    if size <= 0xFF:
+        return '<u1'
+    if size <= 0xFFFF:
+        return '<u2'
+    return '<i4'
+
+
+def _part1by1(values: np.ndarray) -> np.ndarray:
+    """16 bitlik tamsayıların bitlerini birer boşlukla ayırır (Z-order için)"""
+    x = values.astype(np.uint64) & np.uint64(0xFFFF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x00FF00FF)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x33333333)
+    x = (x | (x << np.uint64(1))) & np.uint64(0x55555555)
+    return x
+
+
+def z_order(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """Koordinatların veri kapsamı içindeki Z-order (Morton) sırası"""
+    if not len(lat):
+        return np.empty(0, dtype=np.uint64)
+    span_lat = max(float(lat.max() - lat.min()), 1e-9)
+    span_lng = max(float(lng.max() - lng.min()), 1e-9)
+    y = ((lat - lat.min()) / span_lat * 0xFFFF).astype(np.uint64)
+    x = ((lng - lng.min()) / span_lng * 0xFFFF).astype(np.uint64)
+    return _part1by1(x) | (_part1by1(y) << np.uint64(1))
+
+
+class CameraIndex:
+    """
+    Hücre anahtarına göre sıralı, sütun bazlı kamera indeksi
+
+    Diziler bellekte (build) ya da paketlenmiş indeks dosyasından salt okunur
+    mmap görünümleri (load) olarak tutulur; sorgu kodu ikisi için aynıdır.
+    """
+
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, Any]):
+        self.version = meta['dataset']
+        self.cell_size = meta['cell_size']
+        self.origin_lat, self.origin_lng = meta['origin']
+        self.rows_n, self.cols_n = meta['grid']
+        self.fields = meta['fields']
+        self.dictionaries: Dict[str, List[Any]] = meta['dictionaries']
+
+        self.keys = arrays['keys']
+        self.lat = arrays['lat']
+        self.lng = arrays['lng']
+        self.cos_lat = arrays['cos_lat']
+        self.id_offsets = arrays['id_offsets']
+        self.id_blob = arrays['id_blob']
+        self.codes: Dict[str, np.ndarray] = {field: arrays[f"codes.{field}"] for field in self.dictionaries}
+
+        self.type_codes = {value: code for code, value in enumerate(self.dictionaries['type'])}
+        # Yalnızca tür filtreli sorgular için: tür -> sıralı konumlar
+        type_order, type_offsets = arrays['type_order'], arrays['type_offsets']
+        self.type_positions = {value: type_order[type_offsets[code]:type_offsets[code + 1]]
+                               for value, code in self.type_codes.items()}
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @classmethod
+    def build(cls, lat: np.ndarray, lng: np.ndarray, columns: Dict[str, List[Any]],
+              version: str = '', cell_size: float = DEFAULT_CELL_SIZE_DEG) -> 'CameraIndex':
+        """
+        Sütunlardan indeks kurar
+
+        Noktalar ızgara hücresine (satır öncelikli), hücre içinde Z-order
+        sırasına göre dizilir; yakın kameralar dizide de yakın durur.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        count = len(lat)
+        if count:
+            origin_lat, origin_lng = float(lat.min()), float(lng.min())
+            rows_n = int((lat.max() - origin_lat) / cell_size) + 1
+            cols_n = int((lng.max() - origin_lng) / cell_size) + 1
+        else:
+            origin_lat = origin_lng = 0.0
+            rows_n = cols_n = 0
+
+        row = ((lat - origin_lat) / cell_size).astype(np.int64)
+        col = ((lng - origin_lng) / cell_size).astype(np.int64)
+        keys = row * cols_n + col
+        order = np.lexsort((z_order(lat, lng), keys))
+
+        # id'ler tek bir UTF-8 bloğunda, ofset dizisiyle (None -> boş)
+        encoded = [b'' if columns['id'][i] is None else str(columns['id'][i]).encode('utf-8')
+                   for i in order.tolist()]
+        id_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=id_offsets[1:])
+
+        fields = [field for field, _ in CLIENT_FIELDS]
+        dictionaries: Dict[str, List[Any]] = {}
+        arrays: Dict[str, Any] = {
+            'keys': keys[order],
+            'lat': lat[order],
+            'lng': lng[order],
+            'cos_lat': np.cos(np.radians(lat[order])),
+            'id_offsets': id_offsets,
+            'id_blob': b''.join(encoded)
+        }
+        for field in fields:
+            if field in ('id', 'lat', 'lng'):
+                continue
+            values, codes = _dictionary(columns[field])
+            dictionaries[field] = values
+            arrays[f"codes.{field}"] = codes[order].astype(_code_dtype(len(values)))
+
+        type_codes = arrays['codes.type']
+        arrays['type_order'] = np.argsort(type_codes, kind='stable').astype(np.int64)
+        arrays['type_offsets'] = np.searchsorted(type_codes[arrays['type_order']],
+                                                 np.arange(len(dictionaries['type']) + 1)).astype(np.int64)
+
+        meta = {
+            'dataset': version,
+            'cell_size': cell_size,
+            'origin': [origin_lat, origin_lng],
+            'grid': [rows_n, cols_n],
+            'fields': fields,
+            'dictionaries': dictionaries
+        }
+        return cls(meta, arrays)
+
+    @classmethod
+    def from_features(cls, features: List[Dict[str, Any]], version: str = '',
+                      cell_size: float = DEFAULT_CELL_SIZE_DEG) -> 'CameraIndex':
+        """GeoJSON özellik listesinden indeks kurar (nokta olmayanlar atlanır)"""
+        points = [f for f in features if (f.get('geometry') or {}).get('type') == 'Point']
+        lat = np.fromiter((f['geometry']['coordinates'][1] for f in points), dtype=np.float64, count=len(points))
+        lng = np.fromiter((f['geometry']['coordinates'][0] for f in points), dtype=np.float64, count=len(points))
+        columns = {
+            field: [(f.get('properties') or {}).get(source) for f in points]
+            for field, source in CLIENT_FIELDS if source
+        }
+        return cls.build(lat, lng, columns, version, cell_size)
+
+    @classmethod
+    def from_geojson(cls, path: str, cell_size: float = DEFAULT_CELL_SIZE_DEG) -> 'CameraIndex':
+        """Yayınlanmış GeoJSON'dan indeks kurar; sürüm dosya içeriğinin özetidir"""
+        version = file_sha256(Path(path))
+        with open(path, 'r', encoding='utf-8') as f:
+            features = json.load(f).get('features', [])
+        return cls.from_features(features, version, cell_size)
+
+    def _array_items(self) -> List[Tuple[str, Any]]:
+        items = [(name, getattr(self, name)) for name in
+                 ('keys', 'lat', 'lng', 'cos_lat', 'id_offsets', 'id_blob')]
+        items += [(f"codes.{field}", codes) for field, codes in self.codes.items()]
+        type_order = np.concatenate([self.type_positions[value] for value in self.dictionaries['type']]
+                                    or [np.empty(0, dtype=np.int64)])
+        type_offsets = np.zeros(len(self.dictionaries['type']) + 1, dtype=np.int64)
+        np.cumsum([len(self.type_positions[value]) for value in self.dictionaries['type']],
+                  out=type_offsets[1:])
+        items += [('type_order', type_order.astype(np.int64)), ('type_offsets', type_offsets)]
+        return items
+
+    def save(self, path: str):
+        """
+        Paketlenmiş indeks dosyasını yazar
+
+        Düzen: MAGIC, başlık uzunluğu (uint32), JSON başlık (sözlükler ve
+        dizi konumları), ardından PACK_ALIGN baytlık sınırlara hizalanmış ham
+        diziler (küçük-endian). Dosya geçici adla yazılıp os.replace ile
+        yerine konur; eski dosyayı eşlemiş okuyucular etkilenmez.
+        """
+        items = self._array_items()
+        specs, offset = {}, 0
+        for name, array in items:
+            if isinstance(array, np.ndarray):
+                specs[name] = {'offset': offset, 'dtype': array.dtype.newbyteorder('<').str,
+                               'length': len(array)}
+                size = array.nbytes
+            else:
+                specs[name] = {'offset': offset, 'dtype': 'bytes', 'length': len(array)}
+                size = len(array)
+            offset += -(-size // PACK_ALIGN) * PACK_ALIGN
+
+        meta = {
+            'version': INDEX_FORMAT_VERSION,
+            'dataset': self.version,
+            'count': len(self),
+            'cell_size': self.cell_size,
+            'origin': [self.origin_lat, self.origin_lng],
+            'grid': [self.rows_n, self.cols_n],
+            'fields': self.fields,
+            'dictionaries': self.dictionaries,
+            'arrays': specs
+        }
+        header = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        data_start = -(-(len(PACK_MAGIC) + 4 + len(header)) // PACK_ALIGN) * PACK_ALIGN
+
+        temp_path = Path(f"{path}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(PACK_MAGIC + struct.pack('<I', len(header)) + header)
+            for name, array in items:
+                f.seek(data_start + specs[name]['offset'])
+                f.write(array.astype(specs[name]['dtype'], copy=False).tobytes()
+                        if isinstance(array, np.ndarray) else array)
+            f.truncate(data_start + offset)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CameraIndex':
+        """
+        Paketlenmiş indeksi ayrıştırmadan eşler (mmap)
+
+        Diziler dosyanın salt okunur görünümleridir; aynı dosyayı açan tüm
+        süreçler tek kopyayı sayfa önbelleği üzerinden paylaşır.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise ValueError(f"Not a packed camera index: {path}")
+        header_len, = struct.unpack_from('<I', mapped, len(PACK_MAGIC))
+        header_start = len(PACK_MAGIC) + 4
+        meta = json.loads(mapped[header_start:header_start + header_len].decode('utf-8'))
+        if meta.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported camera index version: {meta.get('version')}")
+        data_start = -(-(header_start + header_len) // PACK_ALIGN) * PACK_ALIGN
+
+        arrays = {}
+        view = memoryview(mapped)
+        for name, spec in meta['arrays'].items():
+            start = data_start + spec['offset']
+            if spec['dtype'] == 'bytes':
+                arrays[name] = view[start:start + spec['length']]
+            else:
+                arrays[name] = np.frombuffer(mapped, dtype=spec['dtype'], count=spec['length'], offset=start)
+        return cls(meta, arrays)
+
+    def _row_slices(self, south: float, west: float, north: float, east: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Kutuyu kesen ızgara satırlarının dizi kesitleri (başlangıç, bitiş)"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        r0 = max(int(math.floor((south - self.origin_lat) / self.cell_size)), 0)
+        r1 = min(int(math.floor((north - self.origin_lat) / self.cell_size)), self.rows_n - 1)
+        c0 = max(int(math.floor((west - self.origin_lng) / self.cell_size)), 0)
+        c1 = min(int(math.floor((east - self.origin_lng) / self.cell_size)), self.cols_n - 1)
+        if r0 > r1 or c0 > c1:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        rows = np.arange(r0, r1 + 1, dtype=np.int64) * self.cols_n
+        starts = np.searchsorted(self.keys, rows + c0, side='left')
+        ends = np.searchsorted(self.keys, rows + c1, side='right')
+        nonempty = ends > starts
+        return starts[nonempty], ends[nonempty]
+
+    def _type_mask(self, positions: np.ndarray, types: Tuple[str, ...]) -> np.ndarray:
+        codes = [self.type_codes[t] for t in types if t in self.type_codes]
+        return np.isin(self.codes['type'][positions], codes)
+
+    def _in_box(self, positions: np.ndarray, south: float, west: float,
+                north: float, east: float) -> np.ndarray:
+        lat, lng = self.lat[positions], self.lng[positions]
+        return positions[(lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)]
+
+    def query_bbox(self, bbox: Tuple[float, float, float, float], types: Tuple[str, ...] = (),
+                   limit: int = DEFAULT_LIMIT) -> Tuple[np.ndarray, bool]:
+        """
+        Kutu içindeki kameraların konumları ve kesilip kesilmediği
+
+        Satırlar güneyden kuzeye taranır; limit dolunca tarama durur, böylece
+        ülke genelindeki bir kutu bile limit kadar satır maliyetindedir.
+        """
+        starts, ends = self._row_slices(*bbox)
+        found, total = [], 0
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            positions = self._in_box(np.arange(start, end), *bbox)
+            if types:
+                positions = positions[self._type_mask(positions, types)]
+            found.append(positions)
+            total += len(positions)
+            if total > limit:
+                break
+        positions = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return positions[:limit], total > limit
+
+    def query_types(self, types: Tuple[str, ...], limit: int = DEFAULT_LIMIT) -> Tuple[np.ndarray, bool]:
+        """Yalnızca tür filtresi: türlerin ilk limit kaydı"""
+        parts = [self.type_positions[t] for t in types if t in self.type_positions]
+        positions = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        return positions[:limit], len(positions) > limit
+
+    def _distances(self, positions: np.ndarray, lat: float, lng: float) -> np.ndarray:
+        """Vektörel haversine (metre)"""
+        lat1, lng1 = math.radians(lat), math.radians(lng)
+        a = (np.sin((np.radians(self.lat[positions]) - lat1) * 0.5) ** 2 +
+             math.cos(lat1) * self.cos_lat[positions] *
+             np.sin((np.radians(self.lng[positions]) - lng1) * 0.5) ** 2)
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _candidates(self, lat: float, lng: float, radius: float,
+                    types: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Yarıçap içindeki konumlar ve mesafeleri (sırasız)"""
+        dlat, dlng = degree_margins(lat, radius)
+        starts, ends = self._row_slices(lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+        if not len(starts):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        positions = np.concatenate([np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist())])
+        if types:
+            positions = positions[self._type_mask(positions, types)]
+        distances = self._distances(positions, lat, lng)
+        inside = distances <= radius
+        return positions[inside], distances[inside]
+
+    def query_radius(self, lat: float, lng: float, radius: float, types: Tuple[str, ...] = (),
+                     limit: int = DEFAULT_LIMIT) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """Yarıçap içindeki kameralar, en yakından uzağa"""
+        positions, distances = self._candidates(lat, lng, radius, types)
+        return self._nearest_sorted(positions, distances, limit)
+
+    def query_nearest(self, lat: float, lng: float, k: int, types: Tuple[str, ...] = (),
+                      max_radius: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        En yakın k kamera
+
+        Arama yarıçapı bir hücreden başlar ve k aday bulunana kadar ikiye
+        katlanır. Yarıçap r iken bulunan k aday kesin sonuçtur: r dışındaki
+        her nokta bunlardan uzaktır.
+        """
+        radius = self.cell_size * METERS_PER_DEGREE
+        # Veri kapsamını tamamen içine alan yarıçap (üst sınır)
+        far_lat = max(abs(lat - self.origin_lat), abs(lat - (self.origin_lat + self.rows_n * self.cell_size)))
+        far_lng = max(abs(lng - self.origin_lng), abs(lng - (self.origin_lng + self.cols_n * self.cell_size)))
+        cover = math.hypot(far_lat, far_lng) * METERS_PER_DEGREE * 1.5 + radius
+        limit_radius = min(max_radius, cover) if max_radius else cover
+
+        while True:
+            radius = min(radius, limit_radius)
+            positions, distances = self._candidates(lat, lng, radius, types)
+            if len(positions) >= k or radius >= limit_radius:
+                break
+            radius *= 2
+        return self._nearest_sorted(positions, distances, k)
+
+    @staticmethod
+    def _nearest_sorted(positions: np.ndarray, distances: np.ndarray,
+                        limit: int) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """Adaylardan en yakın limit tanesini mesafeye göre sıralı döner"""
+        truncated = len(positions) > limit
+        if truncated:
+            nearest = np.argpartition(distances, limit - 1)[:limit]
+            positions, distances = positions[nearest], distances[nearest]
+        order = np.argsort(distances, kind='stable')
+        return positions[order], distances[order], truncated
+
+    def rows(self, positions: np.ndarray) -> List[List[Any]]:
+        """Konumları CLIENT_FIELDS sırasında satırlara çevirir"""
+        columns = []
+        for field in self.fields:
+            if field == 'id':
+                starts = self.id_offsets[positions].tolist()
+                ends = self.id_offsets[positions + 1].tolist()
+                blob = self.id_blob
+                columns.append([str(blob[a:b], 'utf-8') if b > a else None for a, b in zip(starts, ends)])
+            elif field == 'lat':
+                columns.append(np.round(self.lat[positions], 6).tolist())
+            elif field == 'lng':
+                columns.append(np.round(self.lng[positions], 6).tolist())
+            else:
+                values = self.dictionaries[field]
+                columns.append([values[c] for c in self.codes[field][positions].tolist()])
+        return [list(row) for row in zip(*columns)]
+
+    def search(self, query: CameraQuery) -> Dict[str, Any]:
+        """Sorguyu çalıştırır ve yanıt gövdesini (sözlük) döner"""
+        fields = list(self.fields)
+        distances = None
+        if query.near is not None:
+            lat, lng = query.near
+            if query.k is not None:
+                # query.limit = min(limit, k); en yakın k'nın ilk limit tanesi en yakın limit kameradır
+                positions, distances, more = self.query_nearest(lat, lng, query.limit, query.types, query.radius)
+                truncated = more and query.limit < query.k
+            else:
+                positions, distances, truncated = self.query_radius(lat, lng, query.radius,
+                                                                    query.types, query.limit)
+        elif query.bbox is not None:
+            positions, truncated = self.query_bbox(query.bbox, query.types, query.limit)
+        else:
+            positions, truncated = self.query_types(query.types, query.limit)
+
+        rows = self.rows(positions)
+        if distances is not None:
+            fields.append('distance')
+            for row, distance in zip(rows, np.round(distances, 1).tolist()):
+                row.append(distance)
+
+        return {
+            'version': INDEX_FORMAT_VERSION,
+            'dataset': self.version[:16],
+            'fields': fields,
+            'count': len(rows),
+            'truncated': truncated,
+            'rows': rows
+        }
+
+
+def render(payload: Dict[str, Any]) -> bytes:
+    """Yanıt gövdesini kompakt JSON baytlarına çevirir"""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def index_path_for(geojson_path: str) -> Path:
+    """eds-locations.geojson -> eds-locations.index.bin"""
+    path = Path(geojson_path)
+    return path.with_name(path.stem + INDEX_SUFFIX)
+
+
+class CameraDataset:
+    """
+    Yayınlanmış veri setinin güncel indeksini tutar
+
+    GeoJSON'ın yanında paketlenmiş indeks (``.index.bin``) varsa ve
+    GeoJSON'dan eski değilse mmap ile eşlenir (milisaniyeler); yoksa indeks
+    GeoJSON'dan kurulur. Dosyanın gerçek yolu (current symlink'i çözülmüş),
+    inode, boyut ve mtime değeri en fazla RELOAD_CHECK_S saniyede bir
+    kontrol edilir; yeni sürüm yayınlandıysa indeks yeniden yüklenip tek
+    atamayla değiştirilir. Eski indeksi kullanan istekler onunla tamamlanır.
+    """
+
+    def __init__(self, path: Path = DEFAULT_DATASET, cell_size: float = DEFAULT_CELL_SIZE_DEG,
+                 check_interval: float = RELOAD_CHECK_S):
+        self.path = Path(path)
+        self.cell_size = cell_size
+        self.check_interval = check_interval
+        self._index: Optional[CameraIndex] = None
+        self._identity = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _source(self) -> Tuple[str, bool, tuple]:
+        """Yüklenecek dosya, paketli mi, kimlik bilgisi"""
+        geojson = os.stat(self.path)
+        packed_path = index_path_for(str(self.path))
+        try:
+            packed = os.stat(packed_path)
+            if packed.st_mtime_ns >= geojson.st_mtime_ns:
+                path, stat, is_packed = packed_path, packed, True
+            else:
+                path, stat, is_packed = self.path, geojson, False
+        except OSError:
+            path, stat, is_packed = self.path, geojson, False
+        real_path = os.path.realpath(path)
+        return real_path, is_packed, (real_path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def index(self) -> CameraIndex:
+        """Güncel indeks; dosya yoksa FileNotFoundError"""
+        now = time.monotonic()
+        if self._index is not None and now - self._checked < self.check_interval:
+            return self._index
+
+        # Başka bir istek yeniden yüklüyorsa eski indeksle devam et
+        if not self._lock.acquire(blocking=self._index is None):
+            return self._index
+        try:
+            self._checked = time.monotonic()
+            path, is_packed, identity = self._source()
+            if self._index is None or identity != self._identity:
+                if is_packed:
+                    self._index = CameraIndex.load(path)
+                else:
+                    self._index = CameraIndex.from_geojson(path, self.cell_size)
+                    # Kurulumdan kalan uzun ömürlü nesneler tam GC taramalarında gecikme sıçraması yapmasın
+                    gc.collect()
+                    gc.freeze()
+                self._identity = identity
+            return self._index
+        finally:
+            self._lock.release()
+
+
+def synthetic_index(points: int, seed: int = 42, cell_size: float = DEFAULT_CELL_SIZE_DEG) -> CameraIndex:
+    """Türkiye sınırları içinde kümelenmiş sentetik kameralardan indeks kurar"""
+    rng = np.random.default_rng(seed)
+    centers_lat = rng.uniform(36.5, 41.5, 80)
+    centers_lng = rng.uniform(26.5, 44.0, 80)
+    center = rng.integers(0, 80, points)
+    clustered = rng.random(points) < 0.7
+    lat = np.where(clustered, centers_lat[center] + rng.normal(0, 0.15, points), rng.uniform(35.8, 42.1, points))
+    lng = np.where(clustered, centers_lng[center] + rng.normal(0, 0.2, points), rng.uniform(25.7, 44.8, points))
+
+    types = ['Radar', 'OHITS', 'TEDES', 'Kırmızı Işık', 'Hız Kamerası']
+    columns = {
+        'id': [f"eds_{i}" for i in range(points)],
+        'type': [types[t] for t in rng.integers(0, len(types), points).tolist()],
+        'speed_limit': rng.choice([50, 70, 82, 90, 110, 120], points).tolist(),
+        'road_name': [f"D{r}" for r in rng.integers(100, 999, points).tolist()],
+        'district': [None] * points,
+        'city': [f"İl {c}" for c in rng.integers(1, 82, points).tolist()],
+        'direction': [None] * points,
+        'status': ['active'] * points
+    }
+    columns = {field: columns[source] for field, source in CLIENT_FIELDS if source}
+    return CameraIndex.build(lat, lng, columns, f"synthetic-{points}", cell_size)
+
+
+def run_benchmark(index: CameraIndex, queries: int, seed: int = 7) -> Dict[str, Dict[str, float]]:
+    """Sorgu türleri için JSON üretimi dahil gecikme yüzdelikleri (ms)"""
+    rng = np.random.default_rng(seed)
+    sample = rng.integers(0, len(index), queries)
+    centers = list(zip(index.lat[sample].tolist(), index.lng[sample].tolist()))
+    kinds = {
+        'bbox': lambda lat, lng: {'bbox': f"{lat - 0.1},{lng - 0.15},{lat + 0.1},{lng + 0.15}"},
+        'bbox+type': lambda lat, lng: {'bbox': f"{lat - 0.1},{lng - 0.15},{lat + 0.1},{lng + 0.15}",
+                                       'type': 'Radar'},
+        'country': lambda lat, lng: {'bbox': '35.8,25.7,42.1,44.8'},
+        'near': lambda lat, lng: {'near': f"{lat},{lng}", 'radius': '2000'},
+        'k=10': lambda lat, lng: {'near': f"{lat + 0.05},{lng + 0.05}", 'k': '10'},
+        'k=100+type': lambda lat, lng: {'near': f"{lat},{lng}", 'k': '100', 'type': 'TEDES'}
+    }
+
+    results = {}
+    for kind, make_args in kinds.items():
+        timings = []
+        counts = []
+        for lat, lng in centers:
+            start = time.perf_counter()
+            payload = index.search(parse_query(make_args(lat, lng)))
+            render(payload)
+            timings.append((time.perf_counter() - start) * 1000)
+            counts.append(payload['count'])
+        timings = np.array(timings)
+        results[kind] = {
+            'p50': float(np.percentile(timings, 50)),
+            'p99': float(np.percentile(timings, 99)),
+            'max': float(timings.max()),
+            'rows': float(np.mean(counts))
+        }
+    return results
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS camera query index')
+    parser.add_argument('command', choices=['pack', 'bench'])
+    parser.add_argument('source', nargs='?', default=str(DEFAULT_DATASET),
+                        help='Published EDS GeoJSON file (bench also accepts a packed .index.bin)')
+    parser.add_argument('--output', help='Packed index path (default: <name>.index.bin next to the GeoJSON)')
+    parser.add_argument('--points', type=int, help='Use N synthetic points instead of the GeoJSON')
+    parser.add_argument('--queries', type=int, default=2000, help='Queries per query kind')
+    parser.add_argument('--cell-size', type=float, default=DEFAULT_CELL_SIZE_DEG, help='Grid cell size in degrees')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.points:
+        index = synthetic_index(args.points, cell_size=args.cell_size)
+    elif args.source.endswith(INDEX_SUFFIX):
+        index = CameraIndex.load(args.source)
+    else:
+        index = CameraIndex.from_geojson(args.source, args.cell_size)
+    build_time = time.perf_counter() - start
+
+    if args.command == 'pack':
+        output = args.output or str(index_path_for(args.source))
+        index.save(output)
+        print(f"✅ Paketlenmiş indeks yazıldı: {output}")
+        print(f"📊 {len(index)} kamera, {index.rows_n}x{index.cols_n} ızgara, "
+              f"{Path(output).stat().st_size / 1024 / 1024:.1f}MB")
+        return
+
+    gc.collect()
+    gc.freeze()
+    print(f"🧪 {len(index)} kamera, {index.rows_n}x{index.cols_n} ızgara "
+          f"(yükleme {build_time:.2f}s), tür başına {args.queries} sorgu")
+
+    for kind, stats in run_benchmark(index, args.queries).items():
+        print(f"   {kind:<11}: p50 {stats['p50']:.2f}ms, p99 {stats['p99']:.2f}ms, "
+              f"maks. {stats['max']:.2f}ms, ort. {stats['rows']:.0f} satır")
+
+
+if __name__ == "__main__":
+    main()
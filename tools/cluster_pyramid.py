@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Küme Piramidi - Marker Cluster Pyramid
+==========================================
+
+Harita işaretçilerini her zoom seviyesi (varsayılan 5-18) için önceden
+kümeler ve z/x/y karoları halinde yazar. İstemci düşük zoom seviyelerinde
+binlerce divIcon yerine birkaç düzine küme işaretçisi çizer; çalışma
+zamanında kümeleme yapılmaz.
+
+Yöntem:
+- Noktalar Web Mercator dünya koordinatlarına (0-1) çevrilir
+- En yüksek zoom'dan başlayarak her seviyede ``radius`` piksel boyutlu
+  hücrelere gruplanır; bir üst seviyenin hücresi alt seviyedeki iki
+  hücrenin birleşimi olduğu için kümeler hiyerarşik olarak iç içe geçer
+- Küme merkezi, içerdiği noktaların ağırlıklı ortalamasıdır
+- Her küme için açılma zoom'u (expansion zoom) hesaplanır: kümeye
+  tıklandığında haritanın yakınlaşacağı, kümenin bölündüğü ilk seviye
+
+Not: supercluster'ın komşu arama tabanlı kümelemesi yerine hücre tabanlı
+kümeleme kullanılır; tüm adımlar NumPy ile vektörel çalışır ve 1M nokta
+birkaç saniyede kümelenir.
+
+Çıktı yapısı:
+    clusters/manifest.json
+    clusters/{z}/{x}/{y}.json   -> {"levels": {"<zoom>": [[lat, lng, count, expansionZoom, id, type], ...]}}
+
+z, min(zoom, tile_zoom_cap) değeridir; cap üzerindeki zoom seviyeleri cap
+karolarının içinde birlikte saklanır.
+
+Gereksinim: pip install numpy
+
+Usage:
+    python cluster_pyramid.py ../data/eds-locations.geojson
+    python cluster_pyramid.py --synthetic 1000000 --output /tmp/clusters
+"""
+
+import hashlib
+import json
+import shutil
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+from tile_publisher import replace_directory
+
+DEFAULT_MIN_ZOOM = 5
+DEFAULT_MAX_ZOOM = 18
+DEFAULT_CLUSTER_RADIUS_PX = 60
+DEFAULT_TILE_ZOOM_CAP = 12
+TILE_EXTENT_PX = 256
+CLUSTER_FORMAT_VERSION = 1
+MAX_MERCATOR_LAT = 85.05112878
+
+CLUSTER_FIELDS = ['lat', 'lng', 'count', 'expansionZoom', 'id', 'type']
+
+
+@dataclass
+class ClusterLevel:
+    """Tek bir zoom seviyesindeki kümeler"""
+    zoom: int
+    x: np.ndarray           # küme merkezi (Mercator, 0-1)
+    y: np.ndarray
+    count: np.ndarray       # kümedeki nokta sayısı
+    expansion: np.ndarray   # kümenin bölündüğü ilk zoom
+    point: np.ndarray       # temsilci nokta indeksi (tekil kümeler için)
+
+    def __len__(self) -> int:
+        return len(self.count)
+
+
+def to_mercator(lats: np.ndarray, lngs: np.ndarray):
+    """Enlem/boylamı Web Mercator dünya koordinatlarına (0-1) çevirir"""
+    lat_rad = np.radians(np.clip(lats, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = (lngs + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+def from_mercator(x: np.ndarray, y: np.ndarray):
+    """Web Mercator dünya koordinatlarını enlem/boylama çevirir"""
+    lngs = x * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * y))))
+    return lats, lngs
+
+
+def build_pyramid(lats: np.ndarray, lngs: np.ndarray, min_zoom: int = DEFAULT_MIN_ZOOM,
+                  max_zoom: int = DEFAULT_MAX_ZOOM,
+                  radius: int = DEFAULT_CLUSTER_RADIUS_PX) -> List[ClusterLevel]:
+    """
+    Küme piramidini oluşturur
+
+    Her seviye bir alt seviyenin kümelerinden üretilir. max_zoom + 1
+    seviyesi tekil noktalardır; max_zoom'daki çok noktalı kümelerin açılma
+    zoom'u bu nedenle max_zoom + 1 olur.
+    """
+    mx, my = to_mercator(np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64))
+    cells_per_world = 2.0 ** (max_zoom + 1) * TILE_EXTENT_PX / radius
+
+    # Başlangıç: her nokta kendi kümesi (max_zoom + 1)
+    cell_x = np.floor(mx * cells_per_world).astype(np.int64)
+    cell_y = np.floor(my * cells_per_world).astype(np.int64)
+    sum_x, sum_y = mx, my
+    count = np.ones(len(mx), dtype=np.int64)
+    expansion = np.full(len(mx), max_zoom + 1, dtype=np.int64)
+    point = np.arange(len(mx), dtype=np.int64)
+
+    levels = []
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        cell_x >>= 1
+        cell_y >>= 1
+        keys = (cell_x << 32) | cell_y
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+        children = np.bincount(inverse)
+        sum_x = np.bincount(inverse, weights=sum_x)
+        sum_y = np.bincount(inverse, weights=sum_y)
+        count = np.bincount(inverse, weights=count).astype(np.int64)
+        # Tek alt kümesi olan küme bu seviyede bölünmez, açılma zoom'u alt kümeninkidir
+        expansion = np.where(children > 1, zoom + 1, expansion[first])
+        point = point[first]
+        cell_x = cell_x[first]
+        cell_y = cell_y[first]
+
+        levels.append(ClusterLevel(zoom, sum_x / count, sum_y / count, count, expansion, point))
+
+    levels.reverse()
+    return levels
+
+
+def level_tiles(level: ClusterLevel, ids: List[Any], types: List[Any],
+                tile_zoom: int) -> Dict[Tuple[int, int], List[List[Any]]]:
+    """Bir seviyenin kümelerini tile_zoom seviyesindeki karolara dağıtır"""
+    if not len(level):
+        return {}
+    n = 2 ** tile_zoom
+    tile_x = np.minimum((level.x * n).astype(np.int64), n - 1)
+    tile_y = np.minimum((level.y * n).astype(np.int64), n - 1)
+    order = np.lexsort((tile_y, tile_x))
+
+    lats, lngs = from_mercator(level.x[order], level.y[order])
+    singles = level.count[order] == 1
+    points = level.point[order]
+
+    rows = [
+        [lat, lng, count, expansion,
+         ids[p] if single else None, types[p] if single else None]
+        for lat, lng, count, expansion, p, single in zip(
+            np.round(lats, 6).tolist(), np.round(lngs, 6).tolist(),
+            level.count[order].tolist(), level.expansion[order].tolist(),
+            points.tolist(), singles.tolist())
+    ]
+
+    tiles: Dict[Tuple[int, int], List[List[Any]]] = {}
+    keys = (tile_x[order] << 32) | tile_y[order]
+    boundaries = np.flatnonzero(np.diff(keys)) + 1
+    starts = [0] + boundaries.tolist()
+    ends = boundaries.tolist() + [len(rows)]
+    for start, end in zip(starts, ends):
+        tiles[(int(tile_x[order[start]]), int(tile_y[order[start]]))] = rows[start:end]
+    return tiles
+
+
+def write_pyramid(levels: List[ClusterLevel], ids: List[Any], types: List[Any],
+                  output_dir: str, radius: int = DEFAULT_CLUSTER_RADIUS_PX,
+                  tile_zoom_cap: int = DEFAULT_TILE_ZOOM_CAP) -> Dict[str, Any]:
+    """
+    Küme karolarını ve manifesti yazar
+
+    tile_zoom_cap üzerindeki seviyeler ayrı karo setleri yerine
+    tile_zoom_cap karolarının içinde saklanır ({"levels": {"14": [...]}});
+    yüksek zoom'larda her karoya tek nokta düşeceği için dosya sayısı ve
+    manifest boyutu böylece sınırlı kalır.
+    """
+    output_path = Path(output_dir)
+    staging_path = output_path.with_name(output_path.name + '.tmp')
+    shutil.rmtree(staging_path, ignore_errors=True)
+    staging_path.mkdir(parents=True)
+
+    zooms = {}
+    fragments: Dict[Tuple[int, int, int], List[bytes]] = {}
+    for level in levels:
+        tile_zoom = min(level.zoom, tile_zoom_cap)
+        tiles = level_tiles(level, ids, types, tile_zoom)
+        zooms[str(level.zoom)] = {"clusters": len(level), "tiles": len(tiles), "tileZoom": tile_zoom}
+
+        for (x, y), rows in tiles.items():
+            fragment = f'"{level.zoom}":'.encode('utf-8') + json.dumps(
+                rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            fragments.setdefault((tile_zoom, x, y), []).append(fragment)
+
+    manifest_tiles = {}
+    for (z, x, y), parts in sorted(fragments.items()):
+        payload = (f'{{"z":{z},"x":{x},"y":{y},"levels":{{'.encode('utf-8')
+                   + b','.join(parts) + b'}}')
+        tile_file = staging_path / str(z) / str(x) / f"{y}.json"
+        tile_file.parent.mkdir(parents=True, exist_ok=True)
+        tile_file.write_bytes(payload)
+        manifest_tiles[f"{z}/{x}/{y}"] = hashlib.sha256(payload).hexdigest()[:16]
+
+    manifest = {
+        "version": CLUSTER_FORMAT_VERSION,
+        "generated": datetime.now().isoformat(),
+        "minZoom": levels[0].zoom if levels else None,
+        "maxZoom": levels[-1].zoom if levels else None,
+        "tileZoomCap": tile_zoom_cap,
+        "radius": radius,
+        "total": int(levels[0].count.sum()) if levels else 0,
+        "fields": CLUSTER_FIELDS,
+        "zooms": zooms,
+        "tiles": manifest_tiles
+    }
+    with open(staging_path / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    replace_directory(staging_path, output_path)
+    return manifest
+
+
+def points_from_features(features: List[Dict[str, Any]]):
+    """GeoJSON özelliklerinden koordinat dizilerini, ID ve tip listelerini çıkarır"""
+    points = [feature for feature in features
+              if (feature.get('geometry') or {}).get('type') == 'Point']
+
+    coords = np.array([feature['geometry']['coordinates'][:2] for feature in points],
+                      dtype=np.float64).reshape(-1, 2)
+    ids = [feature.get('properties', {}).get('id') for feature in points]
+    types = [feature.get('properties', {}).get('type') for feature in points]
+    return coords[:, 1], coords[:, 0], ids, types
+
+
+def synthetic_points(count: int, seed: int = 42):
+    """Benchmark için Türkiye sınırları içinde şehir merkezli rastgele noktalar üretir"""
+    rng = np.random.default_rng(seed)
+    centers = np.array([
+        (41.01, 28.98), (39.93, 32.86), (38.42, 27.14), (40.19, 29.06), (36.90, 30.70),
+        (37.00, 35.32), (37.87, 32.48), (37.07, 37.38), (41.00, 39.72), (39.90, 41.27)
+    ])
+    which = rng.integers(0, len(centers), count)
+    urban = rng.random(count) < 0.7
+
+    lats = np.where(urban, centers[which, 0] + rng.normal(0, 0.08, count), rng.uniform(36.0, 42.0, count))
+    lngs = np.where(urban, centers[which, 1] + rng.normal(0, 0.10, count), rng.uniform(26.0, 45.0, count))
+    ids = [f"SYN_{i:07d}" for i in range(count)]
+    types = ['SPEED_CAMERA'] * count
+    return lats, lngs, ids, types
+
+
+def publish_clusters(features: List[Dict[str, Any]], output_dir: str,
+                     min_zoom: int = DEFAULT_MIN_ZOOM, max_zoom: int = DEFAULT_MAX_ZOOM,
+                     radius: int = DEFAULT_CLUSTER_RADIUS_PX,
+                     tile_zoom_cap: int = DEFAULT_TILE_ZOOM_CAP) -> Optional[Dict[str, Any]]:
+    """GeoJSON özelliklerinden küme piramidini oluşturup yazar"""
+    lats, lngs, ids, types = points_from_features(features)
+    if not len(lats):
+        return None
+
+    levels = build_pyramid(lats, lngs, min_zoom, max_zoom, radius)
+    return write_pyramid(levels, ids, types, output_dir, radius, tile_zoom_cap)
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Marker Cluster Pyramid')
+    parser.add_argument('geojson', nargs='?', help='Merged / published EDS GeoJSON file')
+    parser.add_argument('--synthetic', type=int, help='Use N synthetic points instead (benchmark)')
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM, help='Lowest zoom level')
+    parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM, help='Highest zoom level')
+    parser.add_argument('--radius', type=int, default=DEFAULT_CLUSTER_RADIUS_PX,
+                        help='Cluster radius in pixels')
+    parser.add_argument('--tile-zoom-cap', type=int, default=DEFAULT_TILE_ZOOM_CAP,
+                        help='Zoom levels above this share the tiles of this zoom')
+    parser.add_argument('--output', help='Output directory (default: clusters/ next to the GeoJSON)')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        lats, lngs, ids, types = synthetic_points(args.synthetic)
+        output_dir = args.output or 'clusters'
+    elif args.geojson:
+        with open(args.geojson, 'r', encoding='utf-8') as f:
+            lats, lngs, ids, types = points_from_features(json.load(f).get('features', []))
+        output_dir = args.output or str(Path(args.geojson).parent / 'clusters')
+    else:
+        parser.error('GeoJSON file or --synthetic is required')
+
+    started = time.perf_counter()
+    levels = build_pyramid(lats, lngs, args.min_zoom, args.max_zoom, args.radius)
+    built = time.perf_counter()
+    manifest = write_pyramid(levels, ids, types, output_dir, args.radius, args.tile_zoom_cap)
+    written = time.perf_counter()
+
+    print(f"✅ {len(lats):,} nokta, z{args.min_zoom}-z{args.max_zoom} küme piramidi")
+    for level in levels:
+        info = manifest['zooms'][str(level.zoom)]
+        print(f"   z{level.zoom:<2} {info['clusters']:>9,} küme, {info['tiles']:>7,} karo (z{info['tileZoom']})")
+    print(f"⚡ Kümeleme: {built - started:.2f}s, yazma: {written - built:.2f}s "
+          f"({len(manifest['tiles']):,} dosya)")
+    print(f"📁 Çıktı: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
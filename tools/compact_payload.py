@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Kompakt İstemci Verisi - Compact Client Payload
+===================================================
+
+Yayınlanan GeoJSON'dan yalnızca istemcinin kullandığı alanları içeren,
+sütun bazlı ve tamsayı dizilerinden oluşan kompakt bir JSON üretir.
+
+Kodlama:
+- Koordinatlar 1e-5 dereceye (~1.1m) nicemlenir ve tamsayıya çevrilir
+- Noktalar Hilbert eğrisi sırasına dizilir; koordinatlar bir önceki
+  noktaya göre fark (delta) olarak yazılır
+- Metin alanları sözlük kodludur (0 = null, diğerleri sıklık sırasıyla)
+- ID'ler önek sözlüğü + sayısal son ek olarak ayrılır ("eds_002187");
+  önek kaydı [önek, dolgu genişliği, tür] tutar (tür 1: kaynakta sayı olan
+  ID, çözülünce yine sayı döner). 2^53 üstü son ekler JavaScript'te kesin
+  temsil edilemediği için metin olarak yazılır
+
+Referans çözücü: js/utils.js -> EDSUtils.decodeCompactPayload
+
+Usage:
+    python compact_payload.py ../data/eds-locations.geojson
+    python compact_payload.py ../data/eds-locations.geojson --verify
+"""
+
+import json
+import re
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+PAYLOAD_FORMAT_VERSION = 1
+COORD_SCALE = 100000
+HILBERT_ORDER = 16
+
+# İstemci alan adı -> GeoJSON özellik adı (index.html loadEDSData ile aynı)
+CATEGORICAL_FIELDS = [
+    ('type', 'type'),
+    ('road', 'road_name'),
+    ('district', 'district'),
+    ('city', 'city'),
+    ('direction', 'direction'),
+    ('status', 'status')
+]
+
+ID_PATTERN = re.compile(r'^(.*?)(\d+)$')
+MAX_SAFE_INTEGER = 2 ** 53 - 1  # JavaScript Number.MAX_SAFE_INTEGER
+ID_STRING, ID_NUMBER = 0, 1
+
+
+def hilbert_index(x: int, y: int, order: int = HILBERT_ORDER) -> int:
+    """(x, y) hücresinin Hilbert eğrisi üzerindeki sırası (0 <= x, y < 2**order)"""
+    index = 0
+    s = 1 << (order - 1)
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        index += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x = s - 1 - x
+                y = s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return index
+
+
+def split_id(value: Any) -> Tuple[Optional[str], int, int, Union[int, str, None]]:
+    """
+    ID'yi (önek, sıfır dolgu genişliği, tür, son ek) parçalarına ayırır
+
+    Son ek MAX_SAFE_INTEGER'dan büyükse rakam dizisi (str) olarak döner.
+    """
+    if value is None:
+        return None, 0, ID_STRING, None
+    kind = ID_NUMBER if isinstance(value, int) and not isinstance(value, bool) else ID_STRING
+    value = str(value)
+    match = ID_PATTERN.match(value)
+    if not match:
+        return value, 0, kind, None
+    prefix, digits = match.groups()
+    width = len(digits) if len(digits) > 1 and digits.startswith('0') else 0
+    number = int(digits)
+    return prefix, width, kind, number if number <= MAX_SAFE_INTEGER else digits
+
+
+def join_id(prefix: Optional[str], width: int, kind: int, number: Union[int, str, None]) -> Any:
+    """split_id'nin tersi"""
+    value = prefix if number is None else f"{prefix}{str(number).zfill(width)}"
+    return int(value) if kind == ID_NUMBER and value is not None else value
+
+
+def build_dictionary(values: List[Any]) -> Tuple[List[Any], Dict[Any, int]]:
+    """Sıklık sırasına göre sözlük oluşturur; 0 kodu her zaman null'dur"""
+    counts = Counter(value for value in values if value is not None)
+    dictionary = [None] + [value for value, _ in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))]
+    return dictionary, {value: code for code, value in enumerate(dictionary)}
+
+
+def encode_payload(features: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """GeoJSON özelliklerini kompakt istemci verisine kodlar"""
+    points = []
+    for feature in features:
+        if (feature.get('geometry') or {}).get('type') != 'Point':
+            continue
+        lng, lat = feature['geometry']['coordinates'][:2]
+        points.append((round(lat * COORD_SCALE), round(lng * COORD_SCALE), feature.get('properties', {})))
+
+    if points:
+        min_lat = min(p[0] for p in points)
+        min_lng = min(p[1] for p in points)
+        span = max(max(p[0] for p in points) - min_lat, max(p[1] for p in points) - min_lng, 1)
+        shift = max(span.bit_length() - HILBERT_ORDER, 0)
+        points.sort(key=lambda p: hilbert_index((p[1] - min_lng) >> shift, (p[0] - min_lat) >> shift))
+
+    lat_deltas, lng_deltas = [], []
+    prev_lat = prev_lng = 0
+    for lat, lng, _ in points:
+        lat_deltas.append(lat - prev_lat)
+        lng_deltas.append(lng - prev_lng)
+        prev_lat, prev_lng = lat, lng
+
+    id_parts = [split_id(properties.get('id')) for _, _, properties in points]
+    id_keys = [(prefix, width, kind) if prefix is not None else None for prefix, width, kind, _ in id_parts]
+    id_prefixes, id_prefix_codes = build_dictionary(id_keys)
+
+    payload = {
+        "v": PAYLOAD_FORMAT_VERSION,
+        "n": len(points),
+        "scale": COORD_SCALE,
+        "lat": lat_deltas,
+        "lng": lng_deltas,
+        "idPrefix": [id_prefix_codes[key] for key in id_keys],
+        "idNum": [number for _, _, _, number in id_parts],
+        "speedLimit": [properties.get('speed_limit') for _, _, properties in points],
+        "dicts": {"idPrefix": [list(entry) if entry else None for entry in id_prefixes]}
+    }
+
+    for field, source in CATEGORICAL_FIELDS:
+        values = [properties.get(source) for _, _, properties in points]
+        dictionary, codes = build_dictionary(values)
+        payload["dicts"][field] = dictionary
+        payload[field] = [codes[value] if value is not None else 0 for value in values]
+
+    return payload
+
+
+def decode_payload(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Kompakt veriyi istemci kayıtlarına çözer (js/utils.js ile aynı mantık)"""
+    if payload.get("v") != PAYLOAD_FORMAT_VERSION:
+        raise ValueError(f"Unsupported payload version: {payload.get('v')}")
+
+    scale = payload["scale"]
+    dicts = payload["dicts"]
+    locations = []
+    lat = lng = 0
+    for i in range(payload["n"]):
+        lat += payload["lat"][i]
+        lng += payload["lng"][i]
+        prefix = dicts["idPrefix"][payload["idPrefix"][i]]
+        location = {
+            "id": join_id(prefix[0], prefix[1], prefix[2] if len(prefix) > 2 else ID_STRING,
+                          payload["idNum"][i]) if prefix else None,
+            "lat": lat / scale,
+            "lng": lng / scale,
+            "speedLimit": payload["speedLimit"][i]
+        }
+        for field, _ in CATEGORICAL_FIELDS:
+            location[field] = dicts[field][payload[field][i]]
+        locations.append(location)
+    return locations
+
+
+def verify_round_trip(features: List[Dict[str, Any]], payload: Dict[str, Any]) -> List[str]:
+    """Kodlanan veriyi çözüp kaynakla karşılaştırır; hata listesini döner"""
+    expected = {}
+    for feature in features:
+        if (feature.get('geometry') or {}).get('type') != 'Point':
+            continue
+        properties = feature.get('properties', {})
+        lng, lat = feature['geometry']['coordinates'][:2]
+        expected.setdefault(None if properties.get('id') is None else str(properties.get('id')), []).append(
+            (round(lat * COORD_SCALE), round(lng * COORD_SCALE), properties))
+
+    errors = []
+    decoded = decode_payload(payload)
+    if len(decoded) != sum(len(items) for items in expected.values()):
+        errors.append(f"count mismatch: {len(decoded)} decoded")
+
+    for location in decoded:
+        candidates = expected.get(None if location['id'] is None else str(location['id']))
+        if not candidates:
+            errors.append(f"unexpected id: {location['id']}")
+            continue
+        lat, lng, properties = candidates.pop(0)
+        if isinstance(location['id'], int) and abs(location['id']) > MAX_SAFE_INTEGER:
+            errors.append(f"{location['id']}: numeric id exceeds the JavaScript safe integer range")
+        if type(location['id']) is not type(properties.get('id')):
+            errors.append(f"{location['id']}: id type mismatch "
+                          f"({type(properties.get('id')).__name__} -> {type(location['id']).__name__})")
+        if round(location['lat'] * COORD_SCALE) != lat or round(location['lng'] * COORD_SCALE) != lng:
+            errors.append(f"{location['id']}: coordinate mismatch")
+        if location['speedLimit'] != properties.get('speed_limit'):
+            errors.append(f"{location['id']}: speedLimit mismatch")
+        for field, source in CATEGORICAL_FIELDS:
+            if location[field] != properties.get(source):
+                errors.append(f"{location['id']}: {field} mismatch")
+    return errors
+
+
+def write_payload(features: List[Dict[str, Any]], output_file: str) -> Dict[str, Any]:
+    """Kompakt veriyi dosyaya yazar"""
+    payload = encode_payload(features)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+    return payload
+
+
+def payload_path_for(geojson_path: str) -> Path:
+    """eds-locations.geojson -> eds-locations.compact.json"""
+    path = Path(geojson_path)
+    return path.with_name(path.stem + '.compact.json')
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Compact Client Payload')
+    parser.add_argument('geojson', help='Merged / published EDS GeoJSON file')
+    parser.add_argument('--output', help='Output file (default: <name>.compact.json next to the GeoJSON)')
+    parser.add_argument('--verify', action='store_true', help='Decode the payload and compare with the source')
+    args = parser.parse_args()
+
+    with open(args.geojson, 'r', encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+
+    output_file = Path(args.output) if args.output else payload_path_for(args.geojson)
+    payload = write_payload(features, str(output_file))
+
+    source_size = Path(args.geojson).stat().st_size
+    output_size = output_file.stat().st_size
+    print(f"✅ {payload['n']} nokta kodlandı: {output_file}")
+    print(f"📦 {source_size / 1024:.1f}KB -> {output_size / 1024:.1f}KB ({source_size / max(output_size, 1):.1f}x)")
+
+    if args.verify:
+        errors = verify_round_trip(features, payload)
+        if errors:
+            for error in errors[:20]:
+                print(f"❌ {error}")
+            raise SystemExit(f"Round-trip failed with {len(errors)} errors")
+        print("✅ Round-trip doğrulaması başarılı")
+
+
+if __name__ == "__main__":
+    main()
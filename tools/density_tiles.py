@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Yoğunluk Haritası - Camera Density Heatmap Tiles
+====================================================
+
+Birleştirilmiş noktaları çok çözünürlüklü bir yoğunluk ızgarasına böler ve
+her zoom seviyesi (varsayılan 5-12) için z/x/y karoları yazar. Ülke geneli
+yoğunluk görünümü için her noktayı ayrı ayrı çizmeye gerek kalmaz.
+
+Özellikler:
+- En ince seviye NumPy histogram2d ile karo başına ``bins x bins`` hücreye
+  bölünür; üst seviyeler 2x2 hücre toplamı ile türetilir
+- Opsiyonel ``confidence_score`` ağırlığı ve ``type`` filtresi
+- PNG raster karo (Leaflet L.tileLayer ile doğrudan kullanılabilir) veya
+  seyrek sayısal ızgara (JSON) çıktısı
+- Artımlı güncelleme: manifestteki hücre özetleri (hash) değişmeyen karolar
+  yeniden yazılmaz, boşalan karolar silinir
+
+Renk ölçeği veri setinden bağımsızdır (zoom başına sabit doyma değeri);
+böylece bir karonun görüntüsü yalnızca kendi hücrelerine bağlıdır.
+
+Gereksinim: pip install numpy
+
+Usage:
+    python density_tiles.py ../data/eds-locations.geojson --output ../data/heatmap
+    python density_tiles.py ../data/eds-locations.geojson --weight confidence --type OHITS
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+from cluster_pyramid import to_mercator
+
+DEFAULT_MIN_ZOOM = 5
+DEFAULT_MAX_ZOOM = 12
+DEFAULT_BINS = 64
+DEFAULT_SATURATION = 4.0   # en ince seviyede tam renge ulaşan hücre değeri
+TILE_SIZE_PX = 256
+DENSITY_FORMAT_VERSION = 1
+TILE_EXTENSIONS = {'png': 'png', 'grid': 'json'}
+
+TileKey = Tuple[int, int, int]
+
+
+def finest_grids(mx: np.ndarray, my: np.ndarray, weights: Optional[np.ndarray],
+                 zoom: int, bins: int) -> Dict[TileKey, np.ndarray]:
+    """En ince seviyenin karo ızgaralarını histogram2d ile hesaplar"""
+    if not len(mx):
+        return {}
+
+    n = 2 ** zoom
+    tile_x = np.minimum((mx * n).astype(np.int64), n - 1)
+    tile_y = np.minimum((my * n).astype(np.int64), n - 1)
+    keys = (tile_x << 32) | tile_y
+    order = np.argsort(keys, kind='stable')
+    boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+
+    grids = {}
+    for chunk in np.split(order, boundaries):
+        x, y = int(tile_x[chunk[0]]), int(tile_y[chunk[0]])
+        # Satır = y (kuzeyden güneye), sütun = x; PNG piksel düzeniyle aynı
+        grid, _, _ = np.histogram2d(
+            my[chunk], mx[chunk], bins=bins,
+            range=[[y / n, (y + 1) / n], [x / n, (x + 1) / n]],
+            weights=None if weights is None else weights[chunk]
+        )
+        grids[(zoom, x, y)] = grid
+    return grids
+
+
+def parent_grids(grids: Dict[TileKey, np.ndarray], bins: int) -> Dict[TileKey, np.ndarray]:
+    """Bir alt seviyenin ızgaralarından 2x2 toplam ile üst seviyeyi üretir"""
+    half = bins // 2
+    parents: Dict[TileKey, np.ndarray] = {}
+    for (zoom, x, y), grid in grids.items():
+        key = (zoom - 1, x >> 1, y >> 1)
+        if key not in parents:
+            parents[key] = np.zeros((bins, bins))
+        row, col = (y & 1) * half, (x & 1) * half
+        parents[key][row:row + half, col:col + half] += grid.reshape(half, 2, half, 2).sum(axis=(1, 3))
+    return parents
+
+
+def build_density(mx: np.ndarray, my: np.ndarray, weights: Optional[np.ndarray] = None,
+                  min_zoom: int = DEFAULT_MIN_ZOOM, max_zoom: int = DEFAULT_MAX_ZOOM,
+                  bins: int = DEFAULT_BINS) -> Dict[TileKey, np.ndarray]:
+    """Tüm zoom seviyelerinin karo ızgaralarını oluşturur"""
+    if bins < 2 or bins & (bins - 1):
+        raise ValueError(f"bins must be a power of two: {bins}")
+
+    level = finest_grids(mx, my, weights, max_zoom, bins)
+    grids = dict(level)
+    for _ in range(max_zoom, min_zoom, -1):
+        level = parent_grids(level, bins)
+        grids.update(level)
+    return grids
+
+
+def grid_hash(grid: np.ndarray) -> str:
+    """Izgara hücrelerinin içerik özeti"""
+    return hashlib.sha256(np.ascontiguousarray(grid, dtype=np.float32).tobytes()).hexdigest()[:16]
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """RGBA (yükseklik x genişlik x 4, uint8) diziyi PNG'ye kodlar"""
+    height, width = rgba.shape[:2]
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)])
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) + chunk(b'IEND', b''))
+
+
+def render_png(grid: np.ndarray, saturation: float) -> bytes:
+    """Izgarayı sarıdan kırmızıya renk ölçekli, boş hücreleri saydam PNG'ye çevirir"""
+    t = np.clip(np.log1p(grid) / np.log1p(saturation), 0.0, 1.0)
+    rgba = np.zeros(grid.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = 255
+    rgba[..., 1] = (220 * (1.0 - t)).astype(np.uint8)
+    rgba[..., 2] = 0
+    rgba[..., 3] = np.where(grid > 0, 90 + 150 * t, 0).astype(np.uint8)
+
+    scale = TILE_SIZE_PX // grid.shape[0]
+    rgba = np.repeat(np.repeat(rgba, scale, axis=0), scale, axis=1)
+    return encode_png(rgba)
+
+
+def render_grid(grid: np.ndarray) -> bytes:
+    """Izgarayı seyrek JSON'a çevirir: [[satır * bins + sütun, değer], ...]"""
+    cells = np.flatnonzero(grid)
+    values = np.round(grid.ravel()[cells], 3)
+    return json.dumps({"bins": grid.shape[0], "cells": [[int(c), v] for c, v in zip(cells, values.tolist())]},
+                      separators=(',', ':')).encode('utf-8')
+
+
+def select_points(features: List[Dict[str, Any]], types: Optional[List[str]] = None,
+                  weight: Optional[str] = None):
+    """Noktaları tip filtresine göre seçer; Mercator koordinatları ve ağırlıkları döner"""
+    wanted = set(types) if types else None
+    coords, weights = [], []
+    for feature in features:
+        if (feature.get('geometry') or {}).get('type') != 'Point':
+            continue
+        properties = feature.get('properties', {})
+        if wanted and properties.get('type') not in wanted:
+            continue
+        coords.append(feature['geometry']['coordinates'][:2])
+        if weight == 'confidence':
+            score = properties.get('confidence_score')
+            weights.append(float(score) if score is not None else 0.0)
+
+    coords = np.array(coords, dtype=np.float64).reshape(-1, 2)
+    mx, my = to_mercator(coords[:, 1], coords[:, 0])
+    return mx, my, (np.array(weights) if weight == 'confidence' else None)
+
+
+def write_density_tiles(grids: Dict[TileKey, np.ndarray], output_dir: str,
+                        settings: Dict[str, Any], output_format: str = 'png') -> Dict[str, int]:
+    """
+    Karoları artımlı olarak yazar
+
+    Önceki manifest aynı ayarlarla üretilmişse yalnızca hücre özeti
+    değişen karolar yeniden yazılır; artık olmayan karolar silinir.
+    Manifest en son ve atomik olarak yazılır.
+    """
+    output_path = Path(output_dir)
+    manifest_path = output_path / 'manifest.json'
+    extension = TILE_EXTENSIONS[output_format]
+
+    previous_tiles = {}
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous.get('settings') == settings and previous.get('format') == output_format:
+            previous_tiles = previous.get('tiles', {})
+        else:
+            # Ayarlar değişti: tüm karolar geçersiz
+            for key in previous.get('tiles', {}):
+                old_extension = TILE_EXTENSIONS.get(previous.get('format'), extension)
+                (output_path / f"{key}.{old_extension}").unlink(missing_ok=True)
+                stats['removed'] += 1
+
+    tiles = {}
+    saturation_base = settings['saturation']
+
+    for (zoom, x, y), grid in sorted(grids.items()):
+        key = f"{zoom}/{x}/{y}"
+        digest = grid_hash(grid)
+        tiles[key] = {"hash": digest, "total": round(float(grid.sum()), 3)}
+
+        tile_file = output_path / f"{key}.{extension}"
+        if previous_tiles.get(key, {}).get('hash') == digest and tile_file.exists():
+            stats['unchanged'] += 1
+            continue
+
+        if output_format == 'png':
+            # Üst seviyede bir hücre 4 alt hücreyi kapsar; doyma değeri buna göre ölçeklenir
+            payload = render_png(grid, saturation_base * 4 ** (settings['maxZoom'] - zoom))
+        else:
+            payload = render_grid(grid)
+
+        tile_file.parent.mkdir(parents=True, exist_ok=True)
+        tile_file.write_bytes(payload)
+        stats['written'] += 1
+
+    for key in set(previous_tiles) - set(tiles):
+        (output_path / f"{key}.{extension}").unlink(missing_ok=True)
+        stats['removed'] += 1
+
+    manifest = {
+        "version": DENSITY_FORMAT_VERSION,
+        "generated": datetime.now().isoformat(),
+        "format": output_format,
+        "settings": settings,
+        "tiles": tiles
+    }
+    output_path.mkdir(parents=True, exist_ok=True)
+    temp_path = manifest_path.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, manifest_path)
+
+    return stats
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Camera Density Heatmap Tiles')
+    parser.add_argument('geojson', help='Merged / published EDS GeoJSON file')
+    parser.add_argument('--output', help='Output directory (default: heatmap/ next to the GeoJSON)')
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM, help='Lowest zoom level')
+    parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM, help='Finest zoom level')
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS, help='Cells per tile side (power of two)')
+    parser.add_argument('--weight', choices=['confidence'], help='Weight points by confidence_score')
+    parser.add_argument('--type', action='append', dest='types', help='Only include this camera type (repeatable)')
+    parser.add_argument('--saturation', type=float, default=DEFAULT_SATURATION,
+                        help='Cell value shown at full colour on the finest zoom')
+    parser.add_argument('--format', choices=sorted(TILE_EXTENSIONS), default='png', help='Tile output format')
+    args = parser.parse_args()
+
+    with open(args.geojson, 'r', encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+
+    mx, my, weights = select_points(features, args.types, args.weight)
+    grids = build_density(mx, my, weights, args.min_zoom, args.max_zoom, args.bins)
+
+    settings = {
+        "minZoom": args.min_zoom,
+        "maxZoom": args.max_zoom,
+        "bins": args.bins,
+        "weight": args.weight,
+        "types": sorted(args.types) if args.types else None,
+        "saturation": args.saturation
+    }
+    output_dir = args.output or str(Path(args.geojson).parent / 'heatmap')
+    stats = write_density_tiles(grids, output_dir, settings, args.format)
+
+    print(f"✅ {len(mx)} nokta, z{args.min_zoom}-z{args.max_zoom}, {len(grids)} karo")
+    print(f"📝 Yazılan: {stats['written']}, değişmeyen: {stats['unchanged']}, silinen: {stats['removed']}")
+    print(f"📁 Çıktı: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
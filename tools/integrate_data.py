@@ -6,13 +6,15 @@ EDS Veri Entegrasyonu - Integration Script
 ==========================================
 
 Bu script, birleştirilmiş EDS verilerini ana uygulamaya entegre eder.
+Yayın, release_publisher.py ile sürümlü ve atomik olarak yapılır.
 """
 
-import json
-import shutil
 from pathlib import Path
 import sys
 
+sys.path.append(str(Path(__file__).parent))
+from release_publisher import ReleasePublisher, HAS_NUMPY
+
 def find_latest_merged_data():
     """En son birleştirilmiş veriyi bulur"""
     tools_dir = Path(__file__).parent
@@ -36,65 +38,22 @@ def find_latest_merged_data():
     return latest_file
 
 def update_main_app(geojson_file):
-    """Ana uygulamayı günceller"""
-    # Hedef dizinler
-    main_data_dir = Path(__file__).parent.parent / "data"
-    main_data_dir.mkdir(exist_ok=True)
-    
-    # GeoJSON dosyasını kopyala
-    target_file = main_data_dir / "eds-locations.geojson"
-    shutil.copy2(geojson_file, target_file)
-    
-    # Veri sayısını kontrol et
-    with open(target_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    point_count = len(data.get('features', []))
-    
-    print(f"✅ {point_count} EDS noktası ana uygulamaya entegre edildi")
-    print(f"📁 Hedef dosya: {target_file}")
-    
-    return point_count, target_file
-
-def update_index_html(point_count):
-    """Index.html'i gerçek veri ile günceller"""
-    index_file = Path(__file__).parent.parent / "index.html"
-    
-    if not index_file.exists():
-        print(f"⚠️ Index.html bulunamadı: {index_file}")
-        return False
-    
-    # Index.html'i oku
-    content = index_file.read_text(encoding='utf-8')
-    
-    # Test verilerini gerçek veri yükleme ile değiştir
-    old_fallback = '''console.warn('⚠️ GeoJSON yüklenemedi, test verileri kullanılıyor');
-                // Fallback test data
-                edsLocations = ['''
-    
-    new_code = f'''console.log('✅ EDS verileri yüklendi:', edsLocations.length, 'kamera');
-                
-                // Veri sayısını güncelle
-                document.getElementById('edsCount').textContent = edsLocations.length + ' Kamera';'''
-    
-    # Test veri bloğunu kaldır ve gerçek veri yükleme ekle
-    if 'Fallback test data' in content:
-        # Test veri bloğunu bul ve kaldır
-        start = content.find('// Fallback test data')
-        end = content.find('];', start) + 2
-        if start != -1 and end != -1:
-            # Test veriyi kaldır
-            before = content[:start]
-            after = content[end:]
-            content = before + new_code + after
-            
-            # Dosyayı güncelle
-            index_file.write_text(content, encoding='utf-8')
-            print(f"✅ Index.html güncellendi - {point_count} kamera ile")
-            return True
-    
-    print("⚠️ Index.html güncelleme gerekli değil")
-    return True
+    """Ana uygulamayı yeni bir veri sürümüne geçirir"""
+    publisher = ReleasePublisher()
+    manifest = publisher.publish(str(geojson_file))
+    point_count = manifest['counts']['total_points']
+    
+    if manifest.get('unchanged'):
+        print(f"ℹ️ Veri zaten yayınlanmış, aktif sürüm: {manifest['release']}")
+    else:
+        print(f"✅ {point_count} EDS noktası yeni sürüm olarak yayınlandı: {manifest['release']}")
+        print(f"🗺️ Karolar: {manifest['tiles']} adet, küme karoları: {manifest['clusters']} adet")
+        if not HAS_NUMPY:
+            print("⚠️ NumPy yüklü değil, küme piramidi atlandı (pip install numpy)")
+    print(f"📁 Sürüm dizini: {publisher.releases_dir / manifest['release']}")
+    print(f"↩️ Geri almak için: python release_publisher.py rollback")
+    
+    return point_count, publisher.data_dir / "eds-locations.geojson"
 
 def main():
     """Ana entegrasyon fonksiyonu"""
@@ -117,9 +76,6 @@ def main():
     # Ana uygulamaya entegre et
     point_count, target_file = update_main_app(latest_file)
     
-    # Index.html'i güncelle
-    update_index_html(point_count)
-    
     print("\n🎉 ENTEGRASYON TAMAMLANDI!")
     print(f"📊 Toplam EDS noktası: {point_count:,}")
     print(f"📁 Veri dosyası: {target_file}")
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS İş Kuyruğu - Background Merge Job Queue
+===========================================
+
+Web sunucusundaki birleştirme işlemlerini HTTP isteği dışında, ayrı
+süreçlerde (process) çalıştırır.
+
+Özellikler:
+- Sınırlı sayıda uzun ömürlü işçi süreci (CPU yalıtımı); işçiler açılışta
+  bir kez ısınır (initializer) ve işler arasında yeniden kullanılır
+- Her işçi max_jobs_per_worker işten sonra yenisiyle değiştirilir
+- Kuyruk derinliği sınırı ile kabul kontrolü (dolu ise QueueFullError)
+- Durum takibi: queued / running / done / failed / cancelled + aşama
+- Aşama süreleri: olaylar üst süreçte zamanlanır (Job.stage_durations)
+- İlerleme olayları: iş başına sıra numaralı olay geçmişi ve bekleme (SSE için)
+- İptal: kuyruktaki iş kuyruktan çıkarılır; çalışan işe işçinin iptal
+  bayrağı (Event) ile bildirilir ve iş bir sonraki ``report`` çağrısında
+  JobCancelled ile durur. Süreç sonlandırılmaz: ortak olay kuyruğu bozulmaz,
+  işin ``finally`` blokları çalışır, işçi ısınmış olarak havuzda kalır
+
+İşçi fonksiyonu ve initializer modül seviyesinde tanımlı olmalıdır (spawn
+ile taşınır); işçi fonksiyonu ``report(stage, **info)`` argümanı alır.
+
+Kancalar kuyruk kilidi dışında, tek bir kanca iş parçacığında olay sırasıyla
+çağrılır; yavaş bir kanca (ör. paylaşılan SQLite yazımı) kuyruğu bekletmez:
+- ``on_event(job, state)``: bitmemiş işin her olayında (queued, running,
+  aşamalar); state olay anındaki {'event', 'seq', 'status', 'stage', 'progress'}
+  kopyasıdır
+- ``on_finish(job)``: iş bittiğinde (bitmiş işin alanları artık değişmez)
+"""
+
+import atexit
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 8
+DEFAULT_JOB_TTL_S = 3600
+DEFAULT_MAX_JOBS_PER_WORKER = 100
+EVENT_HISTORY = 256
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Kuyruk derinliği sınırına ulaşıldı"""
+
+
+class JobCancelled(BaseException):
+    """
+    İş iptal edildi (işçi süreçte ``report`` içinden fırlatılır)
+
+    asyncio.CancelledError gibi BaseException'dır; iş kodundaki
+    ``except Exception`` blokları iptali yutmaz.
+    """
+
+
+@dataclass
+class Job:
+    """Kuyruktaki bir işin durumu"""
+    job_id: str
+    func: Callable
+    kwargs: Dict[str, Any]
+    status: str = QUEUED
+    stage: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    process: Any = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    events: deque = field(default_factory=lambda: deque(maxlen=EVENT_HISTORY))
+    seq: int = 0
+    stage_started: Optional[float] = None
+    stage_durations: Dict[str, float] = field(default_factory=dict)
+    cancel_requested: bool = False
+
+    def to_dict(self, position: Optional[int] = None) -> Dict[str, Any]:
+        """Durum sorgusu için JSON uyumlu sözlük"""
+        data = {
+            'jobId': self.job_id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'createdAt': datetime.fromtimestamp(self.created_at).isoformat(),
+            'startedAt': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'finishedAt': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'error': self.error
+        }
+        if position is not None:
+            data['queuePosition'] = position
+        if self.cancel_requested and self.status not in FINISHED_STATES:
+            data['cancelRequested'] = True
+        return data
+
+
+def _run_job(job_id: str, func: Callable, kwargs: Dict[str, Any], events, cancel):
+    """Tek işi çalıştırır: aşamaları ve sonucu olay kuyruğuna yazar"""
+    def report(stage: str, **info):
+        if cancel.is_set():
+            raise JobCancelled()
+        events.put((job_id, 'progress', {'stage': stage, **info}))
+
+    try:
+        events.put((job_id, DONE, func(report=report, **kwargs)))
+    except JobCancelled:
+        events.put((job_id, CANCELLED, None))
+    except Exception as e:
+        events.put((job_id, FAILED, f"{type(e).__name__}: {e}"))
+
+
+def _worker_main(tasks, events, cancel, initializer: Optional[Callable], initargs: tuple):
+    """İşçi süreç giriş noktası: bir kez ısınır, ardından görevleri sırayla çalıştırır"""
+    if initializer is not None:
+        try:
+            initializer(*initargs)
+        except Exception as e:
+            logger.error(f"Worker warm-up failed: {e}")
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        _run_job(*task, events, cancel)
+
+
+class _Worker:
+    """Havuzdaki bir işçi süreci ve görev kanalı"""
+
+    def __init__(self, context, events, initializer: Optional[Callable], initargs: tuple, name: str):
+        self.tasks = context.SimpleQueue()
+        self.cancel = context.Event()
+        self.process = context.Process(target=_worker_main,
+                                       args=(self.tasks, events, self.cancel, initializer, initargs),
+                                       name=name, daemon=True)
+        self.process.start()
+        self.job: Optional[Job] = None
+        self.jobs_done = 0
+        self.retired = False
+
+    def assign(self, job: Job):
+        # İşçi boşta; önceki işin iptal bayrağı yeni işe taşınmaz
+        self.cancel.clear()
+        self.job = job
+        self.tasks.put((job.job_id, job.func, job.kwargs))
+
+    def retire(self, terminate: bool = False):
+        """
+        Yeni iş almaz; değilse mevcut görevden sonra çıkar
+
+        terminate yalnızca kapanışta kullanılır: olay kuyruğuna yazarken
+        sonlandırılan süreç kuyruğu bozabilir.
+        """
+        self.retired = True
+        if terminate:
+            self.process.terminate()
+        else:
+            self.tasks.put(None)
+
+
+class JobQueue:
+    """Süreç tabanlı, sınırlı kapasiteli arka plan iş kuyruğu"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE,
+                 job_ttl: float = DEFAULT_JOB_TTL_S, initializer: Optional[Callable] = None,
+                 initargs: tuple = (), max_jobs_per_worker: int = DEFAULT_MAX_JOBS_PER_WORKER):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.on_event: Optional[Callable[[Job, Dict[str, Any]], None]] = None
+        self.on_finish: Optional[Callable[[Job], None]] = None
+
+        self._context = multiprocessing.get_context('spawn')
+        self._events = self._context.Queue()
+        self._jobs: Dict[str, Job] = {}
+        self._pending: deque = deque()
+        self._running: Dict[str, Job] = {}
+        self._pool: Dict[str, _Worker] = {}  # iş kimliği -> çalışan işçi
+        self._workers: list = []
+        self._lock = threading.Condition()
+        self._worker_ids = itertools.count(1)
+        self._closed = False
+        self._hooks: queue.Queue = queue.Queue()  # (kanca, iş, durum) - kilit dışında çağrılır
+
+        with self._lock:
+            self._spawn_workers()
+
+        threading.Thread(target=self._dispatch_loop, name='job-dispatcher', daemon=True).start()
+        threading.Thread(target=self._event_loop, name='job-events', daemon=True).start()
+        self._hook_thread = threading.Thread(target=self._hook_loop, name='job-hooks', daemon=True)
+        self._hook_thread.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, func: Callable, **kwargs) -> Job:
+        """İşi kuyruğa ekler; kuyruk doluysa QueueFullError fırlatır"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Job queue is shut down")
+            if len(self._pending) >= self.max_queue:
+                raise QueueFullError(f"Queue is full ({self.max_queue} jobs waiting)")
+
+            # Kimlik sunucu işçileri arasında da tekil olmalı (oturum deposu ortak)
+            job_id = uuid.uuid4().hex
+            job = Job(job_id, func, kwargs)
+            self._jobs[job_id] = job
+            self._pending.append(job)
+            self._record_event(job, {'stage': QUEUED})
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """İş kaydını döner"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """İşin durum sözlüğü (kuyruktaysa sırası ile)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            position = self._pending.index(job) + 1 if job.status == QUEUED else None
+            return job.to_dict(position)
+
+    def wait_events(self, job_id: str, after: int = 0, timeout: float = 15.0) -> Optional[Dict[str, Any]]:
+        """
+        ``after`` sıra numarasından sonraki olayları bekler
+
+        Yeni olay gelene, iş bitene veya süre dolana kadar bloklar;
+        {'events': [(seq, olay), ...], 'finished': bool} döner.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._lock.wait_for(lambda: job.seq > after or job.status in FINISHED_STATES, timeout)
+            return {
+                'events': [(seq, event) for seq, event in job.events if seq > after],
+                'finished': job.status in FINISHED_STATES
+            }
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        İşi iptal eder; bitmiş işler için False döner
+
+        Kuyruktaki iş hemen iptal edilir. Çalışan işe iptal bildirilir; iş
+        bir sonraki ilerleme bildiriminde durur ve işçi sonucu bildirince
+        CANCELLED olarak biter (çıktı dizini ancak o zaman temizlenir).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return False
+
+            if job.status == QUEUED:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED)
+            elif not job.cancel_requested:
+                job.cancel_requested = True
+                worker = self._pool.get(job_id)
+                if worker is not None:
+                    worker.cancel.set()
+                self._lock.notify_all()
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Kuyruk doluluk bilgisi"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'warmWorkers': sum(1 for worker in self._workers if not worker.retired),
+                'running': len(self._running),
+                'queued': len(self._pending),
+                'maxQueue': self.max_queue,
+                'jobs': dict(Counter(job.status for job in self._jobs.values()))
+            }
+
+    def worker_pids(self) -> list:
+        """Canlı işçi süreçlerinin kimlikleri (bellek ölçümü için)"""
+        with self._lock:
+            return [worker.process.pid for worker in self._workers if worker.process.is_alive()]
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Kuyruktaki ve çalışan işler bitene kadar bekler; süre dolarsa False"""
+        with self._lock:
+            return self._lock.wait_for(lambda: not self._pending and not self._running, timeout)
+
+    def shutdown(self):
+        """Bekleyen işleri iptal eder, çalışan süreçleri sonlandırır"""
+        with self._lock:
+            self._closed = True
+            # Önce süreçler durur; iş dizinleri yazılırken silinmez
+            for worker in self._workers:
+                worker.retire(terminate=True)
+            for worker in self._workers:
+                worker.process.join(timeout=5)
+            for job in list(self._pending) + list(self._running.values()):
+                self._finish(job, CANCELLED)
+            self._pending.clear()
+            self._running.clear()
+            self._pool.clear()
+            self._workers.clear()
+            self._hooks.put(None)
+        # Bitiş kancaları (sonuç kaydı, dizin temizliği) süreç çıkmadan tamamlansın
+        if self._hook_thread is not threading.current_thread():
+            self._hook_thread.join(timeout=30)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None):
+        """İşi bitmiş olarak işaretler (kilit altında çağrılır)"""
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.process = None
+        self._time_stage(job, job.finished_at)
+        self._record_event(job, {'stage': status})
+        if self.on_finish:
+            self._hooks.put(('finish', job, None))
+
+    def _record_event(self, job: Job, event: Dict[str, Any]):
+        """Olayı işin geçmişine ekler ve bekleyenleri uyandırır (kilit altında çağrılır)"""
+        job.seq += 1
+        job.events.append((job.seq, event))
+        self._lock.notify_all()
+        if self.on_event and job.status not in FINISHED_STATES:
+            # Kanca sonradan çalışır; işin o anki durumu kopyalanır
+            self._hooks.put(('event', job, {'event': event, 'seq': job.seq, 'status': job.status,
+                                            'stage': job.stage, 'progress': job.progress}))
+
+    def _hook_loop(self):
+        """on_event / on_finish kancalarını kilit dışında, olay sırasıyla çağırır"""
+        while True:
+            item = self._hooks.get()
+            if item is None:
+                return
+            kind, job, state = item
+            try:
+                if kind == 'event':
+                    self.on_event(job, state)
+                else:
+                    self.on_finish(job)
+            except Exception as e:
+                logger.error(f"Job {kind} hook failed for {job.job_id}: {e}")
+
+    def _time_stage(self, job: Job, now: float):
+        """Biten aşamanın süresini ekler ve yeni aşamanın saatini başlatır (kilit altında çağrılır)"""
+        if job.stage is not None and job.stage_started is not None:
+            job.stage_durations[job.stage] = job.stage_durations.get(job.stage, 0.0) + now - job.stage_started
+        job.stage_started = now
+
+    def _spawn_workers(self):
+        """Havuzu hedef işçi sayısına tamamlar (kilit altında çağrılır)"""
+        active = [worker for worker in self._workers if not worker.retired]
+        for _ in range(self.workers - len(active)):
+            self._workers.append(_Worker(self._context, self._events, self.initializer, self.initargs,
+                                         f"merge-worker-{next(self._worker_ids)}"))
+
+    def _dispatch_loop(self):
+        """Boş işçilere kuyruktan iş verir, ölen işçileri toplar ve yenilerini başlatır"""
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+
+                for worker in list(self._workers):
+                    if worker.process.is_alive():
+                        continue
+                    self._workers.remove(worker)
+                    job = worker.job
+                    if job is not None and job.status == RUNNING:
+                        self._running.pop(job.job_id, None)
+                        self._pool.pop(job.job_id, None)
+                        if job.cancel_requested:
+                            self._finish(job, CANCELLED)
+                        else:
+                            self._finish(job, FAILED, error=f"Worker exited with code {worker.process.exitcode}")
+                self._spawn_workers()
+
+                idle = [worker for worker in self._workers if worker.job is None and not worker.retired]
+                while self._pending and idle:
+                    job = self._pending.popleft()
+                    worker = idle.pop(0)
+                    worker.assign(job)
+                    job.process = worker.process
+                    job.status = RUNNING
+                    job.started_at = job.stage_started = time.time()
+                    self._record_event(job, {'stage': RUNNING})
+                    self._running[job.job_id] = job
+                    self._pool[job.job_id] = worker
+
+                self._prune()
+                self._lock.wait(timeout=0.5)
+
+    def _event_loop(self):
+        """İşçi süreçlerden gelen aşama ve sonuç olaylarını işler"""
+        while not self._closed:
+            try:
+                job_id, kind, payload = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if kind == 'progress':
+                    if job is None or job.status in FINISHED_STATES or job.cancel_requested:
+                        continue
+                    if payload['stage'] != job.stage:
+                        self._time_stage(job, time.time())
+                    job.stage = payload['stage']
+                    job.progress = payload
+                    self._record_event(job, payload)
+                    continue
+
+                # Sonuç: işçi serbest kalır
+                self._running.pop(job_id, None)
+                worker = self._pool.pop(job_id, None)
+                if worker is not None:
+                    worker.job = None
+                    worker.jobs_done += 1
+                    if worker.jobs_done >= self.max_jobs_per_worker:
+                        worker.retire()
+                if job is None or job.status in FINISHED_STATES:
+                    continue
+                if job.cancel_requested:
+                    # İptalden hemen önce biten işin sonucu da atılır
+                    self._finish(job, CANCELLED)
+                else:
+                    self._finish(job, kind, result=payload if kind == DONE else None,
+                                 error=payload if kind == FAILED else None)
+
+    def _prune(self):
+        """Süresi dolan bitmiş işleri kayıttan siler (kilit altında çağrılır)"""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.status in FINISHED_STATES and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+
+def link_input(src: Path, dst: Path):
+    """Giriş dosyasını hard link ile, olmazsa sembolik link ile bağlar"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        os.symlink(src.resolve(), dst)
+
+
+def warm_merger_engine():
+    """İşçi süreç başlangıcı: birleştirici motorunu kurar ve ısıtır"""
+    from advanced_data_merger import MergerEngine, configure_logging
+
+    configure_logging()
+    elapsed = MergerEngine.shared().warm_up()
+    logger.info(f"Merger engine warmed up in {elapsed * 1000:.0f}ms (pid {os.getpid()})")
+
+
+def prepare_input_dir(files) -> Path:
+    """
+    Yüklenen dosyaları yeni bir geçici giriş dizinine bağlar (üst süreçte)
+
+    Dizin işi kuyruğa ekleyen süreçte oluşturulur ve iş bitince orada
+    silinir (on_finish); işçi süreç dizinin ömründen sorumlu değildir.
+    """
+    input_dir = Path(tempfile.mkdtemp(prefix='eds-input-'))
+    # Yüklenen dosyalar kopyalanmaz; giriş dizinine bağlanır
+    for file_info in files:
+        src_path = Path(file_info['path'])
+        if src_path.exists():
+            link_input(src_path, input_dir / Path(file_info['name']).name)
+    return input_dir
+
+
+def run_merge_job(report: Callable[..., None], input_dir: str, settings: Dict[str, Any], output_dir: str,
+                  cache_key: Optional[str] = None, cache_dir: Optional[str] = None,
+                  cache_max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Web arayüzünden gelen bir birleştirme işini çalıştırır (işçi süreçte)
+
+    Giriş dizini (prepare_input_dir) üzerinde AdvancedDataMerger çalıştırılır
+    ve web arayüzünün beklediği sonuç özeti döner. cache_key verilmişse
+    çıktılar sonuç önbelleğine de eklenir.
+    """
+    from advanced_data_merger import MergerEngine
+    from merge_artifacts import index_artifacts, precompress_artifacts
+
+    report('preparing')
+    # Motor süreç başına bir kez kurulur; iş bağlamı hafiftir
+    merger = MergerEngine.shared().job(str(input_dir), output_dir,
+                                       progress_callback=lambda event: report(**event))
+    merger.duplicate_detector.distance_threshold = settings.get('duplicateDistance', 0.1)
+
+    with merger.log_to_file():
+        processed_points = merger.process_data()
+
+        report('filtering')
+        min_quality = settings.get('qualityThreshold', 0.3)
+        high_quality_points = [
+            point for point in processed_points
+            if point.confidence_score >= min_quality
+        ]
+
+        merger.export_data(high_quality_points, settings.get('outputName', 'eds_merged_data'))
+
+    report('compressing')
+    artifacts = index_artifacts(Path(output_dir))
+    precompress_artifacts(Path(output_dir), artifacts)
+
+    results = {
+        'totalPoints': len(high_quality_points),
+        'qualityScore': sum(p.confidence_score for p in high_quality_points) / len(high_quality_points) if high_quality_points else 0,
+        'duplicatesRemoved': merger.stats.get('duplicate_groups', 0),
+        'typeDistribution': dict(Counter(p.type for p in high_quality_points)),
+        'cityDistribution': dict(Counter(p.city for p in high_quality_points if p.city)),
+        'processingStats': dict(merger.stats),
+        'artifacts': artifacts,
+        'outputDir': output_dir
+    }
+
+    if cache_key and cache_dir:
+        from result_cache import DEFAULT_MAX_BYTES, ResultCache
+        report('caching')
+        try:
+            ResultCache(Path(cache_dir), cache_max_bytes or DEFAULT_MAX_BYTES).store(cache_key, Path(output_dir), results)
+        except OSError as e:
+            logger.warning(f"Could not cache results for {cache_key[:12]}: {e}")
+
+    return results
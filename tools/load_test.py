@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Yük Testi - Web Server Load Test Harness
+============================================
+
+web_server.py uç noktalarını eşzamanlı kullanıcı akışlarıyla yükler ve
+uç nokta başına verim, gecikme yüzdelikleri ve hata oranlarını raporlar.
+
+Senaryolar (her sanal kullanıcı için, tekrar tekrar):
+    flow:    POST /upload -> POST /process -> GET /status/<id> (bitene kadar)
+             -> GET /download/<id>/<format>
+    cameras: GET /api/cameras (rastgele bbox / en yakın k sorguları; okuma yolu)
+
+Özellikler:
+- Sunucu yerelde ayrı bir süreçte, geçici yükleme / önbellek / oturum
+  dizinleriyle başlatılır (veya --url ile çalışan bir sunucu hedeflenir):
+  dev = web_server.py'nin app.run(debug=True) yolu, prod =
+  production_server.py; --server both ikisini sırayla ölçüp karşılaştırır
+- Türkiye sınırları içinde rastgele noktalardan, istenen boyutta sentetik
+  GeoJSON yüklemeleri; varsayılan olarak her akış farklı içerik yükler
+  (--reuse ile aynı dosya: yükleme tekilleştirme ve sonuç önbelleği yolu)
+- 429 (kuyruk dolu) yanıtlarında Retry-After kadar beklenip yeniden denenir;
+  reddedilen istekler hata olarak sayılır
+- Rapor: uç nokta başına istek/s, p50 / p90 / p99 / maks. (ms), hata oranı
+  ve durum kodları; akış başına toplam süre
+
+Usage:
+    python load_test.py run --concurrency 8 --flows 40 --size-kb 256
+    python load_test.py run --duration 60 --merge-workers 4 --report load.json
+    python load_test.py run --url http://localhost:5000 --concurrency 16 --reuse
+    python load_test.py run --scenario cameras --server both --workers 4 --threads 8 --duration 20
+"""
+
+import argparse
+import json
+import math
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+TURKEY_BBOX = (36.0, 26.0, 42.0, 45.0)  # güney, batı, kuzey, doğu
+CAMERA_TYPES = ['OHITS', 'MOBILE', 'REDLIGHT', 'SECTION_CONTROL', 'TUNNEL']
+DEFAULT_SIZE_KB = 128
+DEFAULT_CONCURRENCY = 4
+DEFAULT_POLL_INTERVAL_S = 0.25
+DEFAULT_TIMEOUT_S = 300.0
+STARTUP_TIMEOUT_S = 30.0
+FLOW = 'flow'
+SCENARIOS = ['flow', 'cameras']
+SERVER_MODES = ['dev', 'prod']
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Sıralı listede en yakın sıra yöntemiyle yüzdelik değer"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(pct / 100.0 * len(values)) - 1))
+    return values[index]
+
+
+def synthetic_upload(size_kb: float, seed: int) -> bytes:
+    """Yaklaşık size_kb büyüklüğünde, rastgele kamera noktalarından oluşan GeoJSON"""
+    rng = random.Random(seed)
+    south, west, north, east = TURKEY_BBOX
+    features = []
+    size = 0
+    while size < size_kb * 1024:
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [round(rng.uniform(west, east), 6),
+                                                          round(rng.uniform(south, north), 6)]},
+            'properties': {
+                'id': f"load_{seed}_{len(features)}",
+                'type': rng.choice(CAMERA_TYPES),
+                'speed_limit': rng.choice([50, 70, 90, 110, None]),
+                'source': 'load_test'
+            }
+        }
+        size += len(json.dumps(feature)) + 2
+        features.append(feature)
+    return json.dumps({'type': 'FeatureCollection', 'features': features}).encode('utf-8')
+
+
+class LoadRecorder:
+    """Uç nokta başına gecikme ve durum kodu kaydı (iş parçacıkları arası paylaşılır)"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.upload_bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float, status: Any, error: bool):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][str(status)] += 1
+            if error:
+                self.errors[endpoint] += 1
+
+    def add_upload_bytes(self, count: int):
+        with self._lock:
+            self.upload_bytes += count
+
+    def report(self, wall_time: float) -> Dict[str, Any]:
+        """Uç nokta başına özet (gecikmeler ms)"""
+        endpoints = {}
+        with self._lock:
+            for endpoint, values in sorted(self.latencies.items()):
+                values = sorted(values)
+                endpoints[endpoint] = {
+                    'requests': len(values),
+                    'rps': round(len(values) / wall_time, 2) if wall_time else 0.0,
+                    'p50_ms': round(percentile(values, 50) * 1000, 1),
+                    'p90_ms': round(percentile(values, 90) * 1000, 1),
+                    'p99_ms': round(percentile(values, 99) * 1000, 1),
+                    'max_ms': round(values[-1] * 1000, 1),
+                    'mean_ms': round(sum(values) / len(values) * 1000, 1),
+                    'errors': self.errors[endpoint],
+                    'error_rate': round(self.errors[endpoint] / len(values), 4),
+                    'statuses': dict(self.statuses[endpoint])
+                }
+            return {
+                'wall_time_s': round(wall_time, 3),
+                'upload_mb_s': round(self.upload_bytes / 1024 / 1024 / wall_time, 2) if wall_time else 0.0,
+                'endpoints': endpoints
+            }
+
+
+class FlowError(Exception):
+    """Akış bir adımda başarısız oldu (kayıt zaten yapıldı)"""
+
+
+class FlowRunner:
+    """Tek bir sanal kullanıcının yükle -> işle -> durum -> indir akışı"""
+
+    def __init__(self, base_url: str, recorder: LoadRecorder, download_format: str = 'geojson',
+                 poll_interval: float = DEFAULT_POLL_INTERVAL_S, timeout: float = DEFAULT_TIMEOUT_S):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.download_format = download_format
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.session = requests.Session()  # iş parçacığı başına; bağlantılar yeniden kullanılır
+
+    def _request(self, endpoint: str, method: str, path: str, ok=(200,), **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            if kwargs.get('stream'):
+                for _ in response.iter_content(256 * 1024):
+                    pass
+        except requests.RequestException as e:
+            self.recorder.record(endpoint, time.perf_counter() - start, type(e).__name__, True)
+            raise FlowError(f"{endpoint}: {e}")
+        self.recorder.record(endpoint, time.perf_counter() - start, response.status_code,
+                             response.status_code not in ok)
+        return response
+
+    def run(self, payload: bytes, name: str) -> bool:
+        """Akışı çalıştırır; tüm adımlar başarılıysa True"""
+        start = time.perf_counter()
+        try:
+            self._flow(payload, name)
+            ok = True
+        except FlowError:
+            ok = False
+        self.recorder.record(FLOW, time.perf_counter() - start, 'ok' if ok else 'failed', not ok)
+        return ok
+
+    def _flow(self, payload: bytes, name: str):
+        response = self._request('upload', 'POST', '/upload',
+                                 files={'files': (name, payload, 'application/geo+json')})
+        if response.status_code != 200:
+            raise FlowError(f"upload: HTTP {response.status_code}")
+        self.recorder.add_upload_bytes(len(payload))
+        files = response.json()['files']
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            response = self._request('process', 'POST', '/process', ok=(200, 202),
+                                     json={'files': files, 'settings': {}})
+            if response.status_code != 429:
+                break
+            if time.monotonic() > deadline:
+                raise FlowError("process: queue stayed full")
+            time.sleep(float(response.headers.get('Retry-After', 1)))
+        if response.status_code not in (200, 202):
+            raise FlowError(f"process: HTTP {response.status_code}")
+        job = response.json()
+
+        status = job.get('status')
+        while status not in ('done', 'failed', 'cancelled'):
+            if time.monotonic() > deadline:
+                raise FlowError("status: job did not finish in time")
+            time.sleep(self.poll_interval)
+            response = self._request('status', 'GET', f"/status/{job['jobId']}")
+            if response.status_code != 200:
+                raise FlowError(f"status: HTTP {response.status_code}")
+            status = response.json().get('status')
+        if status != 'done':
+            raise FlowError(f"job {status}")
+
+        response = self._request('download', 'GET', f"/download/{job['jobId']}/{self.download_format}",
+                                 stream=True)
+        if response.status_code != 200:
+            raise FlowError(f"download: HTTP {response.status_code}")
+
+    def query_cameras(self, rng: random.Random) -> bool:
+        """Rastgele bir kamera sorgusu: yarısı bbox, yarısı en yakın k"""
+        south, west, north, east = TURKEY_BBOX
+        lat, lng = rng.uniform(south, north), rng.uniform(west, east)
+        if rng.random() < 0.5:
+            query = {'bbox': f"{lat:.4f},{lng:.4f},{lat + 0.5:.4f},{lng + 0.5:.4f}"}
+        else:
+            query = {'near': f"{lat:.4f},{lng:.4f}", 'k': 20}
+        try:
+            response = self._request('cameras', 'GET', '/api/cameras', params=query,
+                                     headers={'Accept-Encoding': 'gzip'})
+        except FlowError:
+            return False
+        return response.status_code == 200
+
+
+def run_load(base_url: str, concurrency: int, flows: Optional[int] = None, duration: Optional[float] = None,
+             size_kb: float = DEFAULT_SIZE_KB, reuse: bool = False, download_format: str = 'geojson',
+             poll_interval: float = DEFAULT_POLL_INTERVAL_S, seed: int = 0,
+             scenario: str = 'flow') -> Dict[str, Any]:
+    """
+    concurrency sanal kullanıcı ile akışları çalıştırır
+
+    flows toplam akış (cameras senaryosunda sorgu) sayısıdır; duration
+    verilirse süre dolana kadar yeni akış başlatılır (çalışan akışlar
+    tamamlanır).
+    """
+    recorder = LoadRecorder()
+    flow_ids = iter(range(flows if flows is not None else sys.maxsize))
+    flow_lock = threading.Lock()
+    shared_payload = synthetic_upload(size_kb, seed) if reuse and scenario == 'flow' else None
+    results = Counter()
+    started = time.perf_counter()
+    stop_at = started + duration if duration else None
+
+    def next_flow() -> Optional[int]:
+        with flow_lock:
+            if stop_at is not None and time.perf_counter() >= stop_at:
+                return None
+            return next(flow_ids, None)
+
+    def user(user_id: int):
+        runner = FlowRunner(base_url, recorder, download_format, poll_interval)
+        rng = random.Random(seed * 1_000_003 + user_id)
+        while True:
+            flow_id = next_flow()
+            if flow_id is None:
+                return
+            if scenario == 'cameras':
+                ok = runner.query_cameras(rng)
+            else:
+                # Yükleme verisi ölçüm dışında üretilir; farklı içerik önbelleği atlar
+                payload = shared_payload or synthetic_upload(size_kb, seed * 1_000_003 + flow_id + 1)
+                ok = runner.run(payload, f"load_{flow_id}.geojson")
+            with flow_lock:
+                results['ok' if ok else 'failed'] += 1
+
+    threads = [threading.Thread(target=user, args=(i,), name=f"load-user-{i}", daemon=True)
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall_time = time.perf_counter() - started
+    report = recorder.report(wall_time)
+    report.update({
+        'base_url': base_url,
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'size_kb': size_kb,
+        'reuse': reuse,
+        'flows': {'completed': results['ok'], 'failed': results['failed'],
+                  'per_s': round(results['ok'] / wall_time, 3) if wall_time else 0.0}
+    })
+    return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """web_server.py'yi geçici dizinlerle ayrı bir süreçte çalıştırır (with bloğu)"""
+
+    def __init__(self, mode: str = 'dev', merge_workers: int = 2, max_queued_jobs: int = 8,
+                 workers: int = 2, threads: int = 8, port: Optional[int] = None):
+        self.mode = mode
+        self.merge_workers = merge_workers
+        self.max_queued_jobs = max_queued_jobs
+        self.workers = workers
+        self.threads = threads
+        self.port = port or free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.process: Optional[subprocess.Popen] = None
+        self._workdir = None
+        self.log_path: Optional[Path] = None
+
+    def command(self) -> List[str]:
+        return [sys.executable, str(Path(__file__).resolve()), 'serve', '--port', str(self.port),
+                '--data-dir', self._workdir.name, '--merge-workers', str(self.merge_workers),
+                '--max-queued-jobs', str(self.max_queued_jobs), '--mode', self.mode,
+                '--workers', str(self.workers), '--threads', str(self.threads)]
+
+    def describe(self) -> Dict[str, Any]:
+        info = {'mode': self.mode, 'merge_workers': self.merge_workers}
+        if self.mode == 'prod':
+            info.update(workers=self.workers, threads=self.threads)
+        return info
+
+    def __enter__(self) -> 'LocalServer':
+        self._workdir = tempfile.TemporaryDirectory(prefix='eds-load-')
+        self.log_path = Path(self._workdir.name) / 'server.log'
+        with open(self.log_path, 'wb') as log:
+            self.process = subprocess.Popen(self.command(), cwd=str(Path(__file__).parent),
+                                            stdout=log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + STARTUP_TIMEOUT_S
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self.process.returncode} (log: {self.log_path})")
+            try:
+                if requests.get(self.base_url + '/api/info', timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.1)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f"Server did not start within {STARTUP_TIMEOUT_S:.0f}s")
+
+    def __exit__(self, *exc):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._workdir.cleanup()
+
+
+def serve(port: int, data_dir: str, merge_workers: int, max_queued_jobs: int, mode: str = 'dev',
+          workers: int = 2, threads: int = 8):
+    """
+    Yük testi sunucusu
+
+    dev: web_server.py'nin çalıştırdığı yol (app.run(debug=True), yeniden
+    yükleyici hariç); prod: production_server.py (merge_workers işçi başına)
+    """
+    import web_server
+    from upload_store import UploadRequest, UploadStore
+
+    app = web_server.app
+    data = Path(data_dir)
+    app.config.update(UPLOAD_FOLDER=str(data / 'uploads'), RESULT_CACHE_DIR=str(data / 'cache'),
+                      SESSION_DB=str(data / 'sessions.db'), MERGE_WORKERS=merge_workers,
+                      MAX_QUEUED_JOBS=max_queued_jobs)
+    UploadRequest.upload_store = UploadStore(Path(app.config['UPLOAD_FOLDER']), app.config['MAX_UPLOAD_SIZE'])
+
+    if mode == 'prod':
+        from production_server import build_server
+        build_server('127.0.0.1', port, workers, threads).run()
+        return
+
+    # SIGTERM'de atexit çalışsın (iş kuyruğu işçileri kapatılır)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    web_server.get_job_queue()
+    app.run(host='127.0.0.1', port=port, debug=True, use_reloader=False)
+
+
+def print_report(report: Dict[str, Any]):
+    """Raporu okunabilir biçimde yazdırır"""
+    flows = report['flows']
+    server = report.get('server')
+    if report['scenario'] == 'cameras':
+        print(f"\n🧪 {report['concurrency']} eşzamanlı kullanıcı, kamera sorguları - {report['wall_time_s']}s")
+    else:
+        print(f"\n🧪 {report['concurrency']} eşzamanlı kullanıcı, {report['size_kb']}KB yükleme"
+              f"{' (aynı dosya)' if report['reuse'] else ''} - {report['wall_time_s']}s")
+    if server:
+        print("🖥️  Sunucu: " + ", ".join(f"{key} {value}" for key, value in server.items()))
+    print(f"🔁 Akış: {flows['completed']} tamamlandı, {flows['failed']} başarısız, {flows['per_s']}/s; "
+          f"yükleme {report['upload_mb_s']}MB/s")
+    print(f"\n{'Uç nokta':<10} {'istek':>7} {'istek/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'maks.':>8} {'hata':>7}")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:<10} {stats['requests']:>7} {stats['rps']:>8} {stats['p50_ms']:>8} "
+              f"{stats['p90_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8} {stats['error_rate']:>7.1%}")
+    failures = {endpoint: {code: count for code, count in stats['statuses'].items()
+                           if code not in ('200', '202', 'ok')}
+                for endpoint, stats in report['endpoints'].items()}
+    for endpoint, codes in failures.items():
+        if codes:
+            print(f"⚠️  {endpoint}: " + ", ".join(f"{code} x{count}" for code, count in codes.items()))
+
+
+def print_comparison(reports: Dict[str, Dict[str, Any]]):
+    """Sunum modlarını uç nokta başına istek/s ve p99 ile karşılaştırır"""
+    baseline, candidate = reports['dev'], reports['prod']
+    print("\n⚖️  dev -> prod")
+    print(f"{'Uç nokta':<10} {'istek/s':>17} {'p99 (ms)':>19}")
+    for endpoint, stats in candidate['endpoints'].items():
+        base = baseline['endpoints'].get(endpoint)
+        if not base:
+            continue
+        speedup = f"x{stats['rps'] / base['rps']:.2f}" if base['rps'] else '-'
+        print(f"{endpoint:<10} {base['rps']:>7} -> {stats['rps']:<7} {base['p99_ms']:>8} -> "
+              f"{stats['p99_ms']:<8} {speedup}")
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Web Server Load Test Harness')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='Drive concurrent upload -> process -> status -> download flows')
+    run.add_argument('--url', help='Target a running server instead of starting one locally')
+    run.add_argument('--scenario', choices=SCENARIOS, default='flow')
+    run.add_argument('--server', choices=SERVER_MODES + ['both'], default='dev',
+                     help='Local serving mode (both: benchmark dev against prod)')
+    run.add_argument('--workers', type=int, default=2, help='Prod mode HTTP worker processes')
+    run.add_argument('--threads', type=int, default=8, help='Prod mode threads per worker')
+    run.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    run.add_argument('--flows', type=int, help='Total flows (default: 10 per user unless --duration)')
+    run.add_argument('--duration', type=float, help='Start new flows for this many seconds')
+    run.add_argument('--size-kb', type=float, default=DEFAULT_SIZE_KB, help='Synthetic upload size')
+    run.add_argument('--reuse', action='store_true', help='Upload the same file in every flow (cache path)')
+    run.add_argument('--format', default='geojson', help='Artifact to download')
+    run.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL_S)
+    run.add_argument('--merge-workers', type=int, default=2,
+                     help='Local server merge processes (per HTTP worker in prod mode)')
+    run.add_argument('--max-queued-jobs', type=int, default=8, help='Local server queue depth')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--report', help='Write the JSON report to this file')
+
+    srv = subparsers.add_parser('serve', help='Run web_server.py for load testing (used by run)')
+    srv.add_argument('--port', type=int, default=5000)
+    srv.add_argument('--data-dir', help='Uploads, cache and session database (default: new temp dir)')
+    srv.add_argument('--merge-workers', type=int, default=2)
+    srv.add_argument('--max-queued-jobs', type=int, default=8)
+    srv.add_argument('--mode', choices=SERVER_MODES, default='dev')
+    srv.add_argument('--workers', type=int, default=2)
+    srv.add_argument('--threads', type=int, default=8)
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.port, args.data_dir or tempfile.mkdtemp(prefix='eds-load-'), args.merge_workers,
+              args.max_queued_jobs, args.mode, args.workers, args.threads)
+        return
+
+    flows = args.flows if args.flows or args.duration else args.concurrency * 10
+    options = dict(concurrency=args.concurrency, flows=flows, duration=args.duration, size_kb=args.size_kb,
+                   reuse=args.reuse, download_format=args.format, poll_interval=args.poll_interval,
+                   seed=args.seed, scenario=args.scenario)
+
+    if args.url:
+        report = run_load(args.url, **options)
+        print_report(report)
+    else:
+        reports = {}
+        for mode in (SERVER_MODES if args.server == 'both' else [args.server]):
+            with LocalServer(mode, args.merge_workers, args.max_queued_jobs, args.workers,
+                             args.threads) as server:
+                print(f"🚀 Yerel sunucu ({mode}): {server.base_url}")
+                reports[mode] = run_load(server.base_url, **options)
+            reports[mode]['server'] = server.describe()
+            print_report(reports[mode])
+        if args.server == 'both':
+            print_comparison(reports)
+        report = reports if args.server == 'both' else reports[args.server]
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📁 Rapor: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Birleştirme Çıktıları - Merge Artifact Helpers
+==================================================
+
+Birleştirme çıktı dizinindeki dosyaları formatlarına göre eşler, önceden
+sıkıştırılmış (.gz / .br) kopyalarını üretir ve tüm çıktıları diske geçici
+dosya yazmadan akış halinde ZIP olarak verir.
+
+Format eşleme (export_data çıktıları):
+    <ad>_<zaman>.geojson        -> geojson
+    <ad>_<zaman>.json           -> json
+    <ad>_<zaman>.csv            -> csv
+    <ad>_<zaman>.db             -> db
+    <ad>_<zaman>_stats.json     -> stats
+    <ad>_<zaman>_sections.json  -> sections
+    <ad>_<zaman>.index.bin      -> index (camera_index.py paketlenmiş indeksi)
+
+Not: Eski "eds_merged_data_*.json" deseni _stats.json ve _sections.json
+dosyalarını da yakalıyordu; eşleme artık dosya adının sonekine göre yapılır.
+"""
+
+import gzip
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+SUFFIX_FORMATS = [('_stats.json', 'stats'), ('_sections.json', 'sections'), ('.index.bin', 'index')]
+EXTENSION_FORMATS = {'.geojson': 'geojson', '.json': 'json', '.csv': 'csv', '.db': 'db'}
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]  # tercih sırası
+PRECOMPRESS_MIN_BYTES = 1024
+STREAM_CHUNK = 256 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def artifact_format(name: str) -> Optional[str]:
+    """Çıktı dosya adının formatı; çıktı değilse None"""
+    for suffix, fmt in SUFFIX_FORMATS:
+        if name.endswith(suffix):
+            return fmt
+    return EXTENSION_FORMATS.get(Path(name).suffix)
+
+
+def index_artifacts(output_dir: Path) -> Dict[str, str]:
+    """format -> dosya adı eşlemesi"""
+    artifacts = {}
+    for path in sorted(Path(output_dir).iterdir()):
+        fmt = artifact_format(path.name)
+        if fmt and path.is_file():
+            artifacts[fmt] = path.name
+    return artifacts
+
+
+def precompress_artifacts(output_dir: Path, artifacts: Dict[str, str]) -> int:
+    """
+    Çıktıların .gz (ve brotli varsa .br) kopyalarını parça parça yazar
+
+    SQLite dosyası da sıkıştırılır; küçük dosyalar atlanır. Yazılan dosya
+    sayısını döner.
+    """
+    written = 0
+    for name in artifacts.values():
+        path = Path(output_dir) / name
+        if path.stat().st_size < PRECOMPRESS_MIN_BYTES:
+            continue
+
+        with open(path, 'rb') as src, gzip.GzipFile(path.with_name(name + '.gz'), 'wb',
+                                                     compresslevel=GZIP_LEVEL, mtime=0) as dst:
+            for chunk in iter(lambda: src.read(STREAM_CHUNK), b''):
+                dst.write(chunk)
+        written += 1
+
+        if HAS_BROTLI:
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            with open(path, 'rb') as src, open(path.with_name(name + '.br'), 'wb') as dst:
+                for chunk in iter(lambda: src.read(STREAM_CHUNK), b''):
+                    dst.write(compressor.process(chunk))
+                dst.write(compressor.finish())
+            written += 1
+    return written
+
+
+def choose_encoding(path: Path, accepts) -> Tuple[Path, Optional[str]]:
+    """
+    İstemcinin kabul ettiği en iyi önceden sıkıştırılmış kopyayı seçer
+
+    accepts: Werkzeug request.accept_encodings (q=0 reddedilmiş sayılır).
+    Kopya yoksa veya kaynaktan eskiyse orijinal dosya döner.
+    """
+    for encoding, suffix in PRECOMPRESSED:
+        if accepts.quality(encoding) <= 0:
+            continue
+        candidate = path.with_name(path.name + suffix)
+        try:
+            if candidate.stat().st_mtime >= path.stat().st_mtime:
+                return candidate, encoding
+        except OSError:
+            continue
+    return path, None
+
+
+class _ZipStream:
+    """ZipFile'ın yazdığı baytları toplayan, konumlandırılamayan (unseekable) akış"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(output_dir: Path, names: List[str]) -> Iterator[bytes]:
+    """
+    Dosyaları ZIP olarak parça parça üretir
+
+    ZIP diske yazılmaz; ilk baytlar ilk dosyanın ilk parçası sıkıştırılır
+    sıkıştırılmaz gönderilir. Bellek kullanımı STREAM_CHUNK mertebesindedir.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            path = Path(output_dir) / name
+            info = zipfile.ZipInfo.from_file(path, name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, 'rb') as src, archive.open(info, 'w', force_zip64=info.file_size > 0x7FFFFFFF) as dst:
+                for chunk in iter(lambda: src.read(STREAM_CHUNK), b''):
+                    dst.write(chunk)
+                    data = stream.drain()
+                    if data:
+                        yield data
+            data = stream.drain()
+            if data:
+                yield data
+    yield stream.drain()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Metrik Kaydı - In-Process Metrics Registry
+==============================================
+
+Web sunucusu ve birleştirme işleri için sayaç, histogram ve anlık değer
+(gauge) kaydı; ``/metrics`` uç noktası Prometheus metin formatında yazar.
+
+Özellikler:
+- Kilitsiz yazım: her iş parçacığı yalnızca kendi parçasına (shard) yazar;
+  değerler okuma (scrape) sırasında toplanır. Ölçüm başına bir sözlük
+  güncellemesi ve (histogramda) bir bisect maliyeti vardır
+- Biten iş parçacıklarının parçaları temel parçaya katlanır; istek başına
+  iş parçacığı açan sunucularda parça sayısı büyümez
+- Gauge değerleri okuma anında bir fonksiyonla hesaplanır (kuyruk
+  derinliği, bellek)
+- Etiket kümeleri sınırlı tutulmalıdır (ör. URL yerine route şablonu)
+
+Çok süreçli mod (ön-çatallı sunucu, ``start_export``): her süreç değerlerinin
+anlık görüntüsünü ortak bir dizine ``<pid>.json`` olarak periyodik yazar;
+hangi süreç okunursa okunsun tüm süreçlerin toplamı yayınlanır
+(prometheus_client multiprocess modu gibi). Ölen süreçlerin sayaç ve
+histogramları arşiv dosyasına katlanır, toplamlar geri gitmez. Gauge'lar
+yalnızca yaşayan süreçlerden toplanır (sum) veya en büyüğü alınır (max).
+Diğer süreçlerin değerleri en fazla bir yazım aralığı kadar eskidir.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FOLD_THRESHOLD = 64
+EXPORT_INTERVAL_S = 5.0
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+GAUGE_AGGREGATES = ('sum', 'max')
+
+LabelKey = Tuple[Tuple[str, str], ...]
+GaugeValue = Union[float, Dict[LabelKey, float]]
+
+
+def label_key(labels: Dict[str, object]) -> LabelKey:
+    """Etiket sözlüğünün sıralı, hashlenebilir karşılığı"""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Shard:
+    """Bir iş parçacığının yazdığı değerler"""
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.thread = weakref.ref(thread) if thread is not None else None
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        # (ad, etiketler) -> [kova sayıları..., toplam, adet]
+        self.histograms: Dict[Tuple[str, LabelKey], List[float]] = {}
+
+    def alive(self) -> bool:
+        thread = self.thread() if self.thread is not None else None
+        return thread is not None and thread.is_alive()
+
+    def merge_into(self, other: '_Shard'):
+        for key, value in self.counters.items():
+            other.counters[key] = other.counters.get(key, 0) + value
+        for key, values in self.histograms.items():
+            target = other.histograms.get(key)
+            if target is None:
+                other.histograms[key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    target[i] += value
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Counter:
+    """Yalnızca artan sayaç"""
+
+    def __init__(self, registry: 'Registry', name: str):
+        self._registry = registry
+        self.name = name
+
+    def inc(self, amount: float = 1, **labels):
+        counters = self._registry._shard().counters
+        key = (self.name, label_key(labels))
+        counters[key] = counters.get(key, 0) + amount
+
+
+class Histogram:
+    """Kovalı dağılım (Prometheus histogramı)"""
+
+    def __init__(self, registry: 'Registry', name: str, buckets: Sequence[float]):
+        self._registry = registry
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        histograms = self._registry._shard().histograms
+        key = (self.name, label_key(labels))
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0] * (len(self.buckets) + 3)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+
+class Registry:
+    """Metrik tanımları ve iş parçacığı parçaları"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._base = _Shard(None)
+        self._shards_lock = threading.Lock()  # yalnızca parça ekleme/katlama için
+        self._metrics: Dict[str, Tuple[str, str, Optional[tuple]]] = {}
+        self._gauges: Dict[str, Callable[[], GaugeValue]] = {}
+        self._gauge_aggregates: Dict[str, str] = {}
+        self._export_dir: Optional[Path] = None
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard(threading.current_thread())
+            with self._shards_lock:
+                if len(self._shards) >= FOLD_THRESHOLD:
+                    self._fold()
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _fold(self):
+        """Biten iş parçacıklarının parçalarını temel parçaya katlar (kilit altında)"""
+        alive = []
+        for shard in self._shards:
+            if shard.alive():
+                alive.append(shard)
+            else:
+                shard.merge_into(self._base)
+        self._shards = alive
+
+    def _define(self, name: str, kind: str, help_text: str, buckets: Optional[tuple] = None):
+        if name in self._metrics and self._metrics[name][0] != kind:
+            raise ValueError(f"Metric {name} already registered as {self._metrics[name][0]}")
+        self._metrics[name] = (kind, help_text, buckets)
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        self._define(name, 'counter', help_text)
+        return Counter(self, name)
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        histogram = Histogram(self, name, buckets)
+        self._define(name, 'histogram', help_text, histogram.buckets)
+        return histogram
+
+    def gauge(self, name: str, help_text: str, func: Callable[[], GaugeValue], aggregate: str = 'sum'):
+        """
+        Değeri okuma anında func() ile hesaplanan gauge (sayı veya {etiketler: değer})
+
+        aggregate: çok süreçli modda süreçlerin değerleri toplanır (sum) veya
+        en büyüğü alınır (max; ör. süreçlerin ortak gördüğü disk boyutu).
+        """
+        if aggregate not in GAUGE_AGGREGATES:
+            raise ValueError(f"Gauge aggregate must be one of {GAUGE_AGGREGATES}")
+        self._define(name, 'gauge', help_text)
+        self._gauges[name] = func
+        self._gauge_aggregates[name] = aggregate
+
+    def _gauge_values(self) -> Dict[Tuple[str, LabelKey], float]:
+        """Tüm gauge'ların bu süreçteki değerleri"""
+        values = {}
+        for name, func in self._gauges.items():
+            try:
+                value = func()
+            except Exception:
+                continue
+            items = value.items() if isinstance(value, dict) else [((), value)]
+            for key, item in items:
+                values[(name, key)] = item
+        return values
+
+    def snapshot(self) -> Dict[str, List[Any]]:
+        """Bu sürecin değerleri (JSON uyumlu)"""
+        total = self.collect()
+        return {
+            'counters': [[name, key, value] for (name, key), value in total.counters.items()],
+            'histograms': [[name, key, values] for (name, key), values in total.histograms.items()],
+            'gauges': [[name, key, value] for (name, key), value in self._gauge_values().items()]
+        }
+
+    def start_export(self, directory: Path, interval: float = EXPORT_INTERVAL_S):
+        """
+        Çok süreçli modu başlatır (fork sonrası, her sunucu sürecinde çağrılır)
+
+        Anlık görüntü interval saniyede bir ve süreç çıkarken yazılır.
+        """
+        self._export_dir = Path(directory)
+        self._export_dir.mkdir(parents=True, exist_ok=True)
+        self.export()
+        atexit.register(self.export)
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.export()
+                except OSError:
+                    pass
+
+        threading.Thread(target=loop, name='metrics-export', daemon=True).start()
+
+    def export(self):
+        """Bu sürecin anlık görüntüsünü <pid>.json olarak atomik yazar"""
+        if self._export_dir is None:
+            return
+        path = self._export_dir / f"{os.getpid()}.json"
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_text(json.dumps(self.snapshot(), separators=(',', ':')), encoding='utf-8')
+        os.replace(temp_path, path)
+
+    def _collect_exported(self, total: _Shard) -> Dict[Tuple[str, LabelKey], List[float]]:
+        """
+        Diğer süreçlerin yazdığı değerleri total'e ekler; gauge değerlerini döner
+
+        Ölen süreçlerin dosyaları arşive katlanır. Katlama özel, okuma ortak
+        dosya kilidi altında yapılır; bir dosya hiçbir zaman iki kez sayılmaz.
+        """
+        import fcntl
+
+        gauges: Dict[Tuple[str, LabelKey], List[float]] = {}
+        own = f"{os.getpid()}.json"
+        with open(self._export_dir / LOCK_FILE, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._archive_dead()
+                fcntl.flock(lock, fcntl.LOCK_SH)
+                for path in self._export_dir.glob('*.json'):
+                    if path.name == own:
+                        continue
+                    try:
+                        data = json.loads(path.read_text(encoding='utf-8'))
+                    except (OSError, ValueError):
+                        continue
+                    _snapshot_shard(data).merge_into(total)
+                    for name, key, value in data.get('gauges', []):
+                        gauges.setdefault((name, _key(key)), []).append(value)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return gauges
+
+    def _archive_dead(self):
+        """Ölen süreçlerin sayaç ve histogramlarını arşiv dosyasına katlar (özel kilit altında)"""
+        archive_path = self._export_dir / ARCHIVE_FILE
+        dead = [path for path in self._export_dir.glob('*.json')
+                if path.stem.isdigit() and not _pid_alive(int(path.stem))]
+        if not dead:
+            return
+        archive = _Shard(None)
+        if archive_path.exists():
+            _snapshot_shard(json.loads(archive_path.read_text(encoding='utf-8'))).merge_into(archive)
+        for path in dead:
+            try:
+                _snapshot_shard(json.loads(path.read_text(encoding='utf-8'))).merge_into(archive)
+            except (OSError, ValueError):
+                pass
+        temp_path = archive_path.with_name(f".{ARCHIVE_FILE}.tmp")
+        temp_path.write_text(json.dumps({
+            'counters': [[name, key, value] for (name, key), value in archive.counters.items()],
+            'histograms': [[name, key, values] for (name, key), values in archive.histograms.items()]
+        }, separators=(',', ':')), encoding='utf-8')
+        os.replace(temp_path, archive_path)
+        for path in dead:
+            path.unlink(missing_ok=True)
+
+    def collect(self) -> _Shard:
+        """Tüm parçaların toplamı"""
+        total = _Shard(None)
+        with self._shards_lock:
+            self._fold()
+            shards = [self._base] + list(self._shards)
+        for shard in shards:
+            # Sözlük kopyası GIL altında tek adımdır; yazan iş parçacığı beklemez
+            snapshot = _Shard(None)
+            snapshot.counters = dict(shard.counters)
+            snapshot.histograms = {key: list(values) for key, values in dict(shard.histograms).items()}
+            snapshot.merge_into(total)
+        return total
+
+    def render(self) -> str:
+        """Prometheus metin formatı (0.0.4); çok süreçli modda tüm süreçlerin toplamı"""
+        total = self.collect()
+        gauges = {key: [value] for key, value in self._gauge_values().items()}
+        if self._export_dir is not None:
+            for key, values in self._collect_exported(total).items():
+                gauges.setdefault(key, []).extend(values)
+
+        lines = []
+        for name, (kind, help_text, buckets) in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            if kind == 'counter':
+                for (metric, key), value in sorted(total.counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+            elif kind == 'histogram':
+                for (metric, key), values in sorted(total.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + (float('inf'),), values[:len(buckets) + 1]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_value(bound)))} "
+                                     f"{_format_value(cumulative)}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(values[-2])}")
+                    lines.append(f"{name}_count{_format_labels(key)} {_format_value(values[-1])}")
+
+            else:
+                combine = max if self._gauge_aggregates[name] == 'max' else sum
+                for (metric, key), values in sorted(gauges.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(combine(values))}")
+        return '\n'.join(lines) + '\n'
+
+
+def _key(key: List[List[str]]) -> LabelKey:
+    """JSON'dan okunan etiket listesini LabelKey'e çevirir"""
+    return tuple((name, value) for name, value in key)
+
+
+def _snapshot_shard(data: Dict[str, List[Any]]) -> _Shard:
+    """Anlık görüntünün sayaç ve histogramları"""
+    shard = _Shard(None)
+    shard.counters = {(name, _key(key)): value for name, key, value in data.get('counters', [])}
+    shard.histograms = {(name, _key(key)): list(values) for name, key, values in data.get('histograms', [])}
+    return shard
+
+
+def process_memory_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """Sürecin yerleşik bellek (RSS) kullanımı; okunamazsa None"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        if pid is not None:
+            return None
+    import resource
+    # Linux dışında: en yüksek RSS (KB; macOS'ta bayt)
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if maxrss > 1 << 32 else maxrss * 1024
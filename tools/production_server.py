@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Üretim Sunucusu - Pre-forking Production Server
+===================================================
+
+web_server.py uygulamasını ön-çatallı (pre-fork), çok süreçli ve süreç
+başına sınırlı iş parçacıklı olarak çalıştırır. Geliştirme sunucusundaki
+hata ayıklayıcı ve yeniden yükleyici kapalıdır.
+
+Özellikler:
+- Ana süreç dinleme soketini açar, salt okunur verileri (yayınlanmış veri
+  seti, kamera indeksi) yükler ve ardından işçileri fork eder; işçiler
+  veriyi copy-on-write paylaşır (gc.freeze ile referans sayaçları sayfaları
+  kirletmez)
+- İşçi başına sabit iş parçacığı havuzu; havuz doluyken işçi accept
+  çağırmaz, bağlantılar çekirdek kuyruğunda boş işçilere kalır
+- Uzun süren akış yanıtları (Server-Sent Events) havuzdan çıkar ve ayrı bir
+  sınırla sayılır; sınır doluysa 503 döner (istemci yoklamaya geçer)
+- Yeni veri sürümü yayınlandığında (veya SIGHUP ile) veri ana süreçte bir
+  kez yüklenir, yeni işçiler başlatılır ve eskiler nazikçe kapatılır:
+  yeni bağlantı almazlar, süren istekleri ve birleştirme işlerini bitirirler
+- Ölen işçiler yeniden başlatılır; ana süreç ölürse işçiler kendiliğinden
+  kapanır
+- SIGTERM / SIGINT: tüm işçiler nazikçe kapatılır (graceful_timeout sonrası
+  SIGKILL)
+
+Not: İş kuyruğu işçi süreci başınadır; işin durumu işçiler arasında oturum
+deposu üzerinden paylaşılır. Metrikler işçilerin ortak metrik dizinine
+yazdığı anlık görüntülerden toplanır; /metrics hangi işçiye düşerse düşsün
+tüm işçilerin (ve kapanmış işçilerin) toplamını döner.
+
+Usage:
+    python production_server.py --workers 4 --threads 8 --port 5000
+    kill -HUP <ana süreç>    # veriyi yeniden yükle, işçileri yenile
+"""
+
+import argparse
+import atexit
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+DEFAULT_WORKERS = max(2, min(os.cpu_count() or 2, 8))
+DEFAULT_THREADS = 8
+DEFAULT_MAX_STREAMS = 64
+DEFAULT_KEEPALIVE_S = 5.0
+DEFAULT_GRACEFUL_TIMEOUT_S = 600.0
+DEFAULT_BACKLOG = 2048
+VERSION_CHECK_S = 1.0
+ACCEPT_WAIT_S = 0.1  # Havuz doluyken kabul döngüsünün bekleme adımı
+STREAM_CONTENT_TYPE = 'text/event-stream'
+STREAM_LIMIT_BODY = b'Too many open event streams\n'
+RESPAWN_DELAY_S = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class PooledRequestHandler(WSGIRequestHandler):
+    """HTTP/1.1 keep-alive; havuz doluyken veya akış yanıtından sonra bağlantı kapatılır"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        # Boşta bekleyen keep-alive bağlantısı dolu havuzda iş parçacığı tutmasın
+        if self.server.release_connection():
+            self.close_connection = True
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Sabit boyutlu iş parçacığı havuzlu WSGI sunucusu
+
+    Tüm iş parçacıkları meşgulken accept çağrılmaz; bekleyen bağlantılar
+    çekirdek kuyruğunda diğer işçilere kalır. Akış yanıtları (SSE) yanıt
+    başlığında havuzdan çıkar ve max_streams ile ayrıca sınırlanır. Boştaki
+    keep-alive bağlantıları keepalive saniye sonra, havuz doluysa hemen
+    kapatılır.
+    """
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, threads: int = DEFAULT_THREADS,
+                 keepalive: float = DEFAULT_KEEPALIVE_S, fd: Optional[int] = None,
+                 max_streams: int = DEFAULT_MAX_STREAMS):
+        handler = type('PooledRequestHandler', (PooledRequestHandler,), {'timeout': keepalive})
+        super().__init__(host, port, self._stream_aware(app), handler=handler, fd=fd)
+        self.threads = threads
+        self.master_pid = os.getppid()
+        self._slots = threading.Condition()
+        self._free_slots = threads
+        self._streams = threading.Semaphore(max_streams)
+        self._local = threading.local()  # streaming: iş parçacığı havuzdan çıktı mı
+        self._handlers: set = set()
+        self._handlers_lock = threading.Lock()
+        self._stopping = False
+
+    def _acquire_slot(self, timeout: float) -> bool:
+        with self._slots:
+            if not self._slots.wait_for(lambda: self._free_slots > 0, timeout):
+                return False
+            self._free_slots -= 1
+            return True
+
+    def _release_slot(self):
+        with self._slots:
+            self._free_slots += 1
+            self._slots.notify()
+
+    def _handle_request_noblock(self):
+        # Boş iş parçacığı yoksa bağlantı kabul edilmez (socketserver önce accept eder)
+        if not self._acquire_slot(ACCEPT_WAIT_S):
+            return
+        try:
+            request, client_address = self.get_request()
+        except OSError:
+            self._release_slot()
+            return
+        if not self.verify_request(request, client_address):
+            self.shutdown_request(request)
+            self._release_slot()
+            return
+        thread = threading.Thread(target=self._handle, args=(request, client_address), daemon=True)
+        with self._handlers_lock:
+            self._handlers.add(thread)
+        try:
+            thread.start()
+        except BaseException:
+            with self._handlers_lock:
+                self._handlers.discard(thread)
+            self.shutdown_request(request)
+            self._release_slot()
+            raise
+
+    def _handle(self, request, client_address):
+        self._local.streaming = False
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._handlers_lock:
+                self._handlers.discard(threading.current_thread())
+            if self._local.streaming:
+                self._streams.release()
+            else:
+                self._release_slot()
+
+    def release_connection(self) -> bool:
+        """İstek sonrası: keep-alive bağlantısı kapatılmalı mı (akış sonrası veya havuz dolu)"""
+        return self._local.streaming or self._free_slots == 0
+
+    def _stream_aware(self, app):
+        """Akış yanıtını havuzdan çıkaran WSGI sarmalayıcısı (sınır doluysa 503)"""
+        def wrapped(environ, start_response):
+            rejected = []
+
+            def start(status, headers, exc_info=None):
+                content_type = next((value for name, value in headers if name.lower() == 'content-type'), '')
+                if content_type.startswith(STREAM_CONTENT_TYPE) and not self._local.streaming:
+                    if not self._streams.acquire(blocking=False):
+                        rejected.append(True)
+                        return start_response('503 Service Unavailable', [
+                            ('Content-Type', 'text/plain; charset=utf-8'),
+                            ('Content-Length', str(len(STREAM_LIMIT_BODY))),
+                            ('Retry-After', '5')], exc_info)
+                    # Bu iş parçacığı artık akış sınırından sayılır; havuzdaki yeri boşalır
+                    self._local.streaming = True
+                    self._release_slot()
+                return start_response(status, headers, exc_info)
+
+            result = app(environ, start)
+            if rejected:
+                if hasattr(result, 'close'):
+                    result.close()
+                return [STREAM_LIMIT_BODY]
+            return result
+
+        return wrapped
+
+    def service_actions(self):
+        # Ana süreç öldüyse (yetim kalan işçi) kapan
+        if os.getppid() != self.master_pid:
+            self.stop()
+
+    def stop(self):
+        """Kabul döngüsünü durdurur (sinyal işleyicisinden çağrılabilir)"""
+        if not self._stopping:
+            self._stopping = True
+            threading.Thread(target=self.shutdown, name='http-shutdown', daemon=True).start()
+
+    def wait_handlers(self, timeout: float) -> bool:
+        """Süren isteklerin bitmesini bekler"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._handlers_lock:
+                handlers = list(self._handlers)
+            if not handlers:
+                return True
+            handlers[0].join(max(0.0, min(1.0, deadline - time.monotonic())))
+        return False
+
+
+class PreforkServer:
+    """
+    Ön-çatallı ana süreç: soket, veri ön yüklemesi, işçi denetimi
+
+    preload(): salt okunur verileri yükler ve veri sürümünü döner; fork'tan
+        önce ve her VERSION_CHECK_S saniyede bir çağrılır, sürüm değişirse
+        işçiler yenilenir
+    post_fork(): işçi süreçte, istek almadan önce
+    drain(timeout): işçi süreçte, HTTP kapandıktan sonra (arka plan işleri)
+    """
+
+    def __init__(self, app, host: str = '0.0.0.0', port: int = 5000, workers: int = DEFAULT_WORKERS,
+                 threads: int = DEFAULT_THREADS, keepalive: float = DEFAULT_KEEPALIVE_S,
+                 graceful_timeout: float = DEFAULT_GRACEFUL_TIMEOUT_S,
+                 preload: Optional[Callable[[], Any]] = None,
+                 post_fork: Optional[Callable[[], None]] = None,
+                 drain: Optional[Callable[[float], None]] = None,
+                 max_streams: int = DEFAULT_MAX_STREAMS):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.keepalive = keepalive
+        self.graceful_timeout = graceful_timeout
+        self.max_streams = max_streams
+        self.preload = preload
+        self.post_fork = post_fork
+        self.drain = drain
+
+        self.socket: Optional[socket.socket] = None
+        self.version: Any = None
+        self._master_pid: Optional[int] = None
+        self._children: Dict[int, int] = {}  # pid -> nesil
+        self._retiring: Dict[int, float] = {}  # pid -> SIGKILL zamanı
+        self._generation = 0
+        self._reload_requested = False
+        self._stop_requested = False
+
+    def run(self):
+        """Sunucuyu başlatır; SIGTERM / SIGINT gelene kadar döner"""
+        self._master_pid = os.getpid()
+        self.socket = socket.create_server((self.host, self.port), backlog=DEFAULT_BACKLOG)
+        self.port = self.socket.getsockname()[1]
+        self.version = self.preload() if self.preload else None
+        self._freeze()
+
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_reload)
+
+        logger.info(f"Listening on {self.host}:{self.port} with {self.workers} workers x {self.threads} threads")
+        self._spawn_generation()
+        try:
+            self._supervise()
+        finally:
+            # İşçiden çıkan SystemExit de buradan geçer; temizlik yalnızca ana süreçte
+            if os.getpid() == self._master_pid:
+                self._stop_all()
+                self.socket.close()
+
+    def _freeze(self):
+        """Fork öncesi: yüklenen nesneler GC taramalarında işçilerin sayfalarını kirletmesin"""
+        gc.collect()
+        gc.freeze()
+
+    def _request_stop(self, *_):
+        self._stop_requested = True
+
+    def _request_reload(self, *_):
+        self._reload_requested = True
+
+    def _supervise(self):
+        next_check = time.monotonic() + VERSION_CHECK_S
+        while not self._stop_requested:
+            self._reap()
+
+            now = time.monotonic()
+            if self._reload_requested or now >= next_check:
+                next_check = now + VERSION_CHECK_S
+                try:
+                    version = self.preload() if self.preload else None
+                except Exception as e:
+                    logger.error(f"Reloading shared data failed, keeping current workers: {e}")
+                    version = self.version
+                if self._reload_requested or version != self.version:
+                    logger.info(f"Reloading workers (data version {str(version)[:16]})")
+                    self.version = version
+                    self._reload_requested = False
+                    self._freeze()
+                    self._spawn_generation()
+
+            current = sum(1 for generation in self._children.values() if generation == self._generation)
+            for _ in range(self.workers - current):
+                self._spawn()
+            time.sleep(0.2)
+
+    def _spawn_generation(self):
+        """Yeni nesil işçileri başlatır, önceki nesli nazikçe kapatır"""
+        previous = [pid for pid, generation in self._children.items() if generation == self._generation]
+        self._generation += 1
+        for _ in range(self.workers):
+            self._spawn()
+        for pid in previous:
+            self._retire(pid)
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = self._generation
+            return
+
+        # İşçi: SystemExit ana süreç döngüsünden çıkar ve yorumlayıcı normal
+        # kapanır (atexit; multiprocessing kaynakları temizlenir)
+        exit_code = 0
+        try:
+            self._worker()
+        except Exception:
+            logger.exception("Worker crashed")
+            exit_code = 1
+        sys.exit(exit_code)
+
+    def _retire(self, pid: int):
+        try:
+            os.kill(pid, signal.SIGTERM)
+            self._retiring[pid] = time.monotonic() + self.graceful_timeout
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        """Biten işçileri toplar; zamanında kapanmayanları öldürür"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            generation = self._children.pop(pid, None)
+            if self._retiring.pop(pid, None) is None and generation == self._generation:
+                code = os.waitstatus_to_exitcode(status)
+                logger.warning(f"Worker {pid} exited unexpectedly ({code}), restarting")
+                time.sleep(RESPAWN_DELAY_S)
+
+        now = time.monotonic()
+        for pid, deadline in list(self._retiring.items()):
+            if now >= deadline:
+                logger.warning(f"Worker {pid} did not stop within {self.graceful_timeout:.0f}s, killing")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self._retiring[pid] = now + self.graceful_timeout
+
+    def _stop_all(self):
+        for pid in list(self._children):
+            if pid not in self._retiring:
+                self._retire(pid)
+        while self._children:
+            self._reap()
+            time.sleep(0.1)
+
+    def _worker(self):
+        """İşçi süreç: fork sonrası hazırlık, istek döngüsü, nazik kapanış"""
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        server = PooledWSGIServer(self.host, self.port, self.app, self.threads, self.keepalive,
+                                  fd=self.socket.fileno(), max_streams=self.max_streams)
+        signal.signal(signal.SIGTERM, lambda *_: server.stop())
+
+        if self.post_fork:
+            self.post_fork()
+        try:
+            server.serve_forever(poll_interval=0.5)
+        finally:
+            server.server_close()
+            server.wait_handlers(self.graceful_timeout)
+            if self.drain:
+                self.drain(self.graceful_timeout)
+
+
+def build_server(host: str = '0.0.0.0', port: int = 5000, workers: int = DEFAULT_WORKERS,
+                 threads: int = DEFAULT_THREADS, merge_workers: Optional[int] = None,
+                 keepalive: float = DEFAULT_KEEPALIVE_S,
+                 graceful_timeout: float = DEFAULT_GRACEFUL_TIMEOUT_S,
+                 metrics_dir: Optional[str] = None, max_streams: int = DEFAULT_MAX_STREAMS) -> PreforkServer:
+    """
+    web_server.py uygulaması için ön-çatallı sunucu
+
+    metrics_dir verilmezse her çalıştırma için yeni bir geçici metrik dizini
+    açılır ve ana süreç çıkarken silinir (sayaçlar sunucuyla birlikte sıfırlanır).
+    """
+    sys.path.append(str(Path(__file__).parent))
+    import web_server
+
+    if merge_workers is not None:
+        web_server.app.config['MERGE_WORKERS'] = merge_workers
+    if metrics_dir is None:
+        metrics_dir = tempfile.mkdtemp(prefix='eds-metrics-')
+        master_pid = os.getpid()
+        # İşçiler de atexit çalıştırır; dizini yalnızca ana süreç siler
+        atexit.register(lambda: os.getpid() == master_pid and shutil.rmtree(metrics_dir, ignore_errors=True))
+    web_server.app.config['METRICS_DIR'] = metrics_dir
+    return PreforkServer(web_server.app, host, port, workers, threads, keepalive, graceful_timeout,
+                         preload=web_server.preload_shared_data,
+                         post_fork=web_server.start_server_worker,
+                         drain=web_server.stop_server_worker, max_streams=max_streams)
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Pre-forking Production Server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='HTTP worker processes')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help='Request threads per worker')
+    parser.add_argument('--merge-workers', type=int, help='Merge processes per HTTP worker')
+    parser.add_argument('--keepalive', type=float, default=DEFAULT_KEEPALIVE_S,
+                        help='Idle keep-alive timeout (s)')
+    parser.add_argument('--graceful-timeout', type=float, default=DEFAULT_GRACEFUL_TIMEOUT_S,
+                        help='Time a retiring worker gets to finish requests and merge jobs (s)')
+    parser.add_argument('--max-streams', type=int, default=DEFAULT_MAX_STREAMS,
+                        help='Open event streams per worker, outside the thread pool')
+    parser.add_argument('--metrics-dir', help='Shared per-worker metrics directory (default: fresh temp dir)')
+    parser.add_argument('--access-log', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(levelname)s %(message)s')
+    if not args.access_log:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    server = build_server(args.host, args.port, args.workers, args.threads, args.merge_workers,
+                          args.keepalive, args.graceful_timeout, args.metrics_dir, args.max_streams)
+    print("🚀 EDS Data Merger production server starting...")
+    print(f"📍 http://{args.host}:{args.port} ({args.workers} işçi x {args.threads} iş parçacığı)")
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Sürüm Yayınlayıcı - Atomic Versioned Release Publisher
+==========================================================
+
+Birleştirilmiş veriden uygulamanın kullandığı tüm dosyaları (GeoJSON, uyarı
+ızgarası, kompakt veri, karolar, küme piramidi, paketlenmiş kamera indeksi)
+sürümlü bir dizine yazar ve ``current`` işaretçisini tek adımda yeni sürüme
+çevirir.
+
+Dizin yapısı:
+    data/releases/<zaman>-<hash>/      -> sürüm dosyaları + release.json
+    data/releases/history.json         -> etkinleştirme geçmişi (rollback için)
+    data/current -> releases/<sürüm>   -> atomik olarak değiştirilen symlink
+    data/eds-locations.geojson -> current/eds-locations.geojson (ve diğerleri)
+
+Bu yolların hepsi üretilmiş çıktıdır ve .gitignore'dadır; depodaki başlangıç
+verisi data/seed/ altındadır.
+
+Özellikler:
+- Sürüm adı kaynak GeoJSON'ın içerik özetini (sha256) içerir; aynı veri
+  ikinci kez yayınlanmaz, mevcut sürüm yeniden etkinleştirilir
+- JSON dosyalarının .gz (brotli yüklüyse .br) ön sıkıştırılmış kopyaları
+- Manifest (release.json): sayılar birleştirici istatistiklerinden
+  (``*_stats.json``) alınır, dosya özetleri yazılırken hesaplanır
+- Son N etkinleştirilen sürüm saklanır; ``rollback`` etkinleştirme
+  geçmişinde bir adım geri gider (eski bir sürüm yeniden etkinleştirildiyse
+  de doğru hedefe döner)
+- Etkinleştirmede service worker veri manifesti (data/precache-data.js,
+  sw_manifest.py) güncellenir; git'te izlenen sw.js'e dokunulmaz
+
+Usage:
+    python release_publisher.py publish merged-output/eds_merged_data_X.geojson
+    python release_publisher.py list
+    python release_publisher.py rollback [sürüm]
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.append(str(Path(__file__).parent))
+from alert_grid import AlertGrid, DEFAULT_ALERT_RADIUS_M, DEFAULT_CELL_SIZE_DEG
+from compact_payload import write_payload
+from sw_manifest import update_data_manifest
+from tile_publisher import write_tiles
+
+try:
+    from camera_index import CameraIndex
+    from cluster_pyramid import publish_clusters
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+RELEASE_FORMAT_VERSION = 1
+DEFAULT_KEEP_RELEASES = 5
+MAX_HISTORY = 100
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "data"
+
+GEOJSON_NAME = "eds-locations.geojson"
+GRID_NAME = "eds-locations.grid.json"
+COMPACT_NAME = "eds-locations.compact.json"
+INDEX_NAME = "eds-locations.index.bin"
+
+# data/ altında current/ içine yönlenen canlı girdiler (istemci yolları değişmez)
+LIVE_ENTRIES = [GEOJSON_NAME, GRID_NAME, COMPACT_NAME, INDEX_NAME, "tiles", "clusters"]
+
+
+def stats_path_for(geojson_path: str) -> Path:
+    """eds_merged_data_X.geojson -> eds_merged_data_X_stats.json"""
+    path = Path(geojson_path)
+    return path.with_name(path.stem + '_stats.json')
+
+
+def file_digest(path: Path) -> Dict[str, Any]:
+    """Dosyanın sha256 özeti ve boyutu"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {"sha256": digest.hexdigest(), "bytes": path.stat().st_size}
+
+
+def precompress(path: Path) -> List[Path]:
+    """Dosyanın .gz (ve brotli varsa .br) kopyalarını yazar"""
+    data = path.read_bytes()
+    outputs = []
+
+    gz_path = path.with_name(path.name + '.gz')
+    # mtime=0: aynı içerik her yayında aynı .gz baytlarını üretir
+    gz_path.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    outputs.append(gz_path)
+
+    if HAS_BROTLI:
+        br_path = path.with_name(path.name + '.br')
+        br_path.write_bytes(brotli.compress(data, quality=11))
+        outputs.append(br_path)
+    return outputs
+
+
+def replace_with_symlink(link_path: Path, target: str):
+    """link_path'i target'a yönlenen symlink ile atomik olarak değiştirir"""
+    temp_link = link_path.with_name(f".{link_path.name}.tmp")
+    if temp_link.is_symlink() or temp_link.exists():
+        temp_link.unlink()
+    os.symlink(target, temp_link)
+
+    # Eski düzendeki gerçek dizin (ör. data/tiles) symlink ile değiştirilemez
+    if link_path.is_dir() and not link_path.is_symlink():
+        shutil.rmtree(link_path)
+    os.replace(temp_link, link_path)
+
+
+class ReleasePublisher:
+    """Sürümlü yayın dizinlerini ve current işaretçisini yöneten sınıf"""
+
+    def __init__(self, data_dir: Path = DEFAULT_DATA_DIR, keep: int = DEFAULT_KEEP_RELEASES):
+        self.data_dir = Path(data_dir)
+        self.releases_dir = self.data_dir / "releases"
+        self.current_link = self.data_dir / "current"
+        self.history_file = self.releases_dir / "history.json"
+        self.keep = keep
+
+    def list_releases(self) -> List[str]:
+        """Yayınlanmış sürümler (eskiden yeniye)"""
+        if not self.releases_dir.exists():
+            return []
+        return sorted(path.name for path in self.releases_dir.iterdir()
+                      if path.is_dir() and not path.name.startswith('.'))
+
+    def current_release(self) -> Optional[str]:
+        """Aktif sürüm adı"""
+        if not self.current_link.is_symlink():
+            return None
+        return Path(os.readlink(self.current_link)).name
+
+    def read_history(self) -> List[Dict[str, Any]]:
+        """Etkinleştirme geçmişi (eskiden yeniye {release, activated})"""
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _write_history(self, history: List[Dict[str, Any]]):
+        self.releases_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.history_file.with_name(self.history_file.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(history[-MAX_HISTORY:], f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.history_file)
+
+    def read_manifest(self, release: str) -> Dict[str, Any]:
+        """Sürümün release.json manifestini okur"""
+        with open(self.releases_dir / release / 'release.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def publish(self, geojson_file: str, stats_file: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Birleştirilmiş GeoJSON'dan yeni sürüm yayınlar
+
+        Kaynak dosya bir kez okunur; sayılar birleştirici istatistiklerinden
+        alınır. Sürüm önce gizli bir geçici dizinde hazırlanır, tamamlanınca
+        yeniden adlandırılır ve current işaretçisi çevrilir.
+        """
+        raw = Path(geojson_file).read_bytes()
+        source_hash = hashlib.sha256(raw).hexdigest()
+
+        # Aynı veri daha önce yayınlandıysa o sürüme dönülür
+        existing = [name for name in self.list_releases() if name.endswith(source_hash[:12])]
+        if existing:
+            if self.current_release() != existing[-1]:
+                self.activate(existing[-1])
+            manifest = self.read_manifest(existing[-1])
+            manifest['unchanged'] = True
+            return manifest
+
+        release = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{source_hash[:12]}"
+        staging_dir = self.releases_dir / f".{release}.tmp"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        staging_dir.mkdir(parents=True)
+
+        features = json.loads(raw).get('features', [])
+        (staging_dir / GEOJSON_NAME).write_bytes(raw)
+
+        coords = [(feature['geometry']['coordinates'][1], feature['geometry']['coordinates'][0])
+                  for feature in features]
+        AlertGrid.build(coords, DEFAULT_CELL_SIZE_DEG, DEFAULT_ALERT_RADIUS_M).save(str(staging_dir / GRID_NAME))
+        write_payload(features, str(staging_dir / COMPACT_NAME))
+        tiles = write_tiles(features, str(staging_dir / "tiles"))
+        clusters = publish_clusters(features, str(staging_dir / "clusters")) if HAS_NUMPY else None
+        if HAS_NUMPY:
+            # Sunucu süreçleri bu dosyayı mmap ile eşler; current çevrilince yeni sürüme geçerler
+            CameraIndex.from_features(features, source_hash).save(str(staging_dir / INDEX_NAME))
+
+        artifacts = {}
+        for name in (GEOJSON_NAME, GRID_NAME, COMPACT_NAME, INDEX_NAME, "tiles/manifest.json", "clusters/manifest.json"):
+            path = staging_dir / name
+            if not path.exists():
+                continue
+            artifacts[name] = file_digest(path)
+            if name == INDEX_NAME:
+                continue  # istemciye gönderilmez, sıkıştırılmış kopyası gereksiz
+            for variant in precompress(path):
+                artifacts[str(variant.relative_to(staging_dir))] = file_digest(variant)
+
+        manifest = {
+            "version": RELEASE_FORMAT_VERSION,
+            "release": release,
+            "created": datetime.now().isoformat(),
+            "source": {"file": Path(geojson_file).name, "sha256": source_hash, "bytes": len(raw)},
+            "counts": self._counts(stats_file or stats_path_for(geojson_file), len(features)),
+            "tiles": len(tiles['tiles']),
+            "clusters": len(clusters['tiles']) if clusters else 0,
+            "artifacts": artifacts
+        }
+        with open(staging_dir / 'release.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        os.replace(staging_dir, self.releases_dir / release)
+        self.activate(release)
+        self.prune()
+        return manifest
+
+    def _counts(self, stats_file: Path, feature_count: int) -> Dict[str, Any]:
+        """Manifest sayılarını birleştirici istatistiklerinden alır"""
+        stats_file = Path(stats_file)
+        if not stats_file.exists():
+            return {"total_points": feature_count}
+
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        info = stats.get('generation_info', {})
+        return {
+            "total_points": info.get('total_points', feature_count),
+            "type_distribution": stats.get('type_distribution', {}),
+            "quality_distribution": stats.get('quality_distribution', {}),
+            "section_segments": info.get('processing_stats', {}).get('section_segments')
+        }
+
+    def activate(self, release: str, record: bool = True):
+        """
+        current işaretçisini verilen sürüme atomik olarak çevirir
+
+        record ise etkinleştirme geçmişe eklenir (rollback geçmişten geri
+        giderken eklemez).
+        """
+        if not (self.releases_dir / release / 'release.json').exists():
+            raise ValueError(f"Unknown release: {release}")
+
+        replace_with_symlink(self.current_link, f"releases/{release}")
+        for entry in LIVE_ENTRIES:
+            link_path = self.data_dir / entry
+            target = f"current/{entry}"
+            if not link_path.is_symlink() or os.readlink(link_path) != target:
+                replace_with_symlink(link_path, target)
+
+        if record:
+            history = self.read_history()
+            if not history or history[-1]['release'] != release:
+                history.append({"release": release, "activated": datetime.now().isoformat()})
+                self._write_history(history)
+
+        # Service worker veri manifestini yeni veri özetleriyle güncelle
+        if (self.data_dir.parent / 'sw.js').exists():
+            update_data_manifest(self.data_dir.parent)
+
+    def rollback(self, release: Optional[str] = None) -> str:
+        """
+        Verilen sürüme veya etkinleştirme geçmişindeki bir önceki sürüme döner
+
+        Geçmişten geri gidilirken aktif sürümün kaydı çıkarılır; art arda
+        rollback geçmişte daha da geriye gider. Geçmiş tükenirse (geçmişten
+        önceki yayınlar) adı aktif sürümden küçük olan en yeni sürüme dönülür.
+        """
+        if release is not None:
+            self.activate(release)
+            return release
+
+        current = self.current_release()
+        releases = self.list_releases()
+        history = self.read_history()
+        while history and (history[-1]['release'] == current or history[-1]['release'] not in releases):
+            history.pop()
+
+        if history:
+            release = history[-1]['release']
+        else:
+            older = [name for name in releases if current is None or name < current]
+            if not older:
+                raise ValueError("No previous release to roll back to")
+            release = older[-1]
+            history.append({"release": release, "activated": datetime.now().isoformat()})
+
+        self.activate(release, record=False)
+        self._write_history(history)
+        return release
+
+    def prune(self) -> List[str]:
+        """Son etkinleştirilen ``keep`` sürüm ve aktif sürüm dışındakileri siler"""
+        current = self.current_release()
+        # Son etkinleştirme sırası; geçmişte olmayan sürümler ada göre en eskiler sayılır
+        last_active = {entry['release']: i for i, entry in enumerate(self.read_history())}
+        releases = sorted(self.list_releases(), key=lambda name: (last_active.get(name, -1), name))
+        removed = [name for name in releases[:-self.keep] if name != current] if self.keep > 0 else []
+        for name in removed:
+            shutil.rmtree(self.releases_dir / name, ignore_errors=True)
+        return removed
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Atomic Release Publisher')
+    parser.add_argument('--data-dir', default=str(DEFAULT_DATA_DIR), help='Application data directory')
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP_RELEASES, help='Number of releases to keep')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    publish_parser = subparsers.add_parser('publish', help='Publish a merged GeoJSON as a new release')
+    publish_parser.add_argument('geojson', help='Merged EDS GeoJSON file')
+    publish_parser.add_argument('--stats', help='Merger statistics file (default: <name>_stats.json)')
+
+    subparsers.add_parser('list', help='List releases')
+
+    rollback_parser = subparsers.add_parser('rollback', help='Switch current to an older release')
+    rollback_parser.add_argument('release', nargs='?', help='Release name (default: previous release)')
+
+    args = parser.parse_args()
+    publisher = ReleasePublisher(Path(args.data_dir), args.keep)
+
+    if args.command == 'publish':
+        manifest = publisher.publish(args.geojson, args.stats)
+        if manifest.get('unchanged'):
+            print(f"ℹ️ Veri zaten yayınlanmış, aktif sürüm: {manifest['release']}")
+        else:
+            print(f"✅ Sürüm yayınlandı: {manifest['release']}")
+            print(f"📊 {manifest['counts']['total_points']:,} nokta, {len(manifest['artifacts'])} dosya")
+    elif args.command == 'list':
+        current = publisher.current_release()
+        for name in publisher.list_releases():
+            manifest = publisher.read_manifest(name)
+            marker = '👉' if name == current else '  '
+            print(f"{marker} {name}  {manifest['counts']['total_points']:,} nokta")
+    elif args.command == 'rollback':
+        release = publisher.rollback(args.release)
+        print(f"↩️ Aktif sürüm: {release}")
+
+
+if __name__ == "__main__":
+    main()
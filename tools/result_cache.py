@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Birleştirme Sonuç Önbelleği - Merge Result Cache
+====================================================
+
+Aynı dosyalar aynı ayarlarla yeniden işlendiğinde birleştirmeyi tekrar
+çalıştırmak yerine saklanan sonuç özetini ve çıktı dosyalarını döner.
+
+Özellikler:
+- Anahtar: yüklenen dosyaların SHA-256 özetleri (sıralı) + normalize edilmiş
+  ayarlar + birleştirici kaynak kodunun parmak izi
+- Disk tabanlı: her kayıt <anahtar>/ dizininde çıktı dosyaları ve entry.json;
+  sunucu yeniden başlasa da geçerlidir, birden fazla süreç paylaşabilir
+- Boyut bütçesi: toplam boyut aşılırsa en uzun süredir kullanılmayan (LRU)
+  kayıtlar silinir (son kullanım = entry.json mtime)
+- Atomik yazım: kayıt geçici dizinde hazırlanıp tek rename ile yayınlanır
+- Kopyasız: dosyalar mümkünse hard link ile bağlanır
+
+Usage:
+    python result_cache.py --cache-dir /tmp/eds-merge-cache          # özet
+    python result_cache.py --cache-dir /tmp/eds-merge-cache --clear
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / 'eds-merge-cache'
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+ENTRY_FILE = 'entry.json'
+HASH_CHUNK = 1024 * 1024
+
+# Varsayılanları web_server.py / job_queue.run_merge_job ile aynı
+DEFAULT_SETTINGS = {
+    'qualityThreshold': 0.3,
+    'duplicateDistance': 0.1,
+    'outputName': 'eds_merged_data'
+}
+
+# Sonucu etkileyen kaynak dosyalar; değişirlerse eski kayıtlar kullanılmaz
+ENGINE_MODULES = ['advanced_data_merger.py', 'road_enricher.py', 'section_index.py', 'spatial_index.py',
+                  'camera_index.py']
+
+# Önbelleğe alınmayan çıktılar
+EXCLUDED_SUFFIXES = {'.log', '.zip'}
+
+
+def file_sha256(path: Path) -> str:
+    """Dosyanın SHA-256 özeti (parça parça okunur)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Sonucu etkileyen ayarları varsayılanlarla tamamlar ve sayıları sabitler"""
+    normalized = {}
+    for key, default in DEFAULT_SETTINGS.items():
+        value = settings.get(key, default)
+        if value is None or value == '':
+            value = default
+        normalized[key] = round(float(value), 6) if isinstance(default, float) else str(value)
+    return normalized
+
+
+def engine_fingerprint(tools_dir: Path = Path(__file__).parent) -> str:
+    """Birleştirici kaynak kodunun özeti"""
+    digest = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}".encode())
+    for name in ENGINE_MODULES:
+        path = tools_dir / name
+        if path.is_file():
+            digest.update(name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def cache_key(files: List[Dict[str, Any]], settings: Dict[str, Any], fingerprint: Optional[str] = None) -> str:
+    """
+    Yüklenen dosyalar ve ayarlar için önbellek anahtarı
+
+    Dosya adları da anahtara girer: birleştirici dosyaları ada göre sıralı
+    yükler ve istatistiklerde dosya adlarını kullanır.
+    """
+    inputs = sorted((info.get('sha256') or file_sha256(Path(info['path'])), Path(info['name']).name)
+                    for info in files)
+    material = {
+        'engine': fingerprint or engine_fingerprint(),
+        'files': inputs,
+        'settings': normalize_settings(settings)
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path):
+    """Aynı dosya sisteminde hard link, değilse kopya"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ResultCache:
+    """Disk bütçeli, LRU tahliyeli birleştirme sonuç önbelleği"""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Kaydı döner ve son kullanım zamanını günceller; yoksa None"""
+        entry_path = self._entry_dir(key) / ENTRY_FILE
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != CACHE_FORMAT_VERSION:
+            return None
+        return entry
+
+    def materialize(self, key: str, dest_dir: Path) -> Optional[Dict[str, Any]]:
+        """
+        Kaydın çıktı dosyalarını dest_dir'e bağlar ve sonuç özetini döner
+
+        Hard link kullanıldığı için kayıt sonradan tahliye edilse bile
+        oturumun dosyaları geçerli kalır.
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for name in entry['files']:
+                link_or_copy(self._entry_dir(key) / name, dest_dir / name)
+        except OSError:
+            # Kayıt başka bir süreç tarafından tahliye edildi
+            return None
+        return dict(entry['results'], outputDir=str(dest_dir))
+
+    def store(self, key: str, output_dir: Path, results: Dict[str, Any]) -> bool:
+        """Çıktı dizinini önbelleğe ekler; kayıt zaten varsa False döner"""
+        entry_dir = self._entry_dir(key)
+        if entry_dir.exists():
+            return False
+
+        staging = Path(tempfile.mkdtemp(prefix=f'.{key[:12]}.', dir=self.cache_dir))
+        try:
+            files, size = [], 0
+            for path in sorted(Path(output_dir).iterdir()):
+                if not path.is_file() or path.suffix in EXCLUDED_SUFFIXES:
+                    continue
+                link_or_copy(path, staging / path.name)
+                files.append(path.name)
+                size += path.stat().st_size
+
+            entry = {
+                'version': CACHE_FORMAT_VERSION,
+                'created': time.time(),
+                'size': size,
+                'files': files,
+                'results': {k: v for k, v in results.items() if k != 'outputDir'}
+            }
+            with open(staging / ENTRY_FILE, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+
+            if size > self.max_bytes:
+                return False
+            os.rename(staging, entry_dir)
+        except OSError:
+            # Aynı anahtar başka bir süreç tarafından yayınlandı
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Kayıtlar: anahtar, boyut, son kullanım (eskiden yeniye)"""
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            entry_path = entry_dir / ENTRY_FILE
+            if entry_dir.name.startswith('.') or not entry_path.is_file():
+                continue
+            try:
+                with open(entry_path, 'r', encoding='utf-8') as f:
+                    size = json.load(f).get('size', 0)
+                entries.append({'key': entry_dir.name, 'size': size, 'used': entry_path.stat().st_mtime})
+            except (OSError, ValueError):
+                continue
+        return sorted(entries, key=lambda entry: entry['used'])
+
+    def evict(self) -> List[str]:
+        """Bütçe aşıldıysa en eski kayıtları siler; silinen anahtarları döner"""
+        entries = self.entries()
+        total = sum(entry['size'] for entry in entries)
+        evicted = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(entry['key']), ignore_errors=True)
+            total -= entry['size']
+            evicted.append(entry['key'])
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek doluluk bilgisi"""
+        entries = self.entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(entry['size'] for entry in entries),
+            'maxBytes': self.max_bytes
+        }
+
+    def clear(self):
+        """Tüm kayıtları siler"""
+        for entry_dir in self.cache_dir.iterdir():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS merge result cache')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR), help='Cache directory')
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024, help='Disk budget (MB)')
+    parser.add_argument('--clear', action='store_true', help='Remove all cached results')
+    args = parser.parse_args()
+
+    cache = ResultCache(Path(args.cache_dir), int(args.max_mb * 1024 * 1024))
+    if args.clear:
+        cache.clear()
+        print(f"🗑️ Önbellek temizlendi: {cache.cache_dir}")
+        return
+
+    evicted = cache.evict()
+    stats = cache.stats()
+    print(f"📦 {stats['entries']} kayıt, {stats['bytes'] / 1024 / 1024:.1f}MB / "
+          f"{stats['maxBytes'] / 1024 / 1024:.1f}MB ({cache.cache_dir})")
+    if evicted:
+        print(f"🧹 {len(evicted)} kayıt bütçe aşımı nedeniyle silindi")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Yol Ağı Zenginleştirici - Road Network Enricher
+===================================================
+
+Birleştirilmiş EDS noktalarını yerel bir OSM özütü veya GeoJSON yol ağı
+üzerindeki en yakın yola oturtur (snap) ve eksik alanları doldurur.
+
+Özellikler:
+- OSM XML (.osm) ve GeoJSON (LineString/MultiLineString) yol ağı desteği
+- Yol segmentleri için STR-tree mekansal indeksi
+- Toleranslı toplu en yakın yol eşleştirme
+- road_name, speed_limit ve direction (tek yönlü yollarda trafik yönü) doldurma
+- Eşleştirme mesafesi raporlama
+
+Not: .osm.pbf dosyaları önce XML'e çevrilmelidir
+     (ör. ``osmium cat turkey.osm.pbf -o turkey.osm``).
+"""
+
+import csv
+import json
+import re
+import sys
+import time
+import argparse
+import logging
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+sys.path.append(str(Path(__file__).parent))
+from spatial_index import (STRTree, degree_margins, initial_bearing,
+                           point_segment_distance_m)
+
+logger = logging.getLogger(__name__)
+
+# Araç trafiğine açık OSM yol sınıfları
+DRIVABLE_HIGHWAYS = {
+    'motorway', 'motorway_link', 'trunk', 'trunk_link',
+    'primary', 'primary_link', 'secondary', 'secondary_link',
+    'tertiary', 'tertiary_link', 'unclassified', 'residential',
+    'living_street', 'road'
+}
+
+# Türkiye için maxspeed bölge değerleri (km/h)
+MAXSPEED_ZONES = {
+    'TR:urban': 50,
+    'TR:rural': 90,
+    'TR:trunk': 110,
+    'TR:motorway': 120,
+    'TR:living_street': 20
+}
+
+
+@dataclass
+class RoadWay:
+    """Yol ağındaki tek bir yol (OSM way)"""
+    way_id: str
+    name: Optional[str] = None
+    speed_limit: Optional[int] = None
+    highway: Optional[str] = None
+    oneway: int = 0  # 0: çift yön, 1: çizim yönünde, -1: ters yönde
+
+
+@dataclass
+class SnapResult:
+    """Bir EDS noktasının yol ağına eşleştirme sonucu"""
+    point_id: str
+    way_id: Optional[str]
+    distance_m: Optional[float]
+    bearing: Optional[float]
+
+
+def parse_maxspeed(value: Any) -> Optional[int]:
+    """OSM maxspeed etiketini km/h tamsayıya çevirir"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value > 0 else None
+
+    value = str(value).strip()
+    if value in MAXSPEED_ZONES:
+        return MAXSPEED_ZONES[value]
+
+    # "50", "50 km/h", "30 mph", "60;50" gibi değerler
+    match = re.match(r'^(\d+(?:\.\d+)?)\s*(mph|km/h|kmh)?', value)
+    if not match:
+        return None
+
+    speed = float(match.group(1))
+    if match.group(2) == 'mph':
+        speed *= 1.609344
+    return int(round(speed)) if speed > 0 else None
+
+
+def parse_oneway(value: Any) -> int:
+    """OSM oneway etiketini yön katsayısına çevirir"""
+    if value is None:
+        return 0
+    value = str(value).strip().lower()
+    if value in ('yes', 'true', '1'):
+        return 1
+    if value in ('-1', 'reverse'):
+        return -1
+    return 0
+
+
+class RoadNetwork:
+    """Segmentlere bölünmüş ve STR-tree ile indekslenmiş yol ağı"""
+
+    def __init__(self):
+        self.ways: List[RoadWay] = []
+        self.segment_way: List[int] = []
+        self.seg_lat1: List[float] = []
+        self.seg_lng1: List[float] = []
+        self.seg_lat2: List[float] = []
+        self.seg_lng2: List[float] = []
+        self.tree: Optional[STRTree] = None
+
+    def __len__(self) -> int:
+        return len(self.segment_way)
+
+    def add_way(self, way: RoadWay, coords: Iterable[Iterable[float]]):
+        """Yolu ve [lng, lat] koordinat dizisini segmentler halinde ekler"""
+        coords = [(float(c[0]), float(c[1])) for c in coords]
+        if len(coords) < 2:
+            return
+
+        way_index = len(self.ways)
+        self.ways.append(way)
+        for (lng1, lat1), (lng2, lat2) in zip(coords, coords[1:]):
+            if lng1 == lng2 and lat1 == lat2:
+                continue
+            self.segment_way.append(way_index)
+            self.seg_lat1.append(lat1)
+            self.seg_lng1.append(lng1)
+            self.seg_lat2.append(lat2)
+            self.seg_lng2.append(lng2)
+
+        self.tree = None
+
+    def build_index(self) -> STRTree:
+        """Segment sınır kutularından STR-tree oluşturur"""
+        boxes = [
+            (min(lng1, lng2), min(lat1, lat2), max(lng1, lng2), max(lat1, lat2))
+            for lat1, lng1, lat2, lng2 in zip(self.seg_lat1, self.seg_lng1,
+                                              self.seg_lat2, self.seg_lng2)
+        ]
+        self.tree = STRTree(boxes)
+        return self.tree
+
+    def segment_distance(self, segment: int, lat: float, lng: float):
+        """Noktanın segmente mesafesini (metre, t) olarak döner"""
+        return point_segment_distance_m(
+            lat, lng,
+            self.seg_lat1[segment], self.seg_lng1[segment],
+            self.seg_lat2[segment], self.seg_lng2[segment]
+        )
+
+    def segment_bearing(self, segment: int) -> float:
+        """Segmentin trafik yönündeki yönünü döner (0-360 derece)"""
+        bearing = initial_bearing(
+            self.seg_lat1[segment], self.seg_lng1[segment],
+            self.seg_lat2[segment], self.seg_lng2[segment]
+        )
+        if self.ways[self.segment_way[segment]].oneway == -1:
+            bearing = (bearing + 180.0) % 360.0
+        return bearing
+
+    @classmethod
+    def load(cls, path: str) -> 'RoadNetwork':
+        """Dosya uzantısına göre yol ağını yükler"""
+        suffix = Path(path).suffix.lower()
+        if suffix in ('.geojson', '.json'):
+            network = cls.from_geojson(path)
+        elif suffix in ('.osm', '.xml'):
+            network = cls.from_osm_xml(path)
+        else:
+            raise ValueError(f"Unsupported road network format: {suffix}")
+
+        network.build_index()
+        return network
+
+    @classmethod
+    def from_geojson(cls, path: str) -> 'RoadNetwork':
+        """GeoJSON LineString/MultiLineString yol ağını yükler"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        network = cls()
+        for i, feature in enumerate(data.get('features', [])):
+            geometry = feature.get('geometry') or {}
+            properties = feature.get('properties') or {}
+
+            highway = properties.get('highway')
+            if highway and highway not in DRIVABLE_HIGHWAYS:
+                continue
+
+            way = RoadWay(
+                way_id=str(properties.get('osm_id') or properties.get('id') or feature.get('id') or i),
+                name=properties.get('name') or properties.get('ref'),
+                speed_limit=parse_maxspeed(properties.get('maxspeed') or properties.get('speed_limit')),
+                highway=highway,
+                oneway=parse_oneway(properties.get('oneway'))
+            )
+
+            if geometry.get('type') == 'LineString':
+                network.add_way(way, geometry.get('coordinates', []))
+            elif geometry.get('type') == 'MultiLineString':
+                for line in geometry.get('coordinates', []):
+                    network.add_way(way, line)
+
+        return network
+
+    @classmethod
+    def from_osm_xml(cls, path: str) -> 'RoadNetwork':
+        """
+        OSM XML özütünü iki geçişte yükler
+
+        İlk geçişte yalnızca araç yollarının düğüm referansları toplanır,
+        ikinci geçişte sadece bu düğümlerin koordinatları okunur. Böylece
+        ülke ölçeğindeki özütlerde tüm düğümler belleğe alınmaz.
+        """
+        raw_ways = []
+        needed_nodes: Set[str] = set()
+
+        for _, elem in ET.iterparse(path, events=('end',)):
+            if elem.tag == 'way':
+                tags = {tag.get('k'): tag.get('v') for tag in elem.iter('tag')}
+                if tags.get('highway') in DRIVABLE_HIGHWAYS:
+                    refs = [nd.get('ref') for nd in elem.iter('nd')]
+                    raw_ways.append((elem.get('id'), tags, refs))
+                    needed_nodes.update(refs)
+                elem.clear()
+            elif elem.tag in ('node', 'relation'):
+                elem.clear()
+
+        node_coords: Dict[str, tuple] = {}
+        for _, elem in ET.iterparse(path, events=('end',)):
+            if elem.tag == 'node':
+                node_id = elem.get('id')
+                if node_id in needed_nodes:
+                    node_coords[node_id] = (float(elem.get('lon')), float(elem.get('lat')))
+                elem.clear()
+            elif elem.tag in ('way', 'relation'):
+                elem.clear()
+
+        network = cls()
+        for way_id, tags, refs in raw_ways:
+            way = RoadWay(
+                way_id=way_id,
+                name=tags.get('name') or tags.get('ref'),
+                speed_limit=parse_maxspeed(tags.get('maxspeed')),
+                highway=tags.get('highway'),
+                oneway=parse_oneway(tags.get('oneway'))
+            )
+            network.add_way(way, [node_coords[ref] for ref in refs if ref in node_coords])
+
+        return network
+
+
+class RoadEnricher:
+    """EDS noktalarını yol ağına oturtup eksik yol bilgilerini dolduran sınıf"""
+
+    def __init__(self, network: RoadNetwork, tolerance_m: float = 30.0):
+        self.network = network
+        self.tolerance_m = tolerance_m
+        if network.tree is None:
+            network.build_index()
+
+    def snap(self, lat: float, lng: float) -> Optional[tuple]:
+        """Noktaya tolerans içindeki en yakın segmenti (segment, mesafe) döner"""
+        dlat, dlng = degree_margins(lat, self.tolerance_m)
+        candidates = self.network.tree.query(lng - dlng, lat - dlat, lng + dlng, lat + dlat)
+
+        best = None
+        best_distance = self.tolerance_m
+        for segment in candidates:
+            distance, _ = self.network.segment_distance(segment, lat, lng)
+            if distance <= best_distance:
+                best = segment
+                best_distance = distance
+
+        return (best, best_distance) if best is not None else None
+
+    def enrich(self, points: List[Any]) -> List[SnapResult]:
+        """
+        Noktaları toplu olarak yol ağına eşleştirir
+
+        Yalnızca boş olan road_name, speed_limit ve direction alanları
+        doldurulur; kaynaklardan gelen mevcut değerlere dokunulmaz.
+        direction yalnızca tek yönlü yollarda (trafik yönünde) doldurulur.
+        """
+        results = []
+        for point in points:
+            match = self.snap(point.latitude, point.longitude)
+            if match is None:
+                results.append(SnapResult(point.id, None, None, None))
+                continue
+
+            segment, distance = match
+            way = self.network.ways[self.network.segment_way[segment]]
+            bearing = self.network.segment_bearing(segment)
+
+            if not point.road_name and way.name:
+                point.road_name = way.name
+            if not point.speed_limit and way.speed_limit:
+                point.speed_limit = way.speed_limit
+            # Çift yönlü yolda çizim yönü bir trafik yönü değildir; yön boş kalır
+            if not point.direction and way.oneway != 0:
+                point.direction = str(int(round(bearing)) % 360)
+
+            results.append(SnapResult(point.id, way.way_id, round(distance, 2), round(bearing, 1)))
+
+        return results
+
+    @staticmethod
+    def summarize(results: List[SnapResult]) -> Dict[str, Any]:
+        """Eşleştirme sonuçlarının özet istatistiklerini döner"""
+        distances = sorted(r.distance_m for r in results if r.distance_m is not None)
+        summary = {
+            'road_snapped': len(distances),
+            'road_unsnapped': len(results) - len(distances)
+        }
+        if distances:
+            summary['road_snap_avg_m'] = round(sum(distances) / len(distances), 2)
+            summary['road_snap_p95_m'] = distances[min(len(distances) - 1, int(len(distances) * 0.95))]
+            summary['road_snap_max_m'] = distances[-1]
+        return summary
+
+
+def write_snap_report(results: List[SnapResult], report_path: str):
+    """Nokta bazında eşleştirme mesafelerini CSV olarak yazar"""
+    with open(report_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['point_id', 'way_id', 'distance_m', 'bearing'])
+        for r in results:
+            writer.writerow([r.point_id, r.way_id, r.distance_m, r.bearing])
+
+
+def main():
+    """Birleştirilmiş GeoJSON'ı yol ağı ile zenginleştirir"""
+    from advanced_data_merger import DataParser, EDSPoint
+
+    parser = argparse.ArgumentParser(description='EDS Road Network Enricher')
+    parser.add_argument('input', help='Merged GeoJSON file')
+    parser.add_argument('--road-network', required=True,
+                        help='Road network file (.osm or .geojson)')
+    parser.add_argument('--tolerance', type=float, default=30.0,
+                        help='Snapping tolerance in meters')
+    parser.add_argument('--output', help='Output GeoJSON (default: <input>_roads.geojson)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    start = time.time()
+    network = RoadNetwork.load(args.road_network)
+    logger.info(f"Loaded {len(network.ways)} ways / {len(network)} segments in {time.time() - start:.1f}s")
+
+    fields = set(EDSPoint.__dataclass_fields__)
+    points = [EDSPoint(**{k: v for k, v in raw.items() if k in fields})
+              for raw in DataParser.parse_geojson(args.input)]
+
+    start = time.time()
+    enricher = RoadEnricher(network, args.tolerance)
+    results = enricher.enrich(points)
+    summary = enricher.summarize(results)
+    elapsed = time.time() - start
+
+    input_path = Path(args.input)
+    output_path = Path(args.output) if args.output else input_path.with_name(f"{input_path.stem}_roads.geojson")
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        geojson = json.load(f)
+    enriched = {p.id: p for p in points}
+    for feature in geojson.get('features', []):
+        point = enriched.get(feature['properties'].get('id'))
+        if point:
+            feature['properties'].update(
+                road_name=point.road_name,
+                speed_limit=point.speed_limit,
+                direction=point.direction
+            )
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(geojson, f, ensure_ascii=False, indent=2)
+    write_snap_report(results, str(output_path.with_suffix('.snaps.csv')))
+
+    print(f"🛣️  {summary['road_snapped']}/{len(points)} nokta yola oturtuldu ({elapsed:.1f}s)")
+    if summary['road_snapped']:
+        print(f"📏 Ortalama mesafe: {summary['road_snap_avg_m']}m, p95: {summary['road_snap_p95_m']}m")
+    print(f"✅ Çıktı: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ from pathlib import Path
 
 # Ana merger'ı import et
 sys.path.append(str(Path(__file__).parent))
-from advanced_data_merger import AdvancedDataMerger
+from advanced_data_merger import AdvancedDataMerger, configure_logging
 
 def print_banner():
     """Güzel bir banner yazdır"""
@@ -108,30 +108,31 @@ def run_merger_with_progress(input_dir, preferences):
         merger = AdvancedDataMerger(input_dir, preferences['output_dir'])
         merger.duplicate_detector.distance_threshold = preferences['duplicate_threshold']
         
-        print("📥 1/4 - Veri dosyaları yükleniyor...")
-        raw_data = merger.load_all_data()
+        with merger.log_to_file():
+            print("📥 1/4 - Veri dosyaları yükleniyor...")
+            raw_data = merger.load_all_data()
         
-        print("🔧 2/4 - Veriler normalize ediliyor...")
-        normalized_points = merger.normalize_data(raw_data)
+            print("🔧 2/4 - Veriler normalize ediliyor...")
+            normalized_points = merger.normalize_data(raw_data)
         
-        print("🔍 3/4 - Dublikalar tespit ediliyor ve birleştiriliyor...")
-        duplicate_groups = merger.duplicate_detector.find_duplicates(normalized_points)
+            print("🔍 3/4 - Dublikalar tespit ediliyor ve birleştiriliyor...")
+            duplicate_groups = merger.duplicate_detector.find_duplicates(normalized_points)
         
-        if duplicate_groups:
-            merged_points = merger.duplicate_detector.merge_duplicates(normalized_points, duplicate_groups)
-            print(f"   ✅ {len(duplicate_groups)} dublika grubu birleştirildi")
-        else:
-            merged_points = normalized_points
-            print("   ✅ Dublika bulunamadı")
+            if duplicate_groups:
+                merged_points = merger.duplicate_detector.merge_duplicates(normalized_points, duplicate_groups)
+                print(f"   ✅ {len(duplicate_groups)} dublika grubu birleştirildi")
+            else:
+                merged_points = normalized_points
+                print("   ✅ Dublika bulunamadı")
         
-        # Kalite filtreleme
-        high_quality_points = [
-            point for point in merged_points 
-            if point.confidence_score >= preferences['min_quality']
-        ]
+            # Kalite filtreleme
+            high_quality_points = [
+                point for point in merged_points 
+                if point.confidence_score >= preferences['min_quality']
+            ]
         
-        print("💾 4/4 - Sonuçlar export ediliyor...")
-        merger.export_data(high_quality_points)
+            print("💾 4/4 - Sonuçlar export ediliyor...")
+            merger.export_data(high_quality_points)
         
         return high_quality_points, merger.stats
         
@@ -174,6 +175,7 @@ def show_results(points, stats, output_dir):
 def main():
     """Ana fonksiyon"""
     print_banner()
+    configure_logging()
     
     # Input dizini kontrol
     input_dir = check_input_directory()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Kesit Segment İndeksi - Section Segment Index
+=================================================
+
+Ortalama hız (OHITS / AVERAGE_SPEED / SECTION_CONTROL) kameralarını aynı
+yol ve yön üzerinde giriş/çıkış çiftleri halinde eşleştirir ve kamera
+ID'si ile O(1) erişilebilen kompakt bir segment tablosu üretir.
+
+Özellikler:
+- STR-tree ile aday komşu arama
+- Yol adı ve yön (direction) uyumluluğu kontrolü
+- Segment uzunluğu ve minimum yasal geçiş süresi hesaplama
+- JSON ve SQLite export
+
+Not: Segment uzunluğu iki kamera arasındaki kuş uçuşu mesafedir;
+     virajlı yollarda gerçek yol uzunluğundan kısa kalabilir, bu da
+     minimum geçiş süresini güvenli tarafta (kısa) tutar.
+"""
+
+import json
+import re
+import sqlite3
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from spatial_index import STRTree, haversine_m, initial_bearing
+
+SECTION_TYPES = {'OHITS', 'AVERAGE_SPEED', 'SECTION_CONTROL'}
+
+# Kaynaklardan gelen ve gerçek yol adı olmayan yer tutucu değerler
+GENERIC_ROAD_NAMES = {'', 'speed_camera', 'unknown', 'none', 'null', 'yol', 'road'}
+
+COMPASS_BEARINGS = {
+    'N': 0.0, 'NE': 45.0, 'E': 90.0, 'SE': 135.0,
+    'S': 180.0, 'SW': 225.0, 'W': 270.0, 'NW': 315.0
+}
+
+
+@dataclass
+class SectionSegment:
+    """Giriş ve çıkış kamerasından oluşan ortalama hız segmenti"""
+    segment_id: int
+    entry_id: str
+    exit_id: str
+    road_name: str
+    length_m: float
+    bearing: float
+    speed_limit: Optional[int]
+    min_travel_time_s: Optional[float]
+    directed: bool
+
+
+def parse_direction(value: Any) -> Optional[float]:
+    """
+    direction alanını yön derecesine çevirir
+
+    Sayısal değerler (ör. "87") ve pusula yönleri (ör. "N", "N/E" -
+    ilk yön hareket yönü kabul edilir) desteklenir. Tire ile ayrılmış
+    çiftler (ör. "N-S") bu veride çift yönlü yolu belirtir; yönsüz
+    kabul edilir (None).
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) % 360.0
+
+    value = str(value).strip().upper()
+    try:
+        return float(value) % 360.0
+    except ValueError:
+        pass
+
+    if '-' in value:
+        return None
+    head = re.split(r'[/ ]', value)[0]
+    return COMPASS_BEARINGS.get(head)
+
+
+def angle_difference(a: float, b: float) -> float:
+    """İki yön arasındaki en küçük açı farkı (0-180)"""
+    diff = abs(a - b) % 360.0
+    return 360.0 - diff if diff > 180.0 else diff
+
+
+def road_key(road_name: Optional[str]) -> Optional[str]:
+    """Yol adını eşleştirme anahtarına çevirir"""
+    if not road_name:
+        return None
+    key = ' '.join(str(road_name).casefold().split())
+    return None if key in GENERIC_ROAD_NAMES else key
+
+
+class SectionPairer:
+    """Kesit kameralarını giriş/çıkış segmentlerine eşleştiren sınıf"""
+
+    def __init__(self, min_length_m: float = 500.0, max_length_m: float = 30000.0,
+                 max_heading_diff: float = 45.0, neighbours: int = 8):
+        self.min_length_m = min_length_m
+        self.max_length_m = max_length_m
+        self.max_heading_diff = max_heading_diff
+        self.neighbours = neighbours
+
+    def pair(self, points: List[Any]) -> List[SectionSegment]:
+        """
+        Noktalardan kesit segmentlerini çıkarır
+
+        Her kamera en fazla bir segmentin girişi ve bir segmentin çıkışı
+        olabilir; böylece ardışık kameralar zincir oluşturur. Yönü bilinen
+        kameralarda giriş→çıkış doğrultusu kamera yönüyle uyumlu olmalıdır,
+        yönü bilinmeyenler yönsüz (directed=False) segment olarak eklenir.
+        """
+        candidates = [p for p in points
+                      if p.type in SECTION_TYPES and road_key(p.road_name)]
+        if len(candidates) < 2:
+            return []
+
+        keys = [road_key(p.road_name) for p in candidates]
+        headings = [parse_direction(p.direction) for p in candidates]
+        tree = STRTree([(p.longitude, p.latitude, p.longitude, p.latitude) for p in candidates])
+
+        # Aday çiftler: (a, b) -> mesafe
+        pairs = {}
+        for a, point in enumerate(candidates):
+            for b, distance in tree.nearest(point.latitude, point.longitude,
+                                            k=self.neighbours + 1,
+                                            max_distance_m=self.max_length_m):
+                if b == a or keys[a] != keys[b] or distance < self.min_length_m:
+                    continue
+                pairs[(min(a, b), max(a, b))] = distance
+
+        next_of: Dict[int, int] = {}
+        prev_of: Dict[int, int] = {}
+        chain_of = list(range(len(candidates)))  # union-find: zincir kökü
+        segments = []
+
+        def chain_root(i: int) -> int:
+            while chain_of[i] != i:
+                chain_of[i] = chain_of[chain_of[i]]
+                i = chain_of[i]
+            return i
+
+        for (a, b), _ in sorted(pairs.items(), key=lambda item: item[1]):
+            orientation = self._orient(candidates, headings, a, b)
+            # Aynı zincirin iki ucunu bağlamak döngü oluşturur
+            if orientation is None or chain_root(a) == chain_root(b):
+                continue
+
+            for entry, exit_ in orientation:
+                if entry in next_of or exit_ in prev_of:
+                    continue
+                next_of[entry] = exit_
+                prev_of[exit_] = entry
+                chain_of[chain_root(entry)] = chain_root(exit_)
+                segments.append(self._make_segment(
+                    len(segments), candidates[entry], candidates[exit_],
+                    headings[entry] is not None and headings[exit_] is not None
+                ))
+                break
+
+        return segments
+
+    def _orient(self, points: List[Any], headings: List[Optional[float]], a: int, b: int):
+        """Çift için denenecek (giriş, çıkış) yönlerini döner; uyumsuzsa None"""
+        ha, hb = headings[a], headings[b]
+        if ha is None or hb is None:
+            return [(a, b), (b, a)]
+
+        if angle_difference(ha, hb) > self.max_heading_diff:
+            return None
+
+        pa, pb = points[a], points[b]
+        bearing = initial_bearing(pa.latitude, pa.longitude, pb.latitude, pb.longitude)
+        if angle_difference(bearing, ha) <= self.max_heading_diff:
+            return [(a, b)]
+        if angle_difference((bearing + 180.0) % 360.0, ha) <= self.max_heading_diff:
+            return [(b, a)]
+        return None
+
+    @staticmethod
+    def _make_segment(segment_id: int, entry: Any, exit_: Any, directed: bool) -> SectionSegment:
+        """Giriş ve çıkış kamerasından segment kaydı oluşturur"""
+        speed_limit = entry.speed_limit or exit_.speed_limit
+        length_m = haversine_m(entry.latitude, entry.longitude, exit_.latitude, exit_.longitude)
+        min_travel_time = length_m / (speed_limit / 3.6) if speed_limit else None
+
+        return SectionSegment(
+            segment_id=segment_id,
+            entry_id=entry.id,
+            exit_id=exit_.id,
+            road_name=entry.road_name,
+            length_m=round(length_m, 1),
+            bearing=round(initial_bearing(entry.latitude, entry.longitude,
+                                          exit_.latitude, exit_.longitude), 1),
+            speed_limit=speed_limit,
+            min_travel_time_s=round(min_travel_time, 1) if min_travel_time else None,
+            directed=directed
+        )
+
+
+def build_camera_lookup(segments: List[SectionSegment]) -> Dict[str, List[Optional[int]]]:
+    """Kamera ID -> [giriş olduğu segment, çıkış olduğu segment] tablosu"""
+    lookup: Dict[str, List[Optional[int]]] = {}
+    for segment in segments:
+        lookup.setdefault(segment.entry_id, [None, None])[0] = segment.segment_id
+        lookup.setdefault(segment.exit_id, [None, None])[1] = segment.segment_id
+    return lookup
+
+
+def export_sections_json(segments: List[SectionSegment], json_path: str):
+    """Segment tablosunu kompakt JSON olarak yazar"""
+    fields = list(SectionSegment.__dataclass_fields__)
+    data = {
+        "generated": datetime.now().isoformat(),
+        "total_segments": len(segments),
+        "fields": fields,
+        "segments": [[getattr(s, f) for f in fields] for s in segments],
+        "by_camera": build_camera_lookup(segments)
+    }
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def export_sections_sqlite(segments: List[SectionSegment], db_path: str):
+    """Segment tablosunu SQLite veritabanına ekler"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute('DROP TABLE IF EXISTS section_segments')
+    cursor.execute('''
+        CREATE TABLE section_segments (
+            segment_id INTEGER PRIMARY KEY,
+            entry_id TEXT NOT NULL UNIQUE,
+            exit_id TEXT NOT NULL UNIQUE,
+            road_name TEXT,
+            length_m REAL NOT NULL,
+            bearing REAL,
+            speed_limit INTEGER,
+            min_travel_time_s REAL,
+            directed INTEGER NOT NULL
+        )
+    ''')
+
+    cursor.executemany(
+        'INSERT INTO section_segments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [tuple(asdict(s).values()) for s in segments]
+    )
+
+    conn.commit()
+    conn.close()
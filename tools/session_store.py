@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Oturum Deposu - Shared Session Store
+========================================
+
+Web sunucusunun işlem sonuçlarını (oturumları) süreçler arasında paylaşılan
+bir SQLite (WAL) veritabanında tutar. Birden fazla gunicorn işçisi aynı
+depoyu kullanır; indirme isteği hangi işçiye düşerse düşsün oturumu bulur.
+
+Özellikler:
+- SQLite WAL: eşzamanlı okuyucular yazarı beklemez
+- TTL: süresi dolan oturumlar okunmaz, çıktı dizinleriyle birlikte silinir
+- Süre dolumu yığını (heap) + arka plan temizleyici iş parçacığı; istek
+  başına tarama yoktur
+- Sınırlar: en fazla max_sessions oturum ve max_bytes çıktı; aşılırsa
+  süresi en yakın olan oturumlar erkenden silinir
+- Silme koşullu DELETE ile yapılır; aynı oturumu yalnızca bir süreç temizler
+- Bitmemiş (queued / running) oturumlar sınır nedeniyle silinmez; süreleri
+  dolsa da bir TTL daha korunur (sahibi çökmüş işler ancak sonra temizlenir)
+- İptal isteği (cancel_requested): işi başka bir işçi sunucu sürecinde olan
+  iptal istekleri depoya yazılır; işin sahibi olan süreç bunları yoklar
+"""
+
+import heapq
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_DB_PATH = Path(tempfile.gettempdir()) / 'eds-sessions.db'
+DEFAULT_TTL_S = 3600
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+SWEEP_INTERVAL_S = 300
+ACTIVE_STATUSES = ('queued', 'running')
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    output_dir TEXT,
+    status TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires);
+"""
+
+
+def directory_size(path: Optional[str]) -> int:
+    """Dizindeki dosyaların toplam boyutu"""
+    if not path or not os.path.isdir(path):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class SessionStore:
+    """Süreçler arası paylaşılan, TTL'li oturum deposu"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH, ttl: float = DEFAULT_TTL_S,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS, max_bytes: int = DEFAULT_MAX_BYTES,
+                 sweep_interval: float = SWEEP_INTERVAL_S):
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+
+        self._local = threading.local()
+        self._heap: List[tuple] = []
+        self._wakeup = threading.Condition()
+        self._closed = False
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+
+        threading.Thread(target=self._reaper_loop, name='session-reaper', daemon=True).start()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Eski şemalı veritabanına eksik sütunları ekler"""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(sessions)')}
+        for name, definition in (('status', 'TEXT'), ('cancel_requested', 'INTEGER NOT NULL DEFAULT 0')):
+            if name not in columns:
+                try:
+                    conn.execute(f'ALTER TABLE sessions ADD COLUMN {name} {definition}')
+                except sqlite3.OperationalError:
+                    pass  # başka bir süreç aynı anda ekledi
+
+    def _connection(self) -> sqlite3.Connection:
+        """İş parçacığına özel bağlantı"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute('PRAGMA busy_timeout=30000')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def put(self, session_id: str, data: Dict[str, Any], output_dir: Optional[str] = None,
+            ttl: Optional[float] = None, overwrite: bool = True) -> bool:
+        """
+        Oturumu ekler veya günceller (TTL yeniden başlar)
+
+        overwrite=False ise oturum zaten varsa dokunulmaz ve False döner.
+        Bekleyen iptal isteği güncellemede korunur.
+        """
+        now = time.time()
+        expires = now + (ttl if ttl is not None else self.ttl)
+        output_dir = str(output_dir) if output_dir else None
+        written = self._connection().execute(
+            f'INSERT OR {"REPLACE" if overwrite else "IGNORE"} INTO sessions '
+            '(id, data, output_dir, status, cancel_requested, bytes, created, expires) '
+            'VALUES (?, ?, ?, ?, COALESCE((SELECT cancel_requested FROM sessions WHERE id = ?), 0), ?, '
+            'COALESCE((SELECT created FROM sessions WHERE id = ?), ?), ?)',
+            (session_id, json.dumps(data, ensure_ascii=False), output_dir, data.get('status'), session_id,
+             directory_size(output_dir), session_id, now, expires)).rowcount
+        if not written:
+            return False
+
+        with self._wakeup:
+            heapq.heappush(self._heap, (expires, session_id))
+            if len(self._heap) > 2 * self.max_sessions:
+                self._rebuild_heap()
+            self._wakeup.notify()
+        self._enforce_limits()
+        return True
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Süresi dolmamış (veya korunan bitmemiş) oturumu döner: veri + output_dir + created_at + cancel_requested"""
+        now = time.time()
+        row = self._connection().execute(
+            'SELECT data, output_dir, created, cancel_requested FROM sessions WHERE id = ? AND '
+            '(expires > ? OR (status IN (?, ?) AND expires > ?))',
+            (session_id, now, *ACTIVE_STATUSES, now - self.ttl)).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        data['output_dir'] = row[1]
+        data['created_at'] = row[2]
+        data['cancel_requested'] = bool(row[3])
+        return data
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def delete(self, session_id: str) -> bool:
+        """Oturumu ve çıktı dizinini siler"""
+        return self._remove(session_id, None)
+
+    def request_cancel(self, session_id: str) -> bool:
+        """Bitmemiş işe iptal isteği yazar; iş bitmiş veya yoksa False döner"""
+        return bool(self._connection().execute(
+            'UPDATE sessions SET cancel_requested = 1 WHERE id = ? AND status IN (?, ?)',
+            (session_id, *ACTIVE_STATUSES)).rowcount)
+
+    def cancel_requests(self) -> List[str]:
+        """İptali istenmiş, henüz bitmemiş işlerin kimlikleri"""
+        return [session_id for session_id, in self._connection().execute(
+            'SELECT id FROM sessions WHERE cancel_requested = 1 AND status IN (?, ?)',
+            ACTIVE_STATUSES).fetchall()]
+
+    def stats(self) -> Dict[str, Any]:
+        """Depo doluluk bilgisi"""
+        count, total = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM sessions WHERE expires > ?',
+            (time.time(),)).fetchone()
+        return {'sessions': count, 'bytes': total, 'maxSessions': self.max_sessions, 'maxBytes': self.max_bytes}
+
+    def reap(self) -> int:
+        """Süresi dolan tüm oturumları siler (başka süreçlerin ekledikleri dahil)"""
+        now = time.time()
+        expired = self._connection().execute(
+            'SELECT id FROM sessions WHERE expires <= ?', (now,)).fetchall()
+        return sum(self._remove(session_id, now) for session_id, in expired)
+
+    def close(self):
+        """Temizleyici iş parçacığını durdurur"""
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+
+    def _remove(self, session_id: str, expired_before: Optional[float]) -> bool:
+        """
+        Oturumu koşullu olarak siler; satırı silen süreç dizini de temizler
+
+        expired_before verilirse yalnızca süresi o ana kadar dolmuşsa silinir
+        (bu arada yenilenen oturumlar korunur). Bitmemiş işin oturumu bir TTL
+        daha korunur: çıktı dizinine hâlâ yazılıyor olabilir.
+        """
+        conn = self._connection()
+        row = conn.execute('SELECT output_dir, expires, status FROM sessions WHERE id = ?',
+                           (session_id,)).fetchone()
+        if row is None:
+            return False
+        output_dir, expires, status = row
+        if expired_before is not None:
+            grace = self.ttl if status in ACTIVE_STATUSES else 0
+            if expires + grace > expired_before:
+                return False
+
+        deleted = conn.execute('DELETE FROM sessions WHERE id = ? AND expires = ? AND status IS ?',
+                               (session_id, expires, status)).rowcount
+        if deleted and output_dir:
+            shutil.rmtree(output_dir, ignore_errors=True)
+        return bool(deleted)
+
+    def _enforce_limits(self):
+        """Oturum sayısı veya toplam boyut sınırı aşıldıysa süresi en yakın bitmiş oturumları siler"""
+        conn = self._connection()
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM sessions').fetchone()
+        if count <= self.max_sessions and total <= self.max_bytes:
+            return
+
+        for session_id, size in conn.execute(
+                'SELECT id, bytes FROM sessions WHERE status IS NULL OR status NOT IN (?, ?) '
+                'ORDER BY expires', ACTIVE_STATUSES).fetchall():
+            if count <= self.max_sessions and total <= self.max_bytes:
+                break
+            if self._remove(session_id, None):
+                count -= 1
+                total -= size
+                logger.info(f"Evicted session {session_id} (session store limits)")
+
+    def _rebuild_heap(self):
+        """Yığını veritabanındaki süre bilgilerinden yeniden kurar (kilit altında)"""
+        self._heap = [(expires, session_id) for session_id, expires in
+                      self._connection().execute('SELECT id, expires FROM sessions').fetchall()]
+        heapq.heapify(self._heap)
+
+    def _reaper_loop(self):
+        """En yakın süre dolumuna kadar uyur, dolanları siler; ara sıra tam tarama yapar"""
+        with self._wakeup:
+            self._rebuild_heap()
+        next_sweep = time.time() + self.sweep_interval
+
+        while True:
+            with self._wakeup:
+                if self._closed:
+                    return
+                now = time.time()
+                timeout = next_sweep - now
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - now)
+                if timeout > 0:
+                    self._wakeup.wait(timeout)
+                    continue
+
+                now = time.time()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[1])
+
+            try:
+                for session_id in due:
+                    self._remove(session_id, now)
+                if time.time() >= next_sweep:
+                    self.reap()
+                    next_sweep = time.time() + self.sweep_interval
+            except sqlite3.Error as e:
+                logger.error(f"Session reaper failed: {e}")
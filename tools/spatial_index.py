@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Mekansal İndeks - Spatial Index
+===================================
+
+Birleştirici ve yardımcı araçların ortak kullandığı hafif mekansal
+indeks yapıları ve coğrafi hesaplama fonksiyonları.
+
+Özellikler:
+- STRTree: Sort-Tile-Recursive ile paketlenmiş statik R-tree
+- Bbox sorguları ve metrik (metre) en yakın komşu araması
+- Haversine mesafe, yön (bearing) ve nokta-doğru parçası mesafesi
+
+Harici bağımlılık gerektirmez.
+"""
+
+import math
+import heapq
+from typing import Callable, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+# Bir derecelik enlem yayının metre karşılığı
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180.0
+
+Box = Tuple[float, float, float, float]  # (min_lng, min_lat, max_lng, max_lat)
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """İki koordinat arasındaki mesafeyi hesaplar (metre)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def initial_bearing(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Birinci noktadan ikinciye başlangıç yönünü döner (0-360 derece)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dlmb = math.radians(lng2 - lng1)
+
+    y = math.sin(dlmb) * math.cos(phi2)
+    x = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlmb)
+    return (math.degrees(math.atan2(y, x)) + 360.0) % 360.0
+
+
+def degree_margins(lat: float, radius_m: float) -> Tuple[float, float]:
+    """Verilen enlemde metre yarıçapının (enlem, boylam) derece karşılığı"""
+    dlat = radius_m / METERS_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    return dlat, dlat / cos_lat
+
+
+def point_segment_distance_m(lat: float, lng: float,
+                             lat1: float, lng1: float,
+                             lat2: float, lng2: float) -> Tuple[float, float]:
+    """
+    Noktanın doğru parçasına en kısa mesafesini hesaplar
+
+    Nokta etrafında yerel eşdikdörtgen projeksiyon kullanılır; yol
+    segmentleri gibi kısa parçalar için hata ihmal edilebilir düzeydedir.
+
+    Returns:
+        (mesafe_metre, t) - t, parça üzerindeki izdüşüm oranıdır (0-1)
+    """
+    kx = math.cos(math.radians(lat)) * METERS_PER_DEGREE
+    ky = METERS_PER_DEGREE
+
+    ax = (lng1 - lng) * kx
+    ay = (lat1 - lat) * ky
+    bx = (lng2 - lng) * kx
+    by = (lat2 - lat) * ky
+
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(ax, ay), 0.0
+
+    t = -(ax * dx + ay * dy) / length_sq
+    if t < 0.0:
+        t = 0.0
+    elif t > 1.0:
+        t = 1.0
+
+    return math.hypot(ax + t * dx, ay + t * dy), t
+
+
+class STRTree:
+    """
+    Sort-Tile-Recursive yöntemiyle paketlenmiş statik R-tree
+
+    Tüm düğümler düz listelerde tutulur: önce öğeler (yapraklar),
+    ardından her üst seviyenin düğümleri. Her seviye kendi içinde STR
+    sırasına göre dizilir ve ardışık ``node_capacity`` elemanı bir üst
+    düğümde toplanır. Yapı bir kez kurulur, sonradan öğe eklenmez.
+    """
+
+    def __init__(self, boxes: Sequence[Box], node_capacity: int = 16):
+        if node_capacity < 2:
+            raise ValueError("node_capacity must be at least 2")
+
+        self.node_capacity = node_capacity
+        self.size = len(boxes)
+
+        self.min_x: List[float] = []
+        self.min_y: List[float] = []
+        self.max_x: List[float] = []
+        self.max_y: List[float] = []
+        # Yaprak seviyesinde orijinal öğe indeksi, üst seviyelerde ilk çocuk
+        self.child_start: List[int] = []
+        # Yaprak seviyesinde -1, üst seviyelerde son çocuk + 1
+        self.child_end: List[int] = []
+        # Her seviyenin düz listedeki [başlangıç, bitiş) aralığı
+        self.levels: List[Tuple[int, int]] = []
+
+        if self.size:
+            self._build(boxes)
+
+    def _build(self, boxes: Sequence[Box]):
+        """Ağacı aşağıdan yukarıya paketler"""
+        leaves = [(box[0], box[1], box[2], box[3], i, -1) for i, box in enumerate(boxes)]
+        self._append_level(self._str_sort(leaves))
+
+        start, end = self.levels[-1]
+        while end - start > 1:
+            parents = []
+            for chunk_start in range(start, end, self.node_capacity):
+                chunk_end = min(chunk_start + self.node_capacity, end)
+                parents.append((
+                    min(self.min_x[chunk_start:chunk_end]),
+                    min(self.min_y[chunk_start:chunk_end]),
+                    max(self.max_x[chunk_start:chunk_end]),
+                    max(self.max_y[chunk_start:chunk_end]),
+                    chunk_start,
+                    chunk_end
+                ))
+            self._append_level(self._str_sort(parents))
+            start, end = self.levels[-1]
+
+    def _str_sort(self, entries: List[tuple]) -> List[tuple]:
+        """Girdileri dikey dilimlere ve dilim içinde enleme göre sıralar"""
+        cap = self.node_capacity
+        node_count = math.ceil(len(entries) / cap)
+        slice_count = max(1, math.ceil(math.sqrt(node_count)))
+        slice_size = slice_count * cap
+
+        entries = sorted(entries, key=lambda e: e[0] + e[2])
+        ordered = []
+        for i in range(0, len(entries), slice_size):
+            ordered.extend(sorted(entries[i:i + slice_size], key=lambda e: e[1] + e[3]))
+        return ordered
+
+    def _append_level(self, entries: List[tuple]):
+        """Sıralanmış bir seviyeyi düz listelere ekler"""
+        start = len(self.min_x)
+        for min_x, min_y, max_x, max_y, child_start, child_end in entries:
+            self.min_x.append(min_x)
+            self.min_y.append(min_y)
+            self.max_x.append(max_x)
+            self.max_y.append(max_y)
+            self.child_start.append(child_start)
+            self.child_end.append(child_end)
+        self.levels.append((start, len(self.min_x)))
+
+    @property
+    def root_range(self) -> Tuple[int, int]:
+        """En üst seviyenin düğüm aralığı"""
+        return self.levels[-1] if self.levels else (0, 0)
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[int]:
+        """Bbox ile kesişen öğelerin orijinal indekslerini döner"""
+        if not self.size:
+            return []
+
+        result = []
+        leaf_end = self.levels[0][1]
+        stack = [self.root_range]
+
+        while stack:
+            start, end = stack.pop()
+            for node in range(start, end):
+                if (self.max_x[node] < min_x or self.min_x[node] > max_x or
+                        self.max_y[node] < min_y or self.min_y[node] > max_y):
+                    continue
+                if node < leaf_end:
+                    result.append(self.child_start[node])
+                else:
+                    stack.append((self.child_start[node], self.child_end[node]))
+
+        return result
+
+    def nearest(self, lat: float, lng: float, k: int = 1,
+                max_distance_m: float = float('inf'),
+                item_distance: Optional[Callable[[int], float]] = None) -> List[Tuple[int, float]]:
+        """
+        Noktaya en yakın k öğeyi metre cinsinden mesafeleriyle döner
+
+        Düğüm mesafeleri nokta enlemindeki eşdikdörtgen ölçekle hesaplanır.
+        ``item_distance`` verilirse öğelerin gerçek mesafesi bu fonksiyonla
+        bulunur (ör. doğru parçasına mesafe); verilmezse bbox mesafesi kullanılır.
+        """
+        if not self.size or k <= 0:
+            return []
+
+        kx = math.cos(math.radians(lat)) * METERS_PER_DEGREE
+        ky = METERS_PER_DEGREE
+        leaf_end = self.levels[0][1]
+
+        def box_distance(node: int) -> float:
+            dx = max(self.min_x[node] - lng, 0.0, lng - self.max_x[node]) * kx
+            dy = max(self.min_y[node] - lat, 0.0, lat - self.max_y[node]) * ky
+            return math.hypot(dx, dy)
+
+        # (mesafe, kesin_mi, düğüm)
+        heap = []
+        start, end = self.root_range
+        for node in range(start, end):
+            heapq.heappush(heap, (box_distance(node), False, node))
+
+        result = []
+        while heap and len(result) < k:
+            distance, exact, node = heapq.heappop(heap)
+            if distance > max_distance_m:
+                break
+
+            if node < leaf_end:
+                if exact or item_distance is None:
+                    result.append((self.child_start[node], distance))
+                else:
+                    heapq.heappush(heap, (item_distance(self.child_start[node]), True, node))
+            else:
+                for child in range(self.child_start[node], self.child_end[node]):
+                    heapq.heappush(heap, (box_distance(child), False, child))
+
+        return result
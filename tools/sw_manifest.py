@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Service Worker Önbellek Manifesti - Precache Manifest Generator
+===================================================================
+
+Uygulama kabuğu (index.html, css, js) ve yayınlanmış veri dosyaları için
+URL -> içerik özeti -> boyut listesi üretir. Service worker yalnızca özeti
+değişen dosyaları yeniden indirir; veri dosyaları ayrı bir önbellekte
+tutulduğu için kamera güncellemeleri uygulama kabuğunu silmez.
+
+- Kabuk manifesti sw.js içindeki işaretli bloğa yazılır (git'te izlenir;
+  yalnızca kabuk dosyaları değişince güncellenir)
+- Veri manifesti her yayında data/precache-data.js dosyasına yazılır
+  (üretilmiş çıktı, .gitignore'da); sw.js bunu importScripts ile yükler.
+  İçe aktarılan betik değişince tarayıcı yeni service worker kurar
+
+Veri dosyaları:
+- Karo manifesti varsa: karo ve küme manifestleri (karolar çalışma anında
+  ?v=<hash> adresleriyle önbelleğe alınır)
+- Yoksa: tam GeoJSON ve uyarı ızgarası
+
+Usage:
+    python sw_manifest.py            # ../sw.js ve veri manifestini günceller
+    python sw_manifest.py --check    # yalnızca sw.js güncel mi kontrol eder
+"""
+
+import hashlib
+import json
+import os
+import re
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+APP_ROOT = Path(__file__).parent.parent
+REVISION_LENGTH = 16
+DATA_MANIFEST_FILE = 'data/precache-data.js'  # sw.js aynı yolu importScripts ile yükler
+
+# URL -> uygulama köküne göre dosya yolu
+SHELL_FILES = {
+    '/': 'index.html',
+    '/index.html': 'index.html',
+    '/manifest.json': 'manifest.json',
+    '/css/style.css': 'css/style.css',
+    '/js/utils.js': 'js/utils.js'
+}
+TILED_DATA_FILES = {
+    '/data/tiles/manifest.json': 'data/tiles/manifest.json',
+    '/data/clusters/manifest.json': 'data/clusters/manifest.json'
+}
+FULL_DATA_FILES = {
+    '/data/eds-locations.geojson': 'data/eds-locations.geojson',
+    '/data/eds-locations.grid.json': 'data/eds-locations.grid.json'
+}
+
+MANIFEST_BLOCK = re.compile(
+    r'(// @precache-manifest-start\n).*?(\n// @precache-manifest-end)', re.S)
+
+
+def manifest_entries(root: Path, files: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Var olan dosyalar için {url, revision, size} kayıtları"""
+    entries = []
+    for url, relative in files.items():
+        path = root / relative
+        if not path.is_file():
+            continue
+        data = path.read_bytes()
+        entries.append({
+            "url": url,
+            "revision": hashlib.sha256(data).hexdigest()[:REVISION_LENGTH],
+            "size": len(data)
+        })
+    return entries
+
+
+def build_precache_manifest(root: Path = APP_ROOT) -> Dict[str, List[Dict[str, Any]]]:
+    """Kabuk ve veri önbellek manifestini oluşturur"""
+    tiled = (root / TILED_DATA_FILES['/data/tiles/manifest.json']).is_file()
+    return {
+        "shell": manifest_entries(root, SHELL_FILES),
+        "data": manifest_entries(root, TILED_DATA_FILES if tiled else FULL_DATA_FILES)
+    }
+
+
+def shell_manifest_line(entries: List[Dict[str, Any]]) -> str:
+    """sw.js bloğuna yazılan kabuk manifesti satırı"""
+    return 'const PRECACHE_SHELL = ' + json.dumps(entries, separators=(',', ':')) + ';'
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """
+    Dosyayı yalnızca içerik değiştiyse (atomik olarak) yeniden yazar
+
+    Service worker ve içe aktardığı betiklerin baytları değişmedikçe
+    tarayıcı yeni service worker kurmaz.
+    """
+    if path.is_file() and path.read_text(encoding='utf-8') == content:
+        return False
+    temp_path = path.with_name('.' + path.name + '.tmp')
+    temp_path.write_text(content, encoding='utf-8')
+    os.replace(temp_path, path)
+    return True
+
+
+def inject_manifest(sw_path: Path, shell: List[Dict[str, Any]]) -> bool:
+    """Kabuk manifestini sw.js içindeki işaretli bloğa yazar"""
+    content = sw_path.read_text(encoding='utf-8')
+    if not MANIFEST_BLOCK.search(content):
+        raise ValueError(f"Precache manifest markers not found in {sw_path}")
+
+    line = shell_manifest_line(shell)
+    return write_if_changed(sw_path, MANIFEST_BLOCK.sub(lambda match: match.group(1) + line + match.group(2),
+                                                        content))
+
+
+def update_data_manifest(root: Path = APP_ROOT) -> Dict[str, Any]:
+    """
+    Veri manifestini (data/precache-data.js) günceller
+
+    Sürüm yayınında yalnızca bu dosya yazılır; git'te izlenen sw.js'e
+    dokunulmaz.
+    """
+    entries = build_precache_manifest(root)['data']
+    content = ('// tools/sw_manifest.py tarafından üretilir, elle düzenlemeyin\n'
+               'self.PRECACHE_DATA = ' + json.dumps(entries, separators=(',', ':')) + ';\n')
+    return {
+        "changed": write_if_changed(root / DATA_MANIFEST_FILE, content),
+        "data": len(entries),
+        "bytes": sum(entry['size'] for entry in entries)
+    }
+
+
+def update_service_worker(root: Path = APP_ROOT) -> Dict[str, Any]:
+    """Uygulama kökündeki sw.js kabuk manifestini ve veri manifestini günceller"""
+    shell = build_precache_manifest(root)['shell']
+    data = update_data_manifest(root)
+    return {
+        "changed": inject_manifest(root / 'sw.js', shell),
+        "data_changed": data['changed'],
+        "shell": len(shell),
+        "data": data['data'],
+        "bytes": sum(entry['size'] for entry in shell) + data['bytes']
+    }
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Service Worker precache manifest generator')
+    parser.add_argument('--root', default=str(APP_ROOT), help='Application root (contains sw.js)')
+    parser.add_argument('--check', action='store_true', help='Exit with 1 if sw.js is out of date')
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if args.check:
+        expected = shell_manifest_line(build_precache_manifest(root)['shell'])
+        up_to_date = expected in (root / 'sw.js').read_text(encoding='utf-8')
+        print("✅ sw.js güncel" if up_to_date else "⚠️ sw.js manifesti güncel değil")
+        raise SystemExit(0 if up_to_date else 1)
+
+    result = update_service_worker(root)
+    state = "güncellendi" if result['changed'] else "zaten güncel"
+    print(f"✅ sw.js {state}: {result['shell']} kabuk dosyası; veri manifesti "
+          f"{'güncellendi' if result['data_changed'] else 'zaten güncel'}: {result['data']} dosya "
+          f"({result['bytes'] / 1024:.1f}KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Karo Yayınlayıcı - Geographic Tile Publisher
+================================================
+
+Birleştirilmiş veri setini z/x/y (Web Mercator) karolarına böler. Her karo
+yalnızca istemcinin kullandığı alanları içeren kompakt bir JSON dosyasıdır.
+Manifest dosyası karo sınırlarını, nokta sayılarını ve içerik özetlerini
+(hash) listeler; uygulama yalnızca kullanıcının çevresindeki karoları indirir.
+
+Çıktı yapısı:
+    tiles/manifest.json
+    tiles/{z}/{x}/{y}.json
+
+Usage:
+    python tile_publisher.py ../data/eds-locations.geojson --zoom 10
+"""
+
+import hashlib
+import json
+import math
+import shutil
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_TILE_ZOOM = 10
+TILE_FORMAT_VERSION = 1
+
+# İstemci alan adı -> GeoJSON özellik adı (index.html loadEDSData ile aynı)
+CLIENT_FIELDS = [
+    ('id', 'id'),
+    ('lat', None),
+    ('lng', None),
+    ('type', 'type'),
+    ('speedLimit', 'speed_limit'),
+    ('road', 'road_name'),
+    ('district', 'district'),
+    ('city', 'city'),
+    ('direction', 'direction'),
+    ('status', 'status')
+]
+
+
+def tile_for(lat: float, lng: float, zoom: int) -> Tuple[int, int]:
+    """Koordinatın Web Mercator karo numarasını (x, y) döner"""
+    n = 2 ** zoom
+    lat_rad = math.radians(max(min(lat, 85.05112878), -85.05112878))
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> List[float]:
+    """Karonun [batı, güney, doğu, kuzey] sınırlarını döner"""
+    n = 2 ** zoom
+
+    def lat_of(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return [
+        round(x / n * 360.0 - 180.0, 6),
+        round(lat_of(y + 1), 6),
+        round((x + 1) / n * 360.0 - 180.0, 6),
+        round(lat_of(y), 6)
+    ]
+
+
+def client_row(feature: Dict[str, Any]) -> List[Any]:
+    """GeoJSON özelliğini istemci alan sırasına göre diziye çevirir"""
+    lng, lat = feature['geometry']['coordinates'][:2]
+    properties = feature.get('properties', {})
+    row = []
+    for field, source in CLIENT_FIELDS:
+        if field == 'lat':
+            row.append(round(lat, 6))
+        elif field == 'lng':
+            row.append(round(lng, 6))
+        else:
+            row.append(properties.get(source))
+    return row
+
+
+def build_tiles(features: List[Dict[str, Any]], zoom: int) -> Dict[Tuple[int, int], List[List[Any]]]:
+    """Özellikleri karolara dağıtır"""
+    tiles: Dict[Tuple[int, int], List[List[Any]]] = {}
+    for feature in features:
+        if (feature.get('geometry') or {}).get('type') != 'Point':
+            continue
+        lng, lat = feature['geometry']['coordinates'][:2]
+        tiles.setdefault(tile_for(lat, lng, zoom), []).append(client_row(feature))
+    return tiles
+
+
+def replace_directory(staging_path: Path, output_path: Path):
+    """Hazırlanan dizini eski çıktı dizininin yerine koyar"""
+    if output_path.exists():
+        old_path = output_path.with_name(output_path.name + '.old')
+        shutil.rmtree(old_path, ignore_errors=True)
+        output_path.rename(old_path)
+        staging_path.rename(output_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        staging_path.rename(output_path)
+
+
+def write_tiles(features: List[Dict[str, Any]], output_dir: str,
+                zoom: int = DEFAULT_TILE_ZOOM) -> Dict[str, Any]:
+    """
+    Karoları ve manifesti yazar
+
+    Karolar önce geçici bir dizine yazılır, ardından eski dizinle yer
+    değiştirilir; böylece yayın sırasında yarım karo seti görünmez ve
+    artık boş kalan eski karolar temizlenir.
+    """
+    output_path = Path(output_dir)
+    staging_path = output_path.with_name(output_path.name + '.tmp')
+    shutil.rmtree(staging_path, ignore_errors=True)
+
+    fields = [field for field, _ in CLIENT_FIELDS]
+    manifest_tiles = {}
+    total = 0
+
+    for (x, y), rows in sorted(build_tiles(features, zoom).items()):
+        key = f"{zoom}/{x}/{y}"
+        payload = json.dumps({"z": zoom, "x": x, "y": y, "fields": fields, "rows": rows},
+                             ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        tile_file = staging_path / f"{key}.json"
+        tile_file.parent.mkdir(parents=True, exist_ok=True)
+        tile_file.write_bytes(payload)
+
+        manifest_tiles[key] = {
+            "bounds": tile_bounds(zoom, x, y),
+            "count": len(rows),
+            "hash": hashlib.sha256(payload).hexdigest()[:16],
+            "bytes": len(payload)
+        }
+        total += len(rows)
+
+    manifest = {
+        "version": TILE_FORMAT_VERSION,
+        "generated": datetime.now().isoformat(),
+        "zoom": zoom,
+        "total": total,
+        "fields": fields,
+        "tiles": manifest_tiles
+    }
+    with open(staging_path / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    replace_directory(staging_path, output_path)
+    return manifest
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS Geographic Tile Publisher')
+    parser.add_argument('geojson', help='Merged / published EDS GeoJSON file')
+    parser.add_argument('--zoom', type=int, default=DEFAULT_TILE_ZOOM, help='Tile zoom level')
+    parser.add_argument('--output', help='Output directory (default: tiles/ next to the GeoJSON)')
+    args = parser.parse_args()
+
+    with open(args.geojson, 'r', encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+
+    output_dir = args.output or str(Path(args.geojson).parent / 'tiles')
+    manifest = write_tiles(features, output_dir, args.zoom)
+
+    sizes = [tile['bytes'] for tile in manifest['tiles'].values()]
+    print(f"✅ {manifest['total']} nokta, {len(sizes)} karoya bölündü (z{args.zoom})")
+    if sizes:
+        print(f"📦 Karo boyutu: ort. {sum(sizes) / len(sizes) / 1024:.1f}KB, maks. {max(sizes) / 1024:.1f}KB")
+    print(f"📁 Çıktı: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
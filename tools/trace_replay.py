@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS GPS İz Tekrar Oynatıcı - GPS Trace Replay Harness
+=====================================================
+
+Kaydedilmiş GPS izlerini (GPX / CSV / NDJSON) gerçek veya hızlandırılmış
+zamanda uyarı kontrolünden geçirir ve ölçüm raporu üretir.
+
+Rapor içeriği:
+- Konum başına işlem gecikmesi yüzdelikleri (p50 / p90 / p99 / maks.)
+- Üretilen uyarılar ve kaba kuvvet taramaya göre kaçırılan / fazla uyarılar
+- Aday küme boyutları
+
+Kontrol yöntemleri:
+- grid:   uyarı ızgarası adayları (index.html'deki getAlertCandidates)
+- engine: filo uyarı motoru (alert_engine.py), konum başına tek batch
+- brute:  tüm kameraları tarayan referans (doğruluk ölçütü)
+
+Usage:
+    python trace_replay.py synth --output synthetic_tracks.ndjson
+    python trace_replay.py replay synthetic_tracks.ndjson --speed 0
+    python trace_replay.py replay drive.gpx --speed 10 --checker engine
+"""
+
+import csv
+import json
+import math
+import random
+import sys
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+sys.path.append(str(Path(__file__).parent))
+from alert_engine import (AlertEngine, AlertSettings, LEVEL_EARLY, LEVEL_FINAL,
+                          LEVEL_MAIN, LEVEL_NAMES)
+from alert_grid import AlertGrid, DEFAULT_CELL_SIZE_DEG, load_coords
+from spatial_index import haversine_m, initial_bearing
+
+SCRAPERS_DIR = Path(__file__).parent.parent / "scrapers"
+DATA_DIR = Path(__file__).parent.parent / "data"
+PUBLISHED_GEOJSON = DATA_DIR / "eds-locations.geojson"  # release_publisher.py yayınlar (git dışı)
+SEED_GEOJSON = DATA_DIR / "seed" / "eds-locations.geojson"  # Depodaki başlangıç verisi
+
+
+def default_geojson() -> Path:
+    """Yayınlanmış veri seti; henüz yayın yapılmamışsa (yeni klon) başlangıç verisi"""
+    return PUBLISHED_GEOJSON if PUBLISHED_GEOJSON.exists() else SEED_GEOJSON
+
+
+@dataclass
+class Fix:
+    """Tek bir GPS konumu"""
+    vehicle_id: str
+    timestamp: float
+    lat: float
+    lng: float
+    heading: Optional[float] = None
+
+
+def _parse_time(value) -> float:
+    """Epoch saniye veya ISO-8601 zamanı epoch saniyeye çevirir"""
+    if value is None or value == '':
+        raise ValueError("missing timestamp")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def _optional_float(value) -> Optional[float]:
+    """Boş olabilen sayısal alanı çevirir"""
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+def _first(record: Dict, *keys):
+    """Kayıttaki ilk dolu alanın değerini döner (0 geçerli bir değerdir)"""
+    for key in keys:
+        value = record.get(key)
+        if value is not None and value != '':
+            return value
+    return None
+
+
+def _fix_from_record(record: Dict, default_vehicle: str) -> Fix:
+    """CSV satırı veya NDJSON nesnesinden Fix oluşturur"""
+    return Fix(
+        vehicle_id=str(_first(record, 'vehicle_id', 'vehicle') or default_vehicle),
+        timestamp=_parse_time(_first(record, 'timestamp', 'time', 't')),
+        lat=float(_first(record, 'lat', 'latitude')),
+        lng=float(_first(record, 'lng', 'lon', 'longitude')),
+        heading=_optional_float(_first(record, 'heading', 'course'))
+    )
+
+
+def load_gpx(path: str) -> List[Fix]:
+    """GPX track noktalarını yükler (her trk ayrı araç sayılır)"""
+    fixes = []
+    root = ET.parse(path).getroot()
+    ns = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+
+    for track_no, track in enumerate(root.iter(f'{ns}trk')):
+        name = track.findtext(f'{ns}name') or f"{Path(path).stem}_{track_no}"
+        for point in track.iter(f'{ns}trkpt'):
+            time_text = point.findtext(f'{ns}time')
+            course = point.findtext(f'{ns}course')
+            fixes.append(Fix(
+                vehicle_id=name,
+                timestamp=_parse_time(time_text),
+                lat=float(point.get('lat')),
+                lng=float(point.get('lon')),
+                heading=_optional_float(course)
+            ))
+    return fixes
+
+
+def load_csv(path: str) -> List[Fix]:
+    """CSV izini yükler (lat, lng/lon, timestamp/time, opsiyonel heading, vehicle_id)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [_fix_from_record(row, Path(path).stem) for row in csv.DictReader(f)]
+
+
+def load_ndjson(path: str) -> List[Fix]:
+    """Satır başına bir JSON nesnesi içeren izi yükler"""
+    fixes = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                fixes.append(_fix_from_record(json.loads(line), Path(path).stem))
+    return fixes
+
+
+def load_track(path: str) -> List[Fix]:
+    """Dosya uzantısına göre izi yükler ve zamana göre sıralar"""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.gpx':
+        fixes = load_gpx(path)
+    elif suffix == '.csv':
+        fixes = load_csv(path)
+    elif suffix in ('.ndjson', '.jsonl'):
+        fixes = load_ndjson(path)
+    else:
+        raise ValueError(f"Unsupported track format: {suffix}")
+
+    fixes.sort(key=lambda fix: fix.timestamp)
+    return fixes
+
+
+def load_corridors() -> List[Dict]:
+    """generate_synthetic_high_density_data'nın kullandığı güzergahları döner"""
+    sys.path.append(str(SCRAPERS_DIR))
+    from community_data_collector import MAJOR_ROUTES
+
+    return [dict(route, city=city)
+            for city, city_data in MAJOR_ROUTES.items()
+            for route in city_data["routes"]]
+
+
+def synthesize_tracks(speed_kmh: float = 70.0, interval_s: float = 1.0,
+                      gps_noise_m: float = 5.0, seed: int = 42,
+                      start_time: float = 0.0) -> List[Fix]:
+    """
+    Her güzergah için iki yönde birer araç izi üretir
+
+    Araçlar güzergah boyunca sabit hızla ilerler; konumlara GPS gürültüsü
+    eklenir, yön bilgisi güzergah doğrultusundan hesaplanır.
+    """
+    rng = random.Random(seed)
+    fixes = []
+    step_m = speed_kmh / 3.6 * interval_s
+
+    for route in load_corridors():
+        for forward in (True, False):
+            (lat1, lng1), (lat2, lng2) = route["start"], route["end"]
+            if not forward:
+                (lat1, lng1), (lat2, lng2) = (lat2, lng2), (lat1, lng1)
+
+            vehicle_id = f"{route['city']}:{route['name']}:{'fwd' if forward else 'rev'}"
+            length_m = haversine_m(lat1, lng1, lat2, lng2)
+            heading = initial_bearing(lat1, lng1, lat2, lng2)
+            steps = max(1, int(length_m / step_m))
+
+            for i in range(steps + 1):
+                progress = i / steps
+                noise_lat = rng.gauss(0, gps_noise_m) / 111195.0
+                noise_lng = rng.gauss(0, gps_noise_m) / (111195.0 * math.cos(math.radians(lat1)))
+                fixes.append(Fix(
+                    vehicle_id=vehicle_id,
+                    timestamp=start_time + i * interval_s,
+                    lat=lat1 + (lat2 - lat1) * progress + noise_lat,
+                    lng=lng1 + (lng2 - lng1) * progress + noise_lng,
+                    heading=round(heading, 1)
+                ))
+
+    fixes.sort(key=lambda fix: fix.timestamp)
+    return fixes
+
+
+def write_ndjson(fixes: Iterable[Fix], path: str):
+    """İzleri NDJSON olarak yazar"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for fix in fixes:
+            f.write(json.dumps(asdict(fix), ensure_ascii=False) + '\n')
+
+
+class ScalarAlertChecker:
+    """
+    checkProximityAlerts'in konum başına Python karşılığı
+
+    Aday kameralar ızgaradan (grid) veya tüm listeden (brute) alınır;
+    bekleme süreleri araç başına son ``history_size`` uyarı üzerinden
+    hasRecentAlert ile aynı şekilde uygulanır.
+    """
+
+    def __init__(self, coords: List[Tuple[float, float]], settings: AlertSettings,
+                 grid: Optional[AlertGrid] = None):
+        self.coords = coords
+        self.settings = settings
+        self.grid = grid
+        self.cooldowns = {LEVEL_EARLY: settings.early_cooldown,
+                          LEVEL_MAIN: settings.main_cooldown,
+                          LEVEL_FINAL: settings.final_cooldown}
+        self.history: Dict[str, List[Tuple[int, int, float]]] = {}
+        self.all_indices = list(range(len(coords)))
+
+    def check(self, fix: Fix) -> Tuple[List[Tuple[int, int, float]], int]:
+        """Konumu kontrol eder; (uyarılar, aday sayısı) döner"""
+        s = self.settings
+        candidates = self.grid.candidates(fix.lat, fix.lng) if self.grid else self.all_indices
+        history = self.history.setdefault(fix.vehicle_id, [])
+        alerts = []
+
+        for index in candidates:
+            lat, lng = self.coords[index]
+            distance = haversine_m(fix.lat, fix.lng, lat, lng)
+            if distance <= s.final_alert:
+                level = LEVEL_FINAL
+            elif distance <= s.main_alert:
+                level = LEVEL_MAIN
+            elif distance <= s.early_alert:
+                level = LEVEL_EARLY
+            else:
+                continue
+
+            cooldown = self.cooldowns[level]
+            if any(c == index and l == level and fix.timestamp - t < cooldown for c, l, t in history):
+                continue
+
+            alerts.append((index, level, distance))
+            history.append((index, level, fix.timestamp))
+            if len(history) > s.history_size:
+                del history[:-s.history_size]
+
+        return alerts, len(candidates)
+
+
+class EngineAlertChecker:
+    """AlertEngine'i konum başına tek elemanlı batch ile çalıştırır"""
+
+    def __init__(self, engine: AlertEngine):
+        self.engine = engine
+
+    def check(self, fix: Fix) -> Tuple[List[Tuple[int, int, float]], int]:
+        headings = [fix.heading if fix.heading is not None else math.nan]
+        batch = self.engine.process_batch([fix.vehicle_id], [fix.lat], [fix.lng],
+                                          [fix.timestamp], headings)
+        alerts = [(int(c), int(l), float(d))
+                  for c, l, d in zip(batch.camera_index, batch.level, batch.distance_m)]
+        return alerts, batch.candidates
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Sıralı listede en yakın sıra yöntemiyle yüzdelik değer"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(pct / 100.0 * len(values)) - 1))
+    return values[index]
+
+
+def replay(fixes: List[Fix], checker, truth: ScalarAlertChecker,
+           speed: float = 0.0) -> Dict:
+    """
+    İzleri kontrol yönteminden ve referanstan geçirip karşılaştırır
+
+    Args:
+        speed: 1.0 gerçek zaman, 10 on kat hızlı, 0 ise beklemeden
+    """
+    latencies = []
+    candidate_sizes = []
+    fired: Set[Tuple[int, int, int]] = set()
+    expected: Set[Tuple[int, int, int]] = set()
+    level_counts = {name: 0 for name in LEVEL_NAMES.values()}
+
+    wall_start = time.perf_counter()
+    track_start = fixes[0].timestamp if fixes else 0.0
+
+    for fix_no, fix in enumerate(fixes):
+        if speed > 0:
+            due = wall_start + (fix.timestamp - track_start) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        start = time.perf_counter()
+        alerts, candidate_count = checker.check(fix)
+        latencies.append(time.perf_counter() - start)
+        candidate_sizes.append(candidate_count)
+
+        for index, level, _ in alerts:
+            fired.add((fix_no, index, level))
+            level_counts[LEVEL_NAMES[level]] += 1
+
+        truth_alerts, _ = truth.check(fix)
+        expected.update((fix_no, index, level) for index, level, _ in truth_alerts)
+
+    latencies.sort()
+    candidate_sizes.sort()
+    to_us = 1e6
+    return {
+        'fixes': len(fixes),
+        'vehicles': len({fix.vehicle_id for fix in fixes}),
+        'wall_time_s': round(time.perf_counter() - wall_start, 3),
+        'latency_us': {
+            'p50': round(percentile(latencies, 50) * to_us, 1),
+            'p90': round(percentile(latencies, 90) * to_us, 1),
+            'p99': round(percentile(latencies, 99) * to_us, 1),
+            'max': round((latencies[-1] if latencies else 0.0) * to_us, 1),
+            'mean': round(sum(latencies) / len(latencies) * to_us, 1) if latencies else 0.0
+        },
+        'alerts': {
+            'fired': len(fired),
+            'expected': len(expected),
+            'missed': len(expected - fired),
+            'extra': len(fired - expected),
+            'by_level': level_counts
+        },
+        'candidates': {
+            'mean': round(sum(candidate_sizes) / len(candidate_sizes), 2) if candidate_sizes else 0.0,
+            'p95': percentile(candidate_sizes, 95),
+            'max': candidate_sizes[-1] if candidate_sizes else 0
+        }
+    }
+
+
+def build_checker(name: str, geojson: str, settings: AlertSettings, cell_size: float):
+    """İsme göre kontrol yöntemini oluşturur"""
+    coords = load_coords(geojson)
+    if name == 'engine':
+        return EngineAlertChecker(AlertEngine.from_geojson(geojson, settings, cell_size))
+    if name == 'grid':
+        return ScalarAlertChecker(coords, settings, AlertGrid.build(coords, cell_size, settings.early_alert))
+    return ScalarAlertChecker(coords, settings)
+
+
+def print_report(report: Dict, checker_name: str):
+    """Raporu okunabilir biçimde yazdırır"""
+    latency = report['latency_us']
+    alerts = report['alerts']
+    candidates = report['candidates']
+
+    print(f"\n🧪 {report['fixes']:,} konum, {report['vehicles']} araç ({checker_name}) - "
+          f"{report['wall_time_s']}s")
+    print(f"⏱️  Gecikme (µs): p50 {latency['p50']}, p90 {latency['p90']}, "
+          f"p99 {latency['p99']}, maks. {latency['max']}")
+    print(f"🚨 Uyarı: {alerts['fired']} üretildi, {alerts['expected']} beklendi, "
+          f"{alerts['missed']} kaçırıldı, {alerts['extra']} fazla")
+    print("   Seviye: " + ", ".join(f"{k} {v}" for k, v in alerts['by_level'].items()))
+    print(f"🎯 Aday: ort. {candidates['mean']}, p95 {candidates['p95']}, maks. {candidates['max']}")
+
+
+def main():
+    """Komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='EDS GPS Trace Replay Harness')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    synth = subparsers.add_parser('synth', help='Synthesize tracks along the synthetic data corridors')
+    synth.add_argument('--output', default='synthetic_tracks.ndjson')
+    synth.add_argument('--speed-kmh', type=float, default=70.0)
+    synth.add_argument('--interval', type=float, default=1.0, help='Seconds between fixes')
+    synth.add_argument('--noise', type=float, default=5.0, help='GPS noise (m, 1 sigma)')
+
+    run = subparsers.add_parser('replay', help='Replay a recorded or synthetic track')
+    run.add_argument('track', nargs='?', help='GPX / CSV / NDJSON track (omit with --synthetic)')
+    run.add_argument('--synthetic', action='store_true', help='Replay freshly synthesized tracks')
+    run.add_argument('--geojson', default=str(default_geojson()),
+                     help='Camera dataset (default: published data, else data/seed)')
+    run.add_argument('--checker', choices=['grid', 'engine', 'brute'], default='grid')
+    run.add_argument('--speed', type=float, default=0.0,
+                     help='Replay speed factor (1 = real time, 0 = as fast as possible)')
+    run.add_argument('--cell-size', type=float, default=DEFAULT_CELL_SIZE_DEG)
+    run.add_argument('--early-alert', type=float, default=1000.0)
+    run.add_argument('--main-alert', type=float, default=500.0)
+    run.add_argument('--final-alert', type=float, default=100.0)
+    run.add_argument('--heading-tolerance', type=float,
+                     help='Heading filter tolerance for the engine checker (degrees)')
+    run.add_argument('--report', help='Write the JSON report to this file')
+
+    args = parser.parse_args()
+
+    if args.command == 'synth':
+        fixes = synthesize_tracks(args.speed_kmh, args.interval, args.noise)
+        write_ndjson(fixes, args.output)
+        print(f"✅ {len(fixes):,} konum yazıldı: {args.output}")
+        return
+
+    if args.synthetic:
+        fixes = synthesize_tracks()
+    elif args.track:
+        fixes = load_track(args.track)
+    else:
+        parser.error('a track file or --synthetic is required')
+
+    settings = AlertSettings(early_alert=args.early_alert, main_alert=args.main_alert,
+                             final_alert=args.final_alert,
+                             heading_tolerance=args.heading_tolerance)
+    checker = build_checker(args.checker, args.geojson, settings, args.cell_size)
+    truth = ScalarAlertChecker(load_coords(args.geojson), settings)
+
+    report = replay(fixes, checker, truth, args.speed)
+    print_report(report, args.checker)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📁 Rapor: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EDS Yükleme Deposu - Streaming Upload Store
+===========================================
+
+Web sunucusuna yüklenen dosyaları belleğe almadan, parça parça doğrudan
+yükleme dizinine yazar ve yazarken SHA-256 özetini hesaplar.
+
+Özellikler:
+- Multipart yüklemeler Werkzeug'un geçici dosyası yerine doğrudan yükleme
+  dizinine akıtılır (UploadRequest._get_file_stream)
+- İçerik adresli dosya adları: <sha256>_<ad>; aynı içerik ikinci kez
+  yüklenirse mevcut dosya kullanılır
+- Devam ettirilebilir yüklemeler: create -> append (Content-Range) -> offset
+  sorgusu ile kopan yükleme kaldığı yerden sürer
+- resolve(): yalnızca yükleme dizinindeki dosyaları kabul eder ve özeti dosya
+  adından okur (işleme sırasında yeniden özet/kopya gerekmez)
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from flask import Request
+from werkzeug.utils import secure_filename
+
+UPLOAD_CHUNK = 1024 * 1024
+PARTIAL_SUFFIX = '.part'
+META_SUFFIX = '.upload.json'
+STALE_UPLOAD_S = 24 * 3600
+STORED_NAME = re.compile(r'^([0-9a-f]{64})_(.+)$')
+UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadError(Exception):
+    """Geçersiz yükleme isteği"""
+
+
+class UploadOffsetError(UploadError):
+    """Parça başlangıcı sunucudaki mevcut boyutla uyuşmuyor"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Chunk must start at byte {expected}")
+        self.expected = expected
+
+
+class HashingFile:
+    """Yazılan baytları dosyaya aktarırken SHA-256 özetini güncelleyen dosya nesnesi"""
+
+    def __init__(self, path: Path, mode: str = 'w+b', digest=None):
+        self.path = path
+        self.digest = digest or hashlib.sha256()
+        self.size = 0
+        self._file = open(path, mode)
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def read(self, *args) -> bytes:
+        return self._file.read(*args)
+
+    def readline(self, *args) -> bytes:
+        return self._file.readline(*args)
+
+    def seek(self, *args) -> int:
+        return self._file.seek(*args)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    @property
+    def name(self) -> str:
+        return str(self.path)
+
+
+class UploadStore:
+    """Yükleme dizini: akışla yazma, içerik adresleme, devam ettirme"""
+
+    def __init__(self, upload_dir: Path, max_upload_bytes: int):
+        self.upload_dir = Path(upload_dir)
+        self.max_upload_bytes = max_upload_bytes
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        # upload_id -> sha256 nesnesi; süreç yeniden başlarsa kısmi dosyadan yeniden hesaplanır
+        self._digests: Dict[str, Any] = {}
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def open_stream(self) -> HashingFile:
+        """Multipart dosya alanı için yükleme dizininde kısmi dosya açar"""
+        return HashingFile(self.upload_dir / f"{uuid.uuid4().hex}{PARTIAL_SUFFIX}")
+
+    def finalize(self, stream: HashingFile, original_name: str) -> Dict[str, Any]:
+        """Kısmi dosyayı içerik adresli adına taşır ve dosya bilgisini döner"""
+        if not stream.closed:
+            stream.close()
+        return self._publish(stream.path, stream.digest.hexdigest(), stream.size, original_name)
+
+    def discard(self, stream: HashingFile):
+        """Kullanılmayan kısmi dosyayı siler"""
+        if not stream.closed:
+            stream.close()
+        stream.path.unlink(missing_ok=True)
+
+    def _publish(self, partial: Path, sha256: str, size: int, original_name: str) -> Dict[str, Any]:
+        target = self.upload_dir / f"{sha256}_{secure_filename(original_name) or 'upload'}"
+        if target.exists():
+            partial.unlink(missing_ok=True)
+            os.utime(target)
+        else:
+            os.replace(partial, target)
+        return {'name': original_name, 'path': str(target), 'size': size, 'sha256': sha256}
+
+    def create(self, name: str, size: int) -> str:
+        """Devam ettirilebilir yükleme başlatır, yükleme kimliğini döner"""
+        if size < 0 or size > self.max_upload_bytes:
+            raise UploadError(f"Upload size must be between 0 and {self.max_upload_bytes} bytes")
+        self.remove_stale()
+
+        upload_id = uuid.uuid4().hex
+        (self.upload_dir / f"{upload_id}{PARTIAL_SUFFIX}").touch()
+        with open(self.upload_dir / f"{upload_id}{META_SUFFIX}", 'w', encoding='utf-8') as f:
+            json.dump({'name': name, 'size': size, 'created': time.time()}, f, ensure_ascii=False)
+        return upload_id
+
+    def _paths(self, upload_id: str) -> Tuple[Path, Dict[str, Any]]:
+        if not UPLOAD_ID.match(upload_id):
+            raise UploadError("Invalid upload id")
+        try:
+            with open(self.upload_dir / f"{upload_id}{META_SUFFIX}", 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise UploadError("Unknown upload id")
+        return self.upload_dir / f"{upload_id}{PARTIAL_SUFFIX}", meta
+
+    def offset(self, upload_id: str) -> Dict[str, Any]:
+        """Sunucuya ulaşmış bayt sayısı ve toplam boyut (tamamlandıysa dosya bilgisi ile)"""
+        partial, meta = self._paths(upload_id)
+        if 'file' in meta:
+            return {'uploadId': upload_id, 'offset': meta['size'], 'size': meta['size'], 'file': meta['file']}
+        return {'uploadId': upload_id, 'offset': partial.stat().st_size, 'size': meta['size']}
+
+    def append(self, upload_id: str, start: int, stream: BinaryIO) -> Dict[str, Any]:
+        """
+        Parçayı kısmi dosyanın sonuna akıtır
+
+        start mevcut boyuttan farklıysa UploadOffsetError fırlatılır; istemci
+        offset() ile kaldığı yeri öğrenip oradan devam eder. Son parça
+        yazıldığında dosya yayınlanır ve 'file' anahtarıyla bilgisi döner.
+        """
+        partial, meta = self._paths(upload_id)
+        if 'file' in meta:
+            # Son parçanın yanıtı istemciye ulaşmamış olabilir; tekrar deneme güvenli
+            return self.offset(upload_id)
+        with self._lock:
+            current = partial.stat().st_size
+            if start != current or upload_id in self._active:
+                raise UploadOffsetError(current)
+            self._active.add(upload_id)
+            digest = self._digests.pop(upload_id, None)
+
+        try:
+            if digest is None:
+                digest = hashlib.sha256()
+                with open(partial, 'rb') as f:
+                    for chunk in iter(lambda: f.read(UPLOAD_CHUNK), b''):
+                        digest.update(chunk)
+
+            writer = HashingFile(partial, 'ab', digest)
+            try:
+                for chunk in iter(lambda: stream.read(UPLOAD_CHUNK), b''):
+                    if current + writer.size + len(chunk) > meta['size']:
+                        raise UploadError("Chunk exceeds declared upload size")
+                    writer.write(chunk)
+            except Exception:
+                # Yarım kalan parçayı geri al; özet bir sonraki parçada yeniden hesaplanır
+                writer.close()
+                os.truncate(partial, current)
+                raise
+            writer.close()
+        finally:
+            with self._lock:
+                self._active.discard(upload_id)
+
+        offset = current + writer.size
+        result = {'uploadId': upload_id, 'offset': offset, 'size': meta['size']}
+        if offset == meta['size']:
+            result['file'] = self._publish(partial, digest.hexdigest(), offset, meta['name'])
+            with open(self.upload_dir / f"{upload_id}{META_SUFFIX}", 'w', encoding='utf-8') as f:
+                json.dump(dict(meta, file=result['file']), f, ensure_ascii=False)
+        else:
+            with self._lock:
+                self._digests[upload_id] = digest
+        return result
+
+    def resolve(self, file_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        İstemcinin gönderdiği dosya bilgisini doğrular
+
+        Yalnızca bu depoda yayınlanmış dosyalar kabul edilir; özet dosya
+        adından okunur.
+        """
+        path = Path(file_info.get('path', ''))
+        try:
+            path = path.resolve()
+            path.relative_to(self.upload_dir.resolve())
+        except (OSError, ValueError):
+            return None
+        match = STORED_NAME.match(path.name)
+        if not match or not path.is_file():
+            return None
+        return {
+            'name': Path(file_info.get('name') or match.group(2)).name,
+            'path': str(path),
+            'size': path.stat().st_size,
+            'sha256': match.group(1)
+        }
+
+    def remove_stale(self, max_age: float = STALE_UPLOAD_S):
+        """Uzun süredir dokunulmayan yüklemeleri (tamamlanmamışlar dahil) siler"""
+        cutoff = time.time() - max_age
+        for path in self.upload_dir.iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    self._digests.pop(path.name.split('.')[0], None)
+            except OSError:
+                continue
+
+
+class UploadRequest(Request):
+    """Multipart dosyalarını doğrudan yükleme deposuna akıtan istek sınıfı"""
+
+    upload_store: Optional[UploadStore] = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.upload_store is None or not filename:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return self.upload_store.open_stream()
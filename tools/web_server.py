@@ -10,32 +10,244 @@ Handles file uploads, processing, and downloads.
 """
 
 import os
+import gzip
 import json
+import sqlite3
 import tempfile
-import zipfile
-from datetime import datetime
+import threading
+import time
+import uuid
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file, render_template_string
-from werkzeug.utils import secure_filename
+from flask import Flask, Response, g, request, jsonify, send_file, render_template_string, stream_with_context
 import sys
 import logging
 
 # Import our data merger
 sys.path.append(str(Path(__file__).parent))
-from advanced_data_merger import AdvancedDataMerger
+from job_queue import JobQueue, QueueFullError, prepare_input_dir, run_merge_job, warm_merger_engine
+from result_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache, cache_key
+from session_store import ACTIVE_STATUSES, DEFAULT_DB_PATH, SessionStore
+from upload_store import UploadError, UploadOffsetError, UploadRequest, UploadStore
+from merge_artifacts import GZIP_LEVEL, PRECOMPRESS_MIN_BYTES, choose_encoding, index_artifacts, stream_zip
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, DURATION_BUCKETS, Registry, process_memory_bytes
+
+try:
+    from camera_index import DEFAULT_DATASET, CameraDataset, QueryError, parse_query, render
+    HAS_CAMERA_INDEX = True
+except ImportError:
+    DEFAULT_DATASET = Path(__file__).parent.parent / "data" / "eds-locations.geojson"
+    HAS_CAMERA_INDEX = False
 
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
-app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp()
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size (istek başına)
+app.config['UPLOAD_FOLDER'] = str(Path(tempfile.gettempdir()) / 'eds-uploads')  # İşçiler arası ortak
+app.config['MAX_UPLOAD_SIZE'] = 500 * 1024 * 1024  # Devam ettirilebilir yüklemeler için
+app.config['MERGE_WORKERS'] = 2  # Eşzamanlı birleştirme süreci
+app.config['MAX_QUEUED_JOBS'] = 8  # Kuyruk derinliği sınırı (aşılırsa 429)
+app.config['RESULT_CACHE_DIR'] = str(DEFAULT_CACHE_DIR)  # Yeniden başlatmada korunur
+app.config['RESULT_CACHE_MAX_BYTES'] = DEFAULT_MAX_BYTES
+app.config['SESSION_DB'] = str(DEFAULT_DB_PATH)  # Tüm işçiler aynı dosyayı kullanır
+app.config['SESSION_TTL'] = 3600  # 1 saat
+app.config['MAX_SESSIONS'] = 1000
+app.config['CAMERA_DATASET'] = str(DEFAULT_DATASET)  # Yanındaki .index.bin varsa mmap ile eşlenir
+app.config['CAMERA_API_MAX_AGE'] = 60  # /api/cameras tarayıcı önbellek süresi (s)
+app.config['METRICS_DIR'] = None  # Ön-çatallı sunucuda işçilerin metrik dizini (production_server.py)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Store processing results temporarily
-processing_results = {}
+# Multipart dosyaları doğrudan yükleme dizinine akıtılır
+UploadRequest.upload_store = UploadStore(Path(app.config['UPLOAD_FOLDER']), app.config['MAX_UPLOAD_SIZE'])
 
 ALLOWED_EXTENSIONS = {'json', 'geojson', 'csv'}
+SSE_HEARTBEAT_S = 15
+PUBLISH_INTERVAL_S = 0.5  # Aynı aşamadaki ilerleme en fazla bu sıklıkla depoya yazılır
+STORE_POLL_S = 0.5  # Başka işçideki işin durumu / iptal istekleri yoklama aralığı
+
+# Süreç içi metrikler (/metrics, Prometheus metin formatı)
+metrics = Registry()
+REQUEST_COUNT = metrics.counter('eds_http_requests_total', 'HTTP requests by route, method and status')
+REQUEST_LATENCY = metrics.histogram('eds_http_request_duration_seconds',
+                                    'Time to produce response headers, by route')
+UPLOAD_BYTES = metrics.counter('eds_upload_bytes_total', 'Request body bytes received by upload endpoints')
+CACHE_LOOKUPS = metrics.counter('eds_result_cache_lookups_total', 'Result cache lookups at /process by result')
+JOB_DURATION = metrics.histogram('eds_merge_job_duration_seconds', 'Merge job run time by final status',
+                                 DURATION_BUCKETS)
+JOB_WAIT = metrics.histogram('eds_merge_job_queue_wait_seconds', 'Time merge jobs spent queued', DURATION_BUCKETS)
+STAGE_DURATION = metrics.histogram('eds_merge_stage_duration_seconds', 'Merge job time per pipeline stage',
+                                   DURATION_BUCKETS)
+POINTS_PROCESSED = metrics.counter('eds_merge_points_total', 'Points normalized by completed merge jobs')
+POINTS_RATE = metrics.histogram('eds_merge_points_per_second', 'Per-job merge throughput (normalized points/s)',
+                                (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000))
+UPLOAD_ENDPOINTS = {'upload_files', 'resumable_upload'}
+
+_job_queue = None
+_result_cache = None
+_session_store = None
+_camera_dataset = None
+_published = {}  # iş kimliği -> (aşama, depoya son yazım zamanı)
+
+def get_job_queue():
+    """İş kuyruğunu ilk kullanımda oluşturur (spawn ile başlayan işçiler modülü yeniden import eder)"""
+    global _job_queue
+    if _job_queue is None:
+        # İşçiler açılışta birleştirici motorunu bir kez ısıtır ve işler arasında yeniden kullanılır
+        _job_queue = JobQueue(workers=app.config['MERGE_WORKERS'],
+                              max_queue=app.config['MAX_QUEUED_JOBS'],
+                              initializer=warm_merger_engine)
+        _job_queue.on_event = publish_job_status
+        _job_queue.on_finish = store_job_result
+        threading.Thread(target=watch_cancel_requests, args=(_job_queue,), name='cancel-watcher',
+                         daemon=True).start()
+    return _job_queue
+
+def get_result_cache():
+    """Sonuç önbelleğini ilk kullanımda oluşturur"""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(Path(app.config['RESULT_CACHE_DIR']),
+                                    app.config['RESULT_CACHE_MAX_BYTES'])
+    return _result_cache
+
+def get_session_store():
+    """İşçiler arası paylaşılan oturum deposunu ilk kullanımda açar"""
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore(Path(app.config['SESSION_DB']), ttl=app.config['SESSION_TTL'],
+                                      max_sessions=app.config['MAX_SESSIONS'])
+    return _session_store
+
+def get_camera_dataset():
+    """Kamera sorgu indeksini ilk kullanımda oluşturur (veri değişince kendini yeniler)"""
+    global _camera_dataset
+    if _camera_dataset is None:
+        _camera_dataset = CameraDataset(Path(app.config['CAMERA_DATASET']))
+    return _camera_dataset
+
+def publish_job_status(job, state):
+    """
+    İşin durumunu, aşamasını ve ilerlemesini oturum deposuna yazar
+
+    Ön-çatallı sunucuda iş yalnızca kendi işçi sürecinin kuyruğundadır;
+    diğer işçiler /status, /events ve /cancel isteklerini depodan karşılar.
+    Aşama değişimleri hemen, aynı aşamadaki ilerleme seyreltilerek yazılır.
+    İş kuyruğunun kanca iş parçacığında çalışır (kuyruk kilidi dışında).
+    """
+    now = time.time()
+    stage, published_at = _published.get(job.job_id, (None, 0.0))
+    if state['event']['stage'] == stage and now - published_at < PUBLISH_INTERVAL_S:
+        return
+    _published[job.job_id] = (state['event']['stage'], now)
+    get_session_store().put(job.job_id, {'status': state['status'], 'stage': state['stage'],
+                                         'progress': state['progress'], 'seq': state['seq']},
+                            output_dir=job.kwargs['output_dir'])
+
+def watch_cancel_requests(queue):
+    """Başka işçilere gelen iptal isteklerini depodan yoklar ve bu süreçteki işlere uygular"""
+    while True:
+        time.sleep(STORE_POLL_S)
+        try:
+            for job_id in get_session_store().cancel_requests():
+                job = queue.get(job_id)
+                if job is not None and not job.cancel_requested and queue.cancel(job_id):
+                    logger.info(f"Cancelling job {job_id} (requested via another server worker)")
+        except sqlite3.Error as e:
+            logger.error(f"Cancel request poll failed: {e}")
+
+def store_job_result(job):
+    """Biten işin sonucunu indirme için sakla; başarısız/iptal işlerin çıktısını sil (kanca iş parçacığında)"""
+    import shutil
+    record_job_metrics(job)
+    # Giriş dizini işi kuyruğa ekleyen süreçte oluşturuldu; her durumda burada silinir
+    shutil.rmtree(job.kwargs['input_dir'], ignore_errors=True)
+    _published.pop(job.job_id, None)
+    if job.status == 'done':
+        get_session_store().put(job.job_id, {'status': 'done', 'results': job.result},
+                                output_dir=job.result['outputDir'])
+    else:
+        shutil.rmtree(job.kwargs['output_dir'], ignore_errors=True)
+        get_session_store().put(job.job_id, {'status': job.status, 'error': job.error})
+
+def preload_shared_data():
+    """
+    Salt okunur verileri (kamera indeksi) yükler ve veri sürümünü döner
+
+    Ön-çatallı sunucuda fork'tan önce ana süreçte çağrılır; işçiler veriyi
+    copy-on-write paylaşır. Sürüm değişince ana süreç işçileri yeniler.
+    """
+    if not HAS_CAMERA_INDEX:
+        return None
+    try:
+        return get_camera_dataset().index().version
+    except FileNotFoundError:
+        return None
+
+def start_server_worker():
+    """Fork sonrası işçi süreç: veri yenilemesi ana sürece bırakılır, birleştirme işçileri ısıtılır"""
+    if _camera_dataset is not None:
+        _camera_dataset.check_interval = float('inf')
+    if app.config['METRICS_DIR']:
+        # /metrics hangi işçiye düşerse düşsün tüm işçilerin toplamını yayınlar
+        metrics.start_export(Path(app.config['METRICS_DIR']))
+    get_job_queue()
+
+def stop_server_worker(timeout):
+    """İşçi süreç kapanırken kuyruktaki ve çalışan işlerin bitmesini bekler"""
+    if _job_queue is not None:
+        if not _job_queue.wait_idle(timeout):
+            logger.warning("Merge jobs still running at shutdown, cancelling")
+        _job_queue.shutdown()
+
+def record_job_metrics(job):
+    """Biten işin süre, aşama ve nokta metriklerini kaydeder"""
+    if job.started_at is None:
+        return
+    elapsed = job.finished_at - job.started_at
+    JOB_WAIT.observe(job.started_at - job.created_at)
+    JOB_DURATION.observe(elapsed, status=job.status)
+    for stage, seconds in job.stage_durations.items():
+        STAGE_DURATION.observe(seconds, stage=stage)
+    if job.status == 'done':
+        points = job.result.get('processingStats', {}).get('normalized_points', 0)
+        POINTS_PROCESSED.inc(points)
+        if elapsed > 0:
+            POINTS_RATE.observe(points / elapsed)
+
+def queue_gauge(key):
+    """Kuyruk doluluk gauge'u; kuyruk henüz oluşturulmadıysa 0 (ölçüm işçi başlatmaz)"""
+    return lambda: _job_queue.stats()[key] if _job_queue is not None else 0
+
+def memory_gauge():
+    """Sunucu ve birleştirme işçi süreçlerinin RSS değerleri"""
+    values = {(('process', 'server'),): process_memory_bytes() or 0}
+    if _job_queue is not None:
+        values[(('process', 'merge_workers'),)] = sum(process_memory_bytes(pid) or 0
+                                                       for pid in _job_queue.worker_pids())
+    return values
+
+metrics.gauge('eds_job_queue_depth', 'Merge jobs waiting for a worker', queue_gauge('queued'))
+metrics.gauge('eds_job_queue_running', 'Merge jobs currently running', queue_gauge('running'))
+metrics.gauge('eds_result_cache_bytes', 'Result cache size on disk',
+              lambda: _result_cache.stats()['bytes'] if _result_cache is not None else 0, aggregate='max')
+metrics.gauge('eds_resident_memory_bytes', 'Resident memory by process group', memory_gauge)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Route şablonu başına gecikme ve durum sayacı (akış yanıtlarında başlıklara kadar)"""
+    started = g.pop('request_started', None)
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    if started is not None:
+        REQUEST_LATENCY.observe(time.perf_counter() - started, route=route)
+    REQUEST_COUNT.inc(route=route, method=request.method, status=response.status_code)
+    if request.endpoint in UPLOAD_ENDPOINTS and request.method in ('POST', 'PUT'):
+        UPLOAD_BYTES.inc(request.content_length or 0)
+    return response
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -58,22 +270,14 @@ def upload_files():
             return jsonify({'error': 'No files selected'}), 400
         
         uploaded_files = []
-        upload_dir = Path(app.config['UPLOAD_FOLDER'])
+        upload_store = UploadRequest.upload_store
         
         for file in files:
+            # Dosya gövdesi ayrıştırma sırasında yükleme dizinine yazıldı ve özeti hesaplandı
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                # Add timestamp to prevent conflicts
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{timestamp}_{filename}"
-                filepath = upload_dir / filename
-                file.save(str(filepath))
-                
-                uploaded_files.append({
-                    'name': file.filename,
-                    'path': str(filepath),
-                    'size': filepath.stat().st_size
-                })
+                uploaded_files.append(upload_store.finalize(file.stream, file.filename))
+            elif file:
+                upload_store.discard(file.stream)
         
         if not uploaded_files:
             return jsonify({'error': 'No valid files uploaded'}), 400
@@ -88,9 +292,46 @@ def upload_files():
         logger.error(f"Upload error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/upload/resumable', methods=['POST'])
+def create_resumable_upload():
+    """Devam ettirilebilir yükleme başlat: {name, size} -> uploadId"""
+    data = request.get_json() or {}
+    name = data.get('name', '')
+    if not allowed_file(name):
+        return jsonify({'error': 'Unsupported file type'}), 400
+    try:
+        upload_id = UploadRequest.upload_store.create(name, int(data.get('size', -1)))
+    except (UploadError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'uploadId': upload_id, 'offset': 0}), 201
+
+@app.route('/upload/resumable/<upload_id>', methods=['GET', 'PUT'])
+def resumable_upload(upload_id):
+    """
+    GET: sunucudaki mevcut boyut (kopan yüklemeyi sürdürmek için)
+    PUT: Content-Range: bytes <start>-<end>/<total> başlıklı parça
+    """
+    upload_store = UploadRequest.upload_store
+    try:
+        if request.method == 'GET':
+            return jsonify(upload_store.offset(upload_id))
+        
+        content_range = request.headers.get('Content-Range', '')
+        try:
+            start = int(content_range.split(' ', 1)[1].split('-', 1)[0])
+        except (IndexError, ValueError):
+            return jsonify({'error': 'Content-Range header required'}), 400
+        
+        result = upload_store.append(upload_id, start, request.stream)
+        return jsonify(dict(result, success=True))
+    except UploadOffsetError as e:
+        return jsonify({'error': str(e), 'offset': e.expected}), 409
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 404 if 'Unknown' in str(e) else 400
+
 @app.route('/process', methods=['POST'])
 def process_data():
-    """Veri işleme endpoint'i"""
+    """Veri işleme endpoint'i - işi kuyruğa ekler ve iş kimliğini hemen döner"""
     try:
         data = request.get_json()
         
@@ -101,67 +342,58 @@ def process_data():
         if not files:
             return jsonify({'error': 'No files to process'}), 400
         
-        # Create temporary input directory
-        temp_input_dir = Path(tempfile.mkdtemp())
+        # Yalnızca bu sunucuya yüklenmiş dosyalar; özetler dosya adından gelir
+        files = [UploadRequest.upload_store.resolve(file_info) for file_info in files]
+        if not all(files):
+            return jsonify({'error': 'Unknown or expired upload, please upload the files again'}), 400
         
-        # Copy uploaded files to temp directory
-        for file_info in files:
-            src_path = Path(file_info['path'])
-            if src_path.exists():
-                dst_path = temp_input_dir / file_info['name']
-                dst_path.write_bytes(src_path.read_bytes())
+        # Aynı dosyalar + ayarlar daha önce işlendiyse önbellekten dön
+        key = cache_key(files, settings)
+        if key:
+            cached_dir = Path(tempfile.mkdtemp())
+            results = get_result_cache().materialize(key, cached_dir)
+            CACHE_LOOKUPS.inc(result='miss' if results is None else 'hit')
+            if results is not None:
+                session_id = uuid.uuid4().hex
+                get_session_store().put(session_id, {'status': 'done', 'results': results},
+                                        output_dir=str(cached_dir))
+                logger.info(f"Served processing request from cache ({key[:12]})")
+                return jsonify({
+                    'success': True,
+                    'jobId': session_id,
+                    'sessionId': session_id,
+                    'status': 'done',
+                    'cached': True,
+                    'results': results
+                })
+            import shutil
+            shutil.rmtree(cached_dir, ignore_errors=True)
         
         # Create output directory
         output_dir = Path(tempfile.mkdtemp())
+        input_dir = prepare_input_dir(files)
         
-        # Initialize merger
-        merger = AdvancedDataMerger(str(temp_input_dir), str(output_dir))
-        merger.duplicate_detector.distance_threshold = settings.get('duplicateDistance', 0.1)
-        
-        # Process data
-        logger.info("Starting data processing...")
-        processed_points = merger.process_data()
-        
-        # Apply quality filter
-        min_quality = settings.get('qualityThreshold', 0.3)
-        high_quality_points = [
-            point for point in processed_points 
-            if point.confidence_score >= min_quality
-        ]
-        
-        # Export data
-        output_name = settings.get('outputName', 'eds_merged_data')
-        merger.export_data(high_quality_points, output_name)
-        
-        # Prepare results
-        from collections import Counter
-        results = {
-            'totalPoints': len(high_quality_points),
-            'qualityScore': sum(p.confidence_score for p in high_quality_points) / len(high_quality_points) if high_quality_points else 0,
-            'duplicatesRemoved': merger.stats.get('duplicate_groups', 0),
-            'typeDistribution': dict(Counter(p.type for p in high_quality_points)),
-            'cityDistribution': dict(Counter(p.city for p in high_quality_points if p.city)),
-            'processingStats': dict(merger.stats),
-            'outputDir': str(output_dir)
-        }
-        
-        # Store results for download
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        processing_results[session_id] = {
-            'results': results,
-            'output_dir': output_dir,
-            'created_at': datetime.now()
-        }
-        
-        # Clean up input directory
-        import shutil
-        shutil.rmtree(temp_input_dir, ignore_errors=True)
+        try:
+            job = get_job_queue().submit(run_merge_job, input_dir=str(input_dir), settings=settings,
+                                         output_dir=str(output_dir), cache_key=key,
+                                         cache_dir=app.config['RESULT_CACHE_DIR'],
+                                         cache_max_bytes=app.config['RESULT_CACHE_MAX_BYTES'])
+        except QueueFullError as e:
+            import shutil
+            shutil.rmtree(output_dir, ignore_errors=True)
+            shutil.rmtree(input_dir, ignore_errors=True)
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = '30'
+            return response, 429
         
+        logger.info(f"Queued processing job {job.job_id}")
         return jsonify({
             'success': True,
-            'sessionId': session_id,
-            'results': results
-        })
+            'jobId': job.job_id,
+            'sessionId': job.job_id,
+            'status': job.status,
+            'cached': False
+        }), 202
         
     except Exception as e:
         logger.error(f"Processing error: {e}")
@@ -169,36 +401,36 @@ def process_data():
 
 @app.route('/download/<session_id>/<format>')
 def download_file(session_id, format):
-    """Dosya indirme endpoint'i"""
+    """Dosya indirme endpoint'i (Range, ETag ve önceden sıkıştırılmış kopyalar desteklenir)"""
     try:
-        if session_id not in processing_results:
-            return jsonify({'error': 'Session not found'}), 404
+        session_data = get_session_store().get(session_id)
+        if session_data is None or session_data['status'] != 'done':
+            # Bu süreçte yeni biten işin kaydı kanca iş parçacığında henüz yazılıyor olabilir
+            job = get_job_queue().get(session_id)
+            if job is None or job.status != 'done' or not Path(job.result['outputDir']).is_dir():
+                return jsonify({'error': 'Session not found'}), 404
+            session_data = {'status': 'done', 'results': job.result, 'output_dir': job.result['outputDir']}
         
-        session_data = processing_results[session_id]
         output_dir = Path(session_data['output_dir'])
+        artifacts = session_data['results'].get('artifacts') or index_artifacts(output_dir)
         
         if format == 'all':
-            # Create ZIP file with all outputs
-            zip_path = output_dir / 'eds_merged_data_all.zip'
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                for file_path in output_dir.glob('eds_merged_data_*'):
-                    if file_path.suffix != '.zip':
-                        zipf.write(file_path, file_path.name)
-            
-            return send_file(str(zip_path), as_attachment=True, 
-                           download_name='eds_merged_data_all.zip')
+            # ZIP diske yazılmadan, çıktı dosyalarından akış halinde üretilir
+            response = Response(stream_zip(output_dir, list(artifacts.values())), mimetype='application/zip')
+            response.headers['Content-Disposition'] = 'attachment; filename=eds_merged_data_all.zip'
+            return response
         
-        else:
-            # Find specific format file
-            pattern = f'eds_merged_data_*.{format}'
-            files = list(output_dir.glob(pattern))
-            
-            if not files:
-                return jsonify({'error': f'File not found for format: {format}'}), 404
-            
-            file_path = files[0]
-            return send_file(str(file_path), as_attachment=True, 
-                           download_name=file_path.name)
+        if format not in artifacts:
+            return jsonify({'error': f'File not found for format: {format}'}), 404
+        
+        file_path = output_dir / artifacts[format]
+        send_path, encoding = choose_encoding(file_path, request.accept_encodings)
+        response = send_file(str(send_path), as_attachment=True, download_name=file_path.name,
+                             conditional=True, etag=True, max_age=app.config['SESSION_TTL'])
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
             
     except Exception as e:
         logger.error(f"Download error: {e}")
@@ -206,15 +438,160 @@ def download_file(session_id, format):
 
 @app.route('/status/<session_id>')
 def get_status(session_id):
-    """İşlem durumu sorgulama"""
-    if session_id in processing_results:
-        return jsonify({
-            'status': 'completed',
-            'results': processing_results[session_id]['results']
-        })
+    """İşlem durumu sorgulama (queued / running / done / failed / cancelled)"""
+    status = local_status(get_job_queue(), session_id)
+    if status is not None:
+        return jsonify(status)
+    
+    # İş başka bir işçide çalışıyor veya bitmiş
+    session_data = get_session_store().get(session_id)
+    if session_data is not None:
+        return jsonify(stored_status(session_id, session_data))
     else:
         return jsonify({'status': 'not_found'}), 404
 
+def local_status(queue, session_id):
+    """Bu süreçteki işin durumu; bitmişse sonuç işin kendisinden (depo kaydı kancayla sonradan yazılır)"""
+    status = queue.status(session_id)
+    if status is not None and status['status'] == 'done':
+        status['results'] = queue.get(session_id).result
+    return status
+
+def stored_status(session_id, session_data):
+    """Oturum deposundaki kayıttan /status yanıtı (iş başka bir işçi sürecinde)"""
+    status = {
+        'jobId': session_id,
+        'status': session_data['status'],
+        'stage': session_data.get('stage'),
+        'progress': session_data.get('progress'),
+        'results': session_data.get('results'),
+        'error': session_data.get('error')
+    }
+    if session_data['cancel_requested'] and session_data['status'] in ACTIVE_STATUSES:
+        status['cancelRequested'] = True
+    return status
+
+def job_event_stream(queue, session_id, after):
+    """Bu süreçteki işin olaylarını kuyruktan bekleyerek SSE olarak üretir"""
+    yield 'retry: 2000\n\n'
+    while True:
+        update = queue.wait_events(session_id, after, timeout=SSE_HEARTBEAT_S)
+        if update is None:
+            return
+        for seq, event in update['events']:
+            yield f"id: {seq}\nevent: progress\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            after = seq
+        if update['finished']:
+            status = local_status(queue, session_id) or {'status': 'not_found'}
+            yield f"id: {after}\nevent: end\ndata: {json.dumps(status, ensure_ascii=False)}\n\n"
+            return
+        if not update['events']:
+            yield ': keep-alive\n\n'
+
+def stored_event_stream(session_id, after):
+    """
+    Başka işçideki işin olaylarını oturum deposunu yoklayarak SSE olarak üretir
+
+    Depoya yalnızca son durum yazıldığından aynı aşamadaki ara ilerleme
+    olayları atlanabilir; sıra numaraları sahibi olan süreçtekiyle aynıdır.
+    """
+    yield 'retry: 2000\n\n'
+    store = get_session_store()
+    last_sent = time.time()
+    while True:
+        session_data = store.get(session_id)
+        if session_data is None:
+            return
+        if session_data['status'] not in ACTIVE_STATUSES:
+            status = stored_status(session_id, session_data)
+            yield f"id: {after}\nevent: end\ndata: {json.dumps(status, ensure_ascii=False)}\n\n"
+            return
+        seq = session_data.get('seq', 0)
+        if seq > after:
+            event = session_data.get('progress') or {'stage': session_data['status']}
+            yield f"id: {seq}\nevent: progress\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            after = seq
+            last_sent = time.time()
+        elif time.time() - last_sent >= SSE_HEARTBEAT_S:
+            yield ': keep-alive\n\n'
+            last_sent = time.time()
+        time.sleep(STORE_POLL_S)
+
+@app.route('/events/<session_id>')
+def job_events(session_id):
+    """İş ilerlemesini Server-Sent Events olarak yayınla (iş başka işçideyse depodan)"""
+    queue = get_job_queue()
+    local = queue.get(session_id) is not None
+    if not local and get_session_store().get(session_id) is None:
+        return jsonify({'status': 'not_found'}), 404
+    
+    try:
+        last_seq = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_seq = 0
+    
+    stream = job_event_stream(queue, session_id, last_seq) if local else stored_event_stream(session_id, last_seq)
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/cancel/<session_id>', methods=['POST'])
+def cancel_job(session_id):
+    """Kuyruktaki veya çalışan işi iptal et (iş başka işçideyse iptal isteği depoya yazılır)"""
+    queue = get_job_queue()
+    if queue.get(session_id) is None:
+        store = get_session_store()
+        session_data = store.get(session_id)
+        if session_data is None:
+            return jsonify({'status': 'not_found'}), 404
+        if session_data['status'] not in ACTIVE_STATUSES or not store.request_cancel(session_id):
+            return jsonify({'error': 'Job already finished', 'status': session_data['status']}), 409
+        # İşin sahibi olan süreç isteği yoklayıp uygular; sonuç /status veya /events ile izlenir
+        session_data['cancel_requested'] = True
+        return jsonify({'success': True, **stored_status(session_id, session_data)}), 202
+    if not queue.cancel(session_id):
+        return jsonify({'error': 'Job already finished', **queue.status(session_id)}), 409
+    return jsonify({'success': True, **queue.status(session_id)})
+
+@app.route('/api/jobs')
+def job_stats():
+    """İş kuyruğu ve sonuç önbelleği doluluk bilgisi"""
+    return jsonify(dict(get_job_queue().stats(), cache=get_result_cache().stats(),
+                        sessions=get_session_store().stats()))
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metin formatında süreç metrikleri"""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/api/cameras')
+def query_cameras():
+    """Kamera sorgusu: bbox=, near=lat,lng&radius=, near=lat,lng&k=, type= (kompakt JSON)"""
+    if not HAS_CAMERA_INDEX:
+        return jsonify({'error': 'Camera queries require numpy'}), 503
+    try:
+        query = parse_query(request.args)
+        index = get_camera_dataset().index()
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except FileNotFoundError:
+        return jsonify({'error': 'No published dataset'}), 503
+    
+    # ETag = veri sürümü + kanonik sorgu; eşleşirse sorgu hiç çalıştırılmaz
+    etag = f"{index.version[:16]}-{query.cache_key()}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = render(index.search(query))
+        response = Response(body, mimetype='application/json')
+        if len(body) >= PRECOMPRESS_MIN_BYTES and request.accept_encodings.quality('gzip') > 0:
+            response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0))
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['CAMERA_API_MAX_AGE']
+    return response
+
 @app.route('/api/info')
 def api_info():
     """API bilgileri"""
@@ -228,35 +605,23 @@ def api_info():
             'Duplicate detection',
             'Quality scoring',
             'Geographic validation',
-            'Multiple export formats'
+            'Multiple export formats',
+            'Background job queue',
+            'Live progress (Server-Sent Events)',
+            'Result cache',
+            'Spatial camera queries (/api/cameras)',
+            'Prometheus metrics (/metrics)'
         ]
     })
 
-# Clean up old results periodically
-@app.before_request
-def cleanup_old_results():
-    """Eski sonuçları temizle (1 saatlik)"""
-    import time
-    current_time = datetime.now()
-    expired_sessions = []
-    
-    for session_id, data in processing_results.items():
-        if (current_time - data['created_at']).seconds > 3600:  # 1 hour
-            expired_sessions.append(session_id)
-    
-    for session_id in expired_sessions:
-        session_data = processing_results.pop(session_id)
-        # Clean up files
-        import shutil
-        try:
-            shutil.rmtree(session_data['output_dir'], ignore_errors=True)
-        except:
-            pass
-
 if __name__ == '__main__':
     print("🚀 EDS Data Merger Web Server starting...")
     print("📍 Local URL: http://localhost:5000")
     print("🔧 API Docs: http://localhost:5000/api/info")
     print("📁 Upload folder:", app.config['UPLOAD_FOLDER'])
     
+    # İşçi süreçleri ilk istekten önce ısınsın (yeniden yükleyicinin izleyici süreci hariç)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        get_job_queue()
+    
     app.run(debug=True, host='0.0.0.0', port=5000)